@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Compare the pydantic and slots engines: records/sec and retained bytes per record.
+
+Usage:
+    python benchmarks/bench_engines.py ARCHIVE [--member subject.jsonlines] [--rounds 3]
+"""
+
+import time
+import tracemalloc
+
+import click
+
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+ENGINES = ("pydantic", "slots")
+
+
+def _throughput(archive: str, filename: str, engine: str, rounds: int) -> tuple[int, float]:
+    best = float("inf")
+    count = 0
+    for _ in range(rounds):
+        loader = WikiArchiveLoader(archive, stop_on_error=False, engine=engine)
+        start = time.perf_counter()
+        count = sum(1 for _ in loader.iter_member(filename))
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+def _bytes_per_record(archive: str, filename: str, engine: str) -> float:
+    """
+    Memory still allocated after materializing the whole member as a list.
+    """
+    loader = WikiArchiveLoader(archive, stop_on_error=False, engine=engine)
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    entries = list(loader.iter_member(filename))
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained / max(len(entries), 1)
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--member",
+    "members",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to benchmark (default: all).",
+)
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+def main(archive: str, members: tuple[str, ...], rounds: int):
+    for filename in members or WikiArchiveLoader.FILE_MODEL_MAP:
+        results = {}
+        for engine in ENGINES:
+            count, seconds = _throughput(archive, filename, engine, rounds)
+            results[engine] = (count / seconds, _bytes_per_record(archive, filename, engine))
+        print(
+            f"{filename:32} {count:>10} lines  "
+            + "  ".join(
+                f"{engine} {rate:>10,.0f} rec/s {size:>7,.0f} B/rec"
+                for engine, (rate, size) in results.items()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
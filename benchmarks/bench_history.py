@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Ingest an archive and edited copies of it into a history store, and time point queries.
+
+Each copy changes a fraction of the subject and episode lines of the previous one, like a
+weekly dump; ingest time should follow the number of changed lines, not the archive size.
+
+Usage:
+    python benchmarks/bench_history.py ARCHIVE [--dumps 4] [--changed 0.01]
+"""
+
+import json
+import os
+import random
+import tempfile
+import time
+import zipfile
+
+import click
+
+from bgm_archive.history.history_store import HistoryStore
+
+EDITED_MEMBERS = ("subject.jsonlines", "episode.jsonlines")
+
+
+def _edit(source: str, target: str, changed: float, seed: int) -> int:
+    """
+    Copy an archive, changing a fraction of the lines of EDITED_MEMBERS.
+    """
+    rng = random.Random(seed)
+    edited = 0
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(target, "w", zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            lines = src.read(info).splitlines(keepends=True)
+            if info.filename in EDITED_MEMBERS:
+                for index in rng.sample(range(len(lines)), int(len(lines) * changed)):
+                    record = json.loads(lines[index])
+                    record["name"] = f"{record['name']} ({seed})"
+                    lines[index] = json.dumps(record, ensure_ascii=False).encode() + b"\n"
+                    edited += 1
+            dst.writestr(info.filename, b"".join(lines))
+    return edited
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("--dumps", default=4, show_default=True, help="Dumps to ingest, the first included.")
+@click.option("--changed", default=0.01, show_default=True, help="Fraction of edited lines.")
+@click.option("--queries", default=1000, show_default=True)
+def main(archive: str, dumps: int, changed: float, queries: int):
+    with tempfile.TemporaryDirectory(prefix="bgm-history-") as tmp_dir:
+        paths, edits = [archive], [0]
+        for week in range(1, dumps):
+            path = os.path.join(tmp_dir, f"dump-{week}.zip")
+            edits.append(_edit(paths[-1], path, changed, week))
+            paths.append(path)
+
+        with HistoryStore(os.path.join(tmp_dir, "history.db")) as store:
+            for week, (path, edited) in enumerate(zip(paths, edits)):
+                date = f"2024-01-{week + 1:02d}"
+                start = time.perf_counter()
+                results = store.ingest(path, date)
+                seconds = time.perf_counter() - start
+                lines = sum(sum(counts.values()) for counts in results.values())
+                written = sum(
+                    counts["added"] + counts["changed"] + counts["removed"]
+                    for counts in results.values()
+                )
+                print(
+                    f"{date}: {lines:>9} lines, {edited:>7} edited, {written:>9} written"
+                    f" in {seconds:6.2f}s ({lines / seconds:,.0f} lines/s)"
+                )
+            print(", ".join(f"{count} {table}s" for table, count in store.counts().items()))
+            size = os.path.getsize(os.path.join(tmp_dir, "history.db")) / 2**20
+            archives = sum(map(os.path.getsize, paths)) / 2**20
+            print(f"store {size:.1f} MiB, archives {archives:.1f} MiB")
+
+            ids = [
+                row[0]
+                for row in store.conn.execute(
+                    "SELECT key FROM version WHERE member = 0 LIMIT ?", (queries,)
+                )
+            ]
+            start = time.perf_counter()
+            for subject_id in ids:
+                store.get_entity_at("subject", subject_id, f"2024-01-{dumps:02d}")
+            lookup = (time.perf_counter() - start) / len(ids)
+            start = time.perf_counter()
+            for subject_id in ids:
+                store.history("subject", subject_id)
+            history = (time.perf_counter() - start) / len(ids)
+            print(f"get_entity_at {lookup * 1e6:.0f} us, history {history * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
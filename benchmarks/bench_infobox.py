@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Measure infobox parsing throughput over the infoboxes of an archive member.
+
+Usage:
+    python benchmarks/bench_infobox.py ARCHIVE [--member subject.jsonlines]
+"""
+
+import time
+
+import click
+
+from bgm_archive.loader.infobox import parse_infobox
+from bgm_archive.loader.raw_loader import RawWikiArchiveLoader
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--member",
+    default="subject.jsonlines",
+    show_default=True,
+    type=click.Choice(["subject.jsonlines", "person.jsonlines", "character.jsonlines"]),
+)
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+def main(archive: str, member: str, rounds: int):
+    loader = RawWikiArchiveLoader(archive)
+    infoboxes = [record["infobox"] for record in loader.iter_member(member)]
+    size = sum(len(infobox.encode("utf-8")) for infobox in infoboxes)
+
+    best = float("inf")
+    fields = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fields = sum(len(parse_infobox(infobox).fields) for infobox in infoboxes)
+        best = min(best, time.perf_counter() - start)
+
+    print(
+        f"{member}: {len(infoboxes)} infoboxes, {fields} fields, {size / 1e6:.1f} MB"
+        f"  {len(infoboxes) / best:,.0f} infoboxes/s  {size / 1e6 / best:.1f} MB/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare lines/sec of per-line validation (iter_member) against iter_batches.
+
+Usage:
+    python benchmarks/bench_iter_batches.py ARCHIVE [--member subject-relations.jsonlines] [--batch-size 1000]
+"""
+
+import time
+
+import click
+
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def _per_line(archive: str, filename: str) -> int:
+    loader = WikiArchiveLoader(archive, stop_on_error=False)
+    return sum(1 for _ in loader.iter_member(filename))
+
+
+def _batched(archive: str, filename: str, batch_size: int) -> int:
+    loader = WikiArchiveLoader(archive, stop_on_error=False)
+    model_class = WikiArchiveLoader.FILE_MODEL_MAP[filename]
+    return sum(len(batch) for batch in loader.iter_batches(model_class, batch_size))
+
+
+def _best_of(rounds: int, fn, *args) -> tuple[int, float]:
+    best = float("inf")
+    count = 0
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return count, best
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--member",
+    "members",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to benchmark (default: all).",
+)
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+def main(archive: str, members: tuple[str, ...], batch_size: int, rounds: int):
+    for filename in members or WikiArchiveLoader.FILE_MODEL_MAP:
+        count, per_line = _best_of(rounds, _per_line, archive, filename)
+        _, batched = _best_of(rounds, _batched, archive, filename, batch_size)
+        print(
+            f"{filename:32} {count:>10} lines"
+            f"  per-line {count / per_line:>12,.0f} lines/s"
+            f"  batched {count / batched:>12,.0f} lines/s"
+            f"  x{per_line / batched:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
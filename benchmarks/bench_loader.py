@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Throughput and memory of every loader mode on every archive member, saved as JSON.
+
+Each (member, mode) run happens in a fresh process, so peak RSS is the run's own. With
+--baseline, results are compared against an earlier JSON file and the script exits with
+status 1 when a run got slower than --threshold allows.
+
+Generate a dump-sized archive first with:
+    python -m bgm_archive.cli generate-archive /tmp/synthetic.zip --scale 1
+
+Usage:
+    python benchmarks/bench_loader.py ARCHIVE [-o results.json] [--mode validated] [--member subject.jsonlines]
+    python benchmarks/bench_loader.py ARCHIVE -o new.json --baseline old.json [--threshold 0.1]
+"""
+
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+
+from bgm_archive.loader.raw_loader import RawWikiArchiveLoader
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+MODES = ["validated", "batched", "slots", "raw-dict", "raw-tuple"]
+
+
+def _count(archive: str, filename: str, mode: str) -> int:
+    model_class = WikiArchiveLoader.FILE_MODEL_MAP[filename]
+    if mode == "batched":
+        loader = WikiArchiveLoader(archive, stop_on_error=False)
+        return sum(len(batch) for batch in loader.iter_batches(model_class))
+    if mode == "validated":
+        loader = WikiArchiveLoader(archive, stop_on_error=False)
+    elif mode == "slots":
+        loader = WikiArchiveLoader(archive, stop_on_error=False, engine="slots")
+    else:
+        loader = RawWikiArchiveLoader(archive, record_type=mode.removeprefix("raw-"))
+    return sum(1 for _ in loader.iter_member(filename))
+
+
+def _max_rss_bytes() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _run(archive: str, filename: str, mode: str) -> dict:
+    """
+    One measurement, executed in a worker process of its own.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        size = zf.getinfo(filename).file_size
+    rss_before = _max_rss_bytes()
+    start = time.perf_counter()
+    records = _count(archive, filename, mode)
+    seconds = time.perf_counter() - start
+    return {
+        "member": filename,
+        "mode": mode,
+        "records": records,
+        "decompressed_bytes": size,
+        "seconds": seconds,
+        "lines_per_sec": records / seconds,
+        "mb_per_sec": size / 2**20 / seconds,
+        "peak_rss_mb": _max_rss_bytes() / 2**20,
+        "rss_growth_mb": (_max_rss_bytes() - rss_before) / 2**20,
+    }
+
+
+def _measure(archive: str, filename: str, mode: str) -> dict:
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run, archive, filename, mode).result()
+
+
+def _regressions(results: list[dict], baseline: dict, threshold: float) -> list[str]:
+    previous = {(run["member"], run["mode"]): run for run in baseline["runs"]}
+    messages = []
+    for run in results:
+        old = previous.get((run["member"], run["mode"]))
+        if old is None:
+            continue
+        ratio = run["lines_per_sec"] / old["lines_per_sec"]
+        if ratio < 1 - threshold:
+            messages.append(
+                f"{run['member']} [{run['mode']}]: {old['lines_per_sec']:,.0f} -> "
+                f"{run['lines_per_sec']:,.0f} lines/s ({ratio - 1:+.1%})"
+            )
+    return messages
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("-o", "--output", type=click.Path(dir_okay=False), help="JSON file to write.")
+@click.option(
+    "--member",
+    "members",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to benchmark (default: all).",
+)
+@click.option(
+    "--mode",
+    "modes",
+    multiple=True,
+    type=click.Choice(MODES),
+    help="Loader modes to benchmark (default: all).",
+)
+@click.option(
+    "--baseline",
+    type=click.File("r"),
+    help="Earlier results to compare lines/sec against.",
+)
+@click.option(
+    "--threshold",
+    default=0.1,
+    show_default=True,
+    help="Tolerated slowdown against the baseline, as a fraction.",
+)
+def main(archive, output, members, modes, baseline, threshold):
+    runs = []
+    for filename in members or WikiArchiveLoader.FILE_MODEL_MAP:
+        for mode in modes or MODES:
+            run = _measure(archive, filename, mode)
+            runs.append(run)
+            print(
+                f"{filename:32} {mode:10} {run['records']:>10} rec"
+                f" {run['lines_per_sec']:>12,.0f} lines/s"
+                f" {run['mb_per_sec']:>8.1f} MB/s"
+                f" {run['peak_rss_mb']:>8.1f} MB peak RSS"
+            )
+
+    results = {
+        "archive": archive,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "runs": runs,
+    }
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    if baseline:
+        regressions = _regressions(runs, json.load(baseline), threshold)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Per-line validation cost of subject-persons.jsonlines: SubjectPerson.position checked
+against the POSITIONS lookup table, versus the previous union of the five staff enums.
+
+Usage:
+    python benchmarks/bench_positions.py ARCHIVE [--rounds 3] [--limit 500000]
+"""
+
+import time
+import zipfile
+from typing import Callable, List
+
+import click
+from pydantic import BaseModel, ValidationError
+
+from bgm_archive.loader.model import SubjectPerson, SubjectPersonType
+from bgm_archive.loader.records import record_validator
+
+MEMBER = "subject-persons.jsonlines"
+
+
+class UnionSubjectPerson(BaseModel):
+    """SubjectPerson as it was validated before the lookup table."""
+
+    model_config = SubjectPerson.model_config
+
+    person_id: int
+    subject_id: int
+    position: (
+        SubjectPersonType.AnimeStuff
+        | SubjectPersonType.GameStaff
+        | SubjectPersonType.BookStaff
+        | SubjectPersonType.MusicStaff
+        | SubjectPersonType.RealStaff
+    )
+
+
+def _lines(archive: str, limit: int) -> List[bytes]:
+    with zipfile.ZipFile(archive) as zf, zf.open(MEMBER) as file:
+        lines = []
+        for line in file:
+            if line.strip():
+                lines.append(line)
+                if len(lines) >= limit:
+                    break
+    return lines
+
+
+def _seconds(validate: Callable[[bytes], object], lines: List[bytes], rounds: int) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for line in lines:
+            try:
+                validate(line)
+            except ValidationError:
+                pass
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+@click.option("--limit", default=500_000, show_default=True, help="Lines to validate.")
+def main(archive: str, rounds: int, limit: int):
+    lines = _lines(archive, limit)
+    validators = {
+        "pydantic, enum union": UnionSubjectPerson.model_validate_json,
+        "pydantic, lookup table": SubjectPerson.model_validate_json,
+        "slots, lookup table": record_validator(SubjectPerson),
+    }
+    baseline = None
+    for name, validate in validators.items():
+        per_line = _seconds(validate, lines, rounds) / max(len(lines), 1) * 1e9
+        baseline = baseline or per_line
+        print(f"{name:24} {len(lines):>9} lines  {per_line:>8,.0f} ns/line  x{baseline / per_line:.1f}")
+
+
+if __name__ == "__main__":
+    main()
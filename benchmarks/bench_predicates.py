@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Compare validate-then-filter with predicate pushdown (where=...) on selective filters.
+
+Each member is read once in memory first, so the "lines" numbers show JSON parsing and
+validation only; the "loader" numbers are whole passes through WikiArchiveLoader,
+including zip inflation, which the prefilter cannot skip.
+
+Usage:
+    python benchmarks/bench_predicates.py ARCHIVE [--engine slots] [--rounds 3]
+"""
+
+import time
+import zipfile
+
+import click
+from pydantic import ValidationError
+
+from bgm_archive.loader.model import Episode, Subject, SubjectRelation, SubjectType
+from bgm_archive.loader.predicates import LineFilter
+from bgm_archive.loader.records import record_validator
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def _scenarios(members):
+    """
+    (name, member, model, where) of the benchmarked filters.
+    """
+    episodes = members["episode.jsonlines"][:2000]
+    subject_ids = sorted({Episode.model_validate_json(line).subject_id for line in episodes})[:20]
+    return [
+        ("anime subjects", "subject.jsonlines", Subject, {"type": SubjectType.ANIME}),
+        ("episodes of 20 subjects", "episode.jsonlines", Episode, {"subject_id": subject_ids}),
+        ("relation type 1", "subject-relations.jsonlines", SubjectRelation, {"relation_type": 1}),
+    ]
+
+
+def _validator(model_class, engine: str):
+    if engine == "slots":
+        return record_validator(model_class)
+    return model_class.model_validate_json
+
+
+def _filter_after(lines, validate_json, line_filter: LineFilter) -> int:
+    count = 0
+    for line in lines:
+        try:
+            count += line_filter.matches(validate_json(line))
+        except ValidationError:
+            pass
+    return count
+
+
+def _pushdown(lines, validate_json, line_filter: LineFilter) -> int:
+    count = 0
+    for line in lines:
+        if line_filter.prefilter(line):
+            try:
+                count += line_filter.matches(validate_json(line))
+            except ValidationError:
+                pass
+    return count
+
+
+def _best(rounds: int, function, *args) -> tuple[int, float]:
+    results = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count = function(*args)
+        results.append((count, time.perf_counter() - start))
+    return min(results, key=lambda result: result[1])
+
+
+def _loader_pass(archive: str, engine: str, filename: str, where) -> int:
+    loader = WikiArchiveLoader(archive, stop_on_error=False, engine=engine)
+    return sum(1 for _ in loader.iter_member(filename, where=where))
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("--engine", type=click.Choice(["pydantic", "slots"]), default="pydantic")
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+def main(archive: str, engine: str, rounds: int):
+    with zipfile.ZipFile(archive) as source:
+        members = {
+            filename: [line for line in source.read(filename).splitlines() if line.strip()]
+            for filename in WikiArchiveLoader.FILE_MODEL_MAP
+            if filename in ("subject.jsonlines", "episode.jsonlines", "subject-relations.jsonlines")
+        }
+
+    for name, filename, model_class, where in _scenarios(members):
+        lines = members[filename]
+        line_filter = LineFilter(model_class, where)
+        validate_json = _validator(model_class, engine)
+        count, after = _best(rounds, _filter_after, lines, validate_json, line_filter)
+        pushed_count, pushed = _best(rounds, _pushdown, lines, validate_json, line_filter)
+        assert pushed_count == count
+        _, loader_after = _best(rounds, _loader_pass, archive, engine, filename, None)
+        _, loader_pushed = _best(rounds, _loader_pass, archive, engine, filename, where)
+        print(
+            f"{name:24} {count:>7}/{len(lines):<7} "
+            f"lines {len(lines) / after:>10,.0f} -> {len(lines) / pushed:>10,.0f} lines/s"
+            f" ({after / pushed:4.1f}x)  "
+            f"loader {len(lines) / loader_after:>10,.0f} -> {len(lines) / loader_pushed:>10,.0f}"
+            f" lines/s ({loader_after / loader_pushed:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Compare full-model passes over archive members with projected passes (fields=...).
+
+Each member is read once in memory first, so the numbers show JSON parsing and validation
+only, not zip inflation.
+
+Usage:
+    python benchmarks/bench_projection.py ARCHIVE [--engine slots] [--rounds 3]
+"""
+
+import time
+import zipfile
+
+import click
+
+from bgm_archive.loader.model import Episode, Subject
+from bgm_archive.loader.projection import partial_model
+from bgm_archive.loader.records import record_validator
+
+# member -> (model, projected fields)
+PROJECTIONS = {
+    "subject.jsonlines": (Subject, ("id", "type", "name", "score", "nsfw")),
+    "episode.jsonlines": (Episode, ("id", "subject_id", "sort", "type")),
+}
+
+
+def _validator(model_class, engine: str):
+    if engine == "slots":
+        return record_validator(model_class)
+    return model_class.model_validate_json
+
+
+def _pass_seconds(lines, validate_json) -> tuple[int, float]:
+    count = 0
+    start = time.perf_counter()
+    for line in lines:
+        try:
+            validate_json(line)
+            count += 1
+        except ValueError:
+            pass
+    return count, time.perf_counter() - start
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("--engine", type=click.Choice(["pydantic", "slots"]), default="pydantic")
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+def main(archive: str, engine: str, rounds: int):
+    with zipfile.ZipFile(archive) as source:
+        members = {
+            filename: [line for line in source.read(filename).splitlines() if line.strip()]
+            for filename in PROJECTIONS
+        }
+
+    for filename, (model_class, fields) in PROJECTIONS.items():
+        lines = members[filename]
+        rates = {}
+        for name, target in (("full", model_class), ("fields", partial_model(model_class, fields))):
+            validate_json = _validator(target, engine)
+            count, seconds = min(
+                (_pass_seconds(lines, validate_json) for _ in range(rounds)),
+                key=lambda result: result[1],
+            )
+            rates[name] = count / seconds
+        print(
+            f"{filename:20} {len(lines):>8} lines  "
+            f"full {rates['full']:>10,.0f} rec/s  "
+            f"fields {rates['fields']:>10,.0f} rec/s  "
+            f"({rates['fields'] / rates['full']:.1f}x, {', '.join(fields)})"
+        )
+
+
+if __name__ == "__main__":
+    main()
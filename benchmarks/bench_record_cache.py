@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Compare passes over archive members with and without the validated-record cache.
+
+The cache directory is filled by the first cached pass (which also hashes the archive),
+so repeat passes show what later jobs over the same dump pay.
+
+Usage:
+    python benchmarks/bench_record_cache.py ARCHIVE [--cache-dir DIR] [--member subject.jsonlines]
+"""
+
+import tempfile
+import time
+
+import click
+
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def _pass_seconds(archive: str, filename: str, engine: str, cache_dir) -> tuple[int, float]:
+    loader = WikiArchiveLoader(
+        archive, stop_on_error=False, engine=engine, record_cache_dir=cache_dir
+    )
+    start = time.perf_counter()
+    count = sum(1 for _ in loader.iter_member(filename))
+    return count, time.perf_counter() - start
+
+
+@click.command()
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("--cache-dir", type=click.Path(file_okay=False), default=None)
+@click.option(
+    "--member",
+    "members",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to benchmark (default: all).",
+)
+@click.option("--engine", type=click.Choice(["pydantic", "slots"]), default="pydantic")
+@click.option("--rounds", default=3, show_default=True, help="Best of N rounds.")
+def main(archive: str, cache_dir, members: tuple[str, ...], engine: str, rounds: int):
+    with tempfile.TemporaryDirectory(prefix="bgm-record-cache-") as tmp_dir:
+        cache_dir = cache_dir or tmp_dir
+        for filename in members or WikiArchiveLoader.FILE_MODEL_MAP:
+            count, first = _pass_seconds(archive, filename, engine, cache_dir)
+            archive_seconds = min(
+                _pass_seconds(archive, filename, engine, None)[1] for _ in range(rounds)
+            )
+            cached_seconds = min(
+                _pass_seconds(archive, filename, engine, cache_dir)[1] for _ in range(rounds)
+            )
+            rates = {
+                "archive": count / archive_seconds,
+                "filling": count / first,
+                "cached": count / cached_seconds,
+            }
+            print(
+                f"{filename:32} {count:>10} records  "
+                + "  ".join(f"{name} {rate:>10,.0f} rec/s" for name, rate in rates.items())
+                + f"  x{archive_seconds / cached_seconds:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load test of the `serve` HTTP service on localhost.
+
+Ids and search terms are sampled from the service's database. Requests follow a
+Zipf-skewed popularity over ids (--skew 0 for uniform), like scrapers revisiting hot
+entities, and are spread over a fixed endpoint mix. Each client process runs
+--connections keep-alive connections, so the client is not what limits throughput.
+
+Build the inputs first with:
+    python -m bgm_archive.cli build-index ARCHIVE archive.db
+    python -m bgm_archive.cli build-name-index ARCHIVE names/
+
+Usage:
+    python benchmarks/load_test.py archive.db --serve [--names names/] [-d 10] [-o results.json]
+    python benchmarks/load_test.py archive.db --url http://127.0.0.1:8080 [-p 4] [-c 16] [--skew 1.1]
+"""
+
+import http.client
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import click
+import numpy as np
+
+# (target template, weight); {subject}, {person}, {character} and {query} are sampled
+MIX = [
+    ("/subjects/{subject}", 4),
+    ("/subjects/{subject}/relations", 1),
+    ("/subjects/{subject}/staff", 1),
+    ("/subjects/{subject}/cast", 1),
+    ("/persons/{person}", 1),
+    ("/characters/{character}", 1),
+    ("/search?q={query}", 1),
+]
+
+
+def _sample(db_path: str, limit: int) -> Dict[str, list]:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        values = {
+            kind: [row[0] for row in conn.execute(f"SELECT id FROM {kind} LIMIT ?", (limit,))]
+            for kind in ("subject", "person", "character")
+        }
+        values["query"] = [
+            urllib.parse.quote(row[0])
+            for row in conn.execute(
+                "SELECT CASE WHEN name_cn != '' THEN name_cn ELSE name END FROM subject LIMIT ?",
+                (limit,),
+            )
+        ]
+    finally:
+        conn.close()
+    return values
+
+
+def _targets(values: Dict[str, list], count: int, skew: float, search: bool, seed: int) -> List[str]:
+    """
+    count request targets; the i-th value of each kind is drawn with weight 1 / (i+1)^skew.
+    """
+    rng = np.random.default_rng(seed)
+    mix = [(template, weight) for template, weight in MIX if search or "{query}" not in template]
+    weights = np.array([weight for _, weight in mix], dtype=float)
+    templates = rng.choice(len(mix), size=count, p=weights / weights.sum())
+    draws = {}
+    for kind, kind_values in values.items():
+        ranks = np.arange(1, len(kind_values) + 1, dtype=float)
+        p = ranks**-skew
+        draws[kind] = rng.choice(len(kind_values), size=count, p=p / p.sum())
+    targets = []
+    for i, template_index in enumerate(templates):
+        template = mix[template_index][0]
+        kind = template[template.index("{") + 1 : template.index("}")]
+        targets.append(template.format(**{kind: values[kind][draws[kind][i]]}))
+    return targets
+
+
+def _client(url: str, targets: List[str], connections: int, duration: float) -> dict:
+    """
+    One client process: `connections` threads looping over their share of targets.
+    """
+    parsed = urllib.parse.urlsplit(url)
+    deadline = time.perf_counter() + duration
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+        local_latencies, local_statuses = [], Counter()
+        i = offset
+        while time.perf_counter() < deadline:
+            target = targets[i % len(targets)]
+            i += connections
+            start = time.perf_counter()
+            try:
+                conn.request("GET", target)
+                response = conn.getresponse()
+                response.read()
+                local_statuses[response.status] += 1
+            except (OSError, http.client.HTTPException):
+                local_statuses["error"] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+                continue
+            local_latencies.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"latencies": latencies, "statuses": dict(statuses)}
+
+
+def _start_server(db_path: str, names: Optional[str]) -> tuple:
+    command = [sys.executable, "-m", "bgm_archive.cli", "serve", db_path, "--port", "0"]
+    if names:
+        command += ["--names", names]
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    line = process.stdout.readline()
+    if " on " not in line:
+        process.kill()
+        raise click.ClickException(f"serve did not start: {line!r}")
+    return process, line.rsplit(" on ", 1)[1].strip()
+
+
+def _get_json(url: str, path: str):
+    parsed = urllib.parse.urlsplit(url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    try:
+        conn.request("GET", path)
+        return json.loads(conn.getresponse().read())
+    finally:
+        conn.close()
+
+
+@click.command()
+@click.argument("db_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--url", default="http://127.0.0.1:8080", show_default=True)
+@click.option("--serve", "start_server", is_flag=True, help="Start `serve` on a free port.")
+@click.option("--names", type=click.Path(exists=True, file_okay=False), default=None)
+@click.option("-p", "--processes", type=click.IntRange(min=1), default=2, show_default=True)
+@click.option("-c", "--connections", type=click.IntRange(min=1), default=16, show_default=True)
+@click.option("-d", "--duration", type=float, default=10.0, show_default=True)
+@click.option("--skew", type=float, default=1.1, show_default=True, help="Zipf exponent.")
+@click.option("--sample", type=int, default=100_000, show_default=True, help="Ids per kind.")
+@click.option("--no-search", is_flag=True, help="Leave /search out of the mix.")
+@click.option("-o", "--output", type=click.Path(dir_okay=False), default=None)
+def main(
+    db_path, url, start_server, names, processes, connections, duration, skew, sample, no_search, output
+):
+    server = None
+    if start_server:
+        server, url = _start_server(db_path, names)
+    try:
+        # servers started without --names answer /search with an error object
+        search = not no_search and isinstance(_get_json(url, "/search?q=a"), list)
+        values = _sample(db_path, sample)
+        per_process = max(1000, int(20_000 * duration / processes))
+        target_lists = [
+            _targets(values, per_process, skew, search, seed) for seed in range(processes)
+        ]
+
+        start = time.perf_counter()
+        with ProcessPoolExecutor(processes) as executor:
+            results = list(
+                executor.map(
+                    _client,
+                    [url] * processes,
+                    target_lists,
+                    [connections] * processes,
+                    [duration] * processes,
+                )
+            )
+        elapsed = time.perf_counter() - start
+        server_stats = _get_json(url, "/stats")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    latencies = np.array([value for result in results for value in result["latencies"]]) * 1000
+    statuses: Counter = Counter()
+    for result in results:
+        statuses.update(result["statuses"])
+    cache = server_stats["cache"]
+    lookups = cache["hits"] + cache["misses"]
+    summary = {
+        "url": url,
+        "processes": processes,
+        "connections": processes * connections,
+        "skew": skew,
+        "search": search,
+        "requests": int(len(latencies)),
+        "seconds": round(elapsed, 2),
+        "requests_per_sec": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            name: round(float(np.percentile(latencies, q)), 3) if len(latencies) else None
+            for name, q in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))
+        },
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "cache_hit_rate": round(cache["hits"] / lookups, 3) if lookups else None,
+        "cache": cache,
+    }
+
+    print(json.dumps(summary, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Score and favorite analytics over subjects, computed on NumPy columns.
+
+Subjects are streamed into chunks of columns (see archive_chunks()), so no record outlives
+its chunk; lines are parsed into a projection of the seven fields used here, which skips
+materializing infoboxes and summaries. Each chunk is folded into running group-by sums keyed by (type,
+platform): score histogram, votes and favorites. Only six small per-subject columns are
+kept for the per-type statistics that need every subject:
+
+- Bayesian-weighted scores, (v * R + m * C) / (v + m) with v the votes of a subject, R
+  the mean of its score_details, C the mean vote of its SubjectType and m the prior
+  weight in votes (by default the median votes of the type's rated subjects)
+- rank checks: Subject.rank against the Bayesian ordering (Spearman correlation), ranks
+  given to subjects without votes, duplicate ranks, and scores that do not match the mean
+  of score_details
+
+Chunks can also be cut from the memory-mapped subjects of a ColumnarCache, whose column
+names are the same (see cache_chunks()).
+"""
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydantic import TypeAdapter, ValidationError
+from typing_extensions import TypedDict  # pydantic needs it on Python < 3.12
+
+from ..loader.model import Subject, SubjectType
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+BUCKETS = list(range(1, 11))
+FAVORITE_KEYS = ["wish", "done", "doing", "on_hold", "dropped"]
+
+# Columns of a chunk, named like the ColumnarCache subject columns.
+COLUMNS = [
+    ("id", np.int32),
+    ("type", np.int8),
+    ("platform", np.int16),
+    ("score", np.float32),
+    ("rank", np.int32),
+    *[(f"score_{bucket}", np.int32) for bucket in BUCKETS],
+    *[(f"favorite_{key}", np.int32) for key in FAVORITE_KEYS],
+]
+
+# |score - mean of score_details| above which a score does not match its histogram; scores
+# are published with one decimal
+SCORE_TOLERANCE = 0.051
+
+Chunk = Dict[str, np.ndarray]
+
+_BUCKET_KEYS = [str(bucket) for bucket in BUCKETS]
+_EMPTY_DETAILS: Dict[str, int] = {}
+
+
+class _FavoriteFields(TypedDict):
+    wish: int
+    done: int
+    doing: int
+    on_hold: int
+    dropped: int
+
+
+class _ScoreFields(TypedDict):
+    id: int
+    type: int
+    platform: int
+    score: float
+    rank: int
+    score_details: Optional[Dict[str, int]]
+    favorite: _FavoriteFields
+
+
+# other keys of the line are skipped by the parser rather than built into str objects
+_score_fields = TypeAdapter(_ScoreFields)
+
+
+def _row(record: Dict[str, Any]) -> Tuple:
+    score_details = record.get("score_details") or _EMPTY_DETAILS
+    favorite = record["favorite"]
+    return (
+        record["id"],
+        record["type"],
+        record["platform"],
+        record["score"],
+        record["rank"],
+        *[score_details.get(bucket, 0) for bucket in _BUCKET_KEYS],
+        *[favorite[key] for key in FAVORITE_KEYS],
+    )
+
+
+def _to_chunk(rows: List[Tuple]) -> Chunk:
+    # one C-level conversion per chunk; every value fits a float64 exactly
+    block = np.array(rows, dtype=np.float64)
+    return {name: block[:, i].astype(dtype) for i, (name, dtype) in enumerate(COLUMNS)}
+
+
+def subject_chunks(
+    records: Iterable[Dict[str, Any]], chunk_rows: int = 65536
+) -> Iterator[Chunk]:
+    """
+    Columns of subjects, chunk_rows subjects at a time.
+
+    Args:
+        records: Subject dicts with the archive's keys (score_details keyed "1".."10"),
+            e.g. from RawWikiArchiveLoader.subjects()
+
+    Yields:
+        Dicts mapping the names in COLUMNS to arrays of equal length
+    """
+    if chunk_rows < 1:
+        raise ValueError(f"chunk_rows must be positive, got {chunk_rows}")
+    rows = []
+    for record in records:
+        rows.append(_row(record))
+        if len(rows) >= chunk_rows:
+            yield _to_chunk(rows)
+            rows = []
+    if rows:
+        yield _to_chunk(rows)
+
+
+def archive_chunks(loader: WikiArchiveLoader, chunk_rows: int = 65536) -> Iterator[Chunk]:
+    """
+    Chunks of the subjects of an archive, parsing only the fields in COLUMNS.
+
+    Lines failing the projection's checks go to the loader's error handling, i.e. raise
+    with stop_on_error and are counted and skipped otherwise.
+    """
+
+    def records():
+        for line_number, line in loader.iter_raw_lines("subject.jsonlines"):
+            try:
+                yield _score_fields.validate_json(line)
+            except ValidationError as e:
+                loader.record_error(Subject, e, line_number)
+
+    return subject_chunks(records(), chunk_rows)
+
+
+def cache_chunks(cache, chunk_rows: int = 1 << 20) -> Iterator[Chunk]:
+    """
+    Chunks of the subjects of a ColumnarCache, read from its memory-mapped columns.
+    """
+    subjects = cache.subjects
+    for start in range(0, len(subjects), chunk_rows):
+        yield {
+            name: np.asarray(subjects[name][start : start + chunk_rows], dtype=dtype)
+            for name, dtype in COLUMNS
+        }
+
+
+def bayesian_scores(
+    votes: np.ndarray, means: np.ndarray, prior_votes: float, prior_mean: float
+) -> np.ndarray:
+    """
+    (v * R + m * C) / (v + m) per subject; subjects without votes get C.
+    """
+    votes = votes.astype(np.float64)
+    total = votes + prior_votes
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weighted = (votes * means + prior_votes * prior_mean) / total
+    return np.where(total > 0, weighted, prior_mean)
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """
+    0-based ranks of values, ties broken by position (enough for a Spearman estimate).
+    """
+    ranks = np.empty(len(values), dtype=np.float64)
+    ranks[np.argsort(values, kind="stable")] = np.arange(len(values))
+    return ranks
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> Optional[float]:
+    if len(a) < 2:
+        return None
+    ranks_a, ranks_b = _ranks(a), _ranks(b)
+    return float(np.corrcoef(ranks_a, ranks_b)[0, 1])
+
+
+class SubjectScoreAnalytics:
+    """
+    Accumulates chunks and computes the aggregates:
+
+        analytics = SubjectScoreAnalytics()
+        for chunk in subject_chunks(loader.subjects()):
+            analytics.add(chunk)
+        report = analytics.report()
+    """
+
+    # per-group sums: subjects, rated subjects, votes, sum of votes * score, histogram,
+    # favorites
+    _SUMS = [
+        "subjects",
+        "rated",
+        "votes",
+        "vote_points",
+        *[f"score_{bucket}" for bucket in BUCKETS],
+        *[f"favorite_{key}" for key in FAVORITE_KEYS],
+    ]
+
+    def __init__(self):
+        self.__groups: Dict[Tuple[int, int], np.ndarray] = {}
+        # per-subject columns, one array per chunk
+        self.__kept: Dict[str, List[np.ndarray]] = {
+            name: [] for name in ("id", "type", "rank", "score", "votes", "mean")
+        }
+        self.subjects = 0
+
+    def add(self, chunk: Chunk):
+        histogram = np.stack([chunk[f"score_{bucket}"] for bucket in BUCKETS], axis=1)
+        histogram = histogram.astype(np.int64)
+        votes = histogram.sum(axis=1)
+        points = histogram @ np.arange(1, 11, dtype=np.int64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = np.where(votes > 0, points / np.maximum(votes, 1), 0.0)
+
+        # group-by (type, platform): one bincount per summed column
+        keys = chunk["type"].astype(np.int64) * 65536 + chunk["platform"].astype(np.int64)
+        group_keys, inverse = np.unique(keys, return_inverse=True)
+        columns = [
+            np.ones(len(keys)),
+            (votes > 0).astype(np.float64),
+            votes,
+            points,
+            *histogram.T,
+            *[chunk[f"favorite_{key}"] for key in FAVORITE_KEYS],
+        ]
+        sums = np.stack(
+            [
+                np.bincount(inverse, weights=column, minlength=len(group_keys))
+                for column in columns
+            ],
+            axis=1,
+        ).astype(np.int64)
+        for key, row in zip(group_keys.tolist(), sums):
+            # platform is an int16, so the remainder recovers it even when negative
+            group = ((key + 32768) // 65536, (key + 32768) % 65536 - 32768)
+            if group in self.__groups:
+                self.__groups[group] += row
+            else:
+                self.__groups[group] = row
+
+        kept = self.__kept
+        kept["id"].append(chunk["id"].astype(np.int32))
+        kept["type"].append(chunk["type"].astype(np.int8))
+        kept["rank"].append(chunk["rank"].astype(np.int32))
+        kept["score"].append(chunk["score"].astype(np.float32))
+        kept["votes"].append(votes.astype(np.int32))
+        kept["mean"].append(means.astype(np.float32))
+        self.subjects += len(keys)
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        The kept per-subject columns: id, type, rank, score, votes and mean (of score_details).
+        """
+        return {
+            name: np.concatenate(arrays) if arrays else np.empty(0)
+            for name, arrays in self.__kept.items()
+        }
+
+    def groups(self) -> List[Dict[str, Any]]:
+        """
+        Aggregates per (type, platform), sorted by type and platform.
+        """
+        result = []
+        for (subject_type, platform), row in sorted(self.__groups.items()):
+            sums = dict(zip(self._SUMS, row.tolist()))
+            favorites = {key: sums[f"favorite_{key}"] for key in FAVORITE_KEYS}
+            total = sum(favorites.values())
+            finished = favorites["done"] + favorites["dropped"]
+            result.append(
+                {
+                    "type": subject_type,
+                    "type_name": _type_name(subject_type),
+                    "platform": platform,
+                    "subjects": sums["subjects"],
+                    "rated": sums["rated"],
+                    "votes": sums["votes"],
+                    "mean_vote": sums["vote_points"] / sums["votes"] if sums["votes"] else None,
+                    "histogram": [sums[f"score_{bucket}"] for bucket in BUCKETS],
+                    "favorites": favorites,
+                    "done_ratio": favorites["done"] / total if total else None,
+                    "wish_ratio": favorites["wish"] / total if total else None,
+                    "dropped_ratio": favorites["dropped"] / total if total else None,
+                    "drop_rate": favorites["dropped"] / finished if finished else None,
+                }
+            )
+        return result
+
+    def scores_by_type(
+        self, prior_votes: Optional[float] = None, top: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Bayesian scores and rank checks per SubjectType.
+
+        Args:
+            prior_votes: m of the Bayesian average, the median votes of the type's rated
+                subjects by default
+            top: Number of best subjects by Bayesian score to list per type
+        """
+        columns = self.columns()
+        result = []
+        for subject_type in np.unique(columns["type"]).tolist():
+            mask = columns["type"] == subject_type
+            ids, ranks, scores = columns["id"][mask], columns["rank"][mask], columns["score"][mask]
+            votes, means = columns["votes"][mask], columns["mean"][mask].astype(np.float64)
+            rated = votes > 0
+            total_votes = int(votes.sum())
+            prior_mean = float((votes * means).sum() / total_votes) if total_votes else 0.0
+            if prior_votes is not None:
+                m = float(prior_votes)
+            else:
+                m = float(np.median(votes[rated])) if rated.any() else 0.0
+            bayesian = bayesian_scores(votes, means, m, prior_mean)
+
+            ranked = ranks > 0
+            unique_ranks = np.unique(ranks[ranked])
+            best = np.argsort(-bayesian[rated], kind="stable")[:top]
+            result.append(
+                {
+                    "type": subject_type,
+                    "type_name": _type_name(subject_type),
+                    "subjects": int(mask.sum()),
+                    "rated": int(rated.sum()),
+                    "prior_votes": m,
+                    "prior_mean": prior_mean,
+                    "top": [
+                        {"id": int(i), "bayesian": round(float(b), 4), "votes": int(v)}
+                        for i, b, v in zip(
+                            ids[rated][best], bayesian[rated][best], votes[rated][best]
+                        )
+                    ],
+                    "rank_checks": {
+                        "ranked": int(ranked.sum()),
+                        "ranked_without_votes": int((ranked & ~rated).sum()),
+                        "duplicate_ranks": int(ranked.sum() - len(unique_ranks)),
+                        "score_mismatches": int(
+                            (rated & (np.abs(scores - means) > SCORE_TOLERANCE)).sum()
+                        ),
+                        # rank 1 is best, so ranks are compared with -bayesian: 1.0 is the
+                        # same ordering
+                        "spearman_vs_bayesian": _spearman(
+                            ranks[ranked].astype(np.float64), -bayesian[ranked]
+                        ),
+                    },
+                }
+            )
+        return result
+
+    def report(self, prior_votes: Optional[float] = None, top: int = 10) -> Dict[str, Any]:
+        return {
+            "subjects": self.subjects,
+            "groups": self.groups(),
+            "types": self.scores_by_type(prior_votes, top),
+        }
+
+
+def _type_name(subject_type: int) -> Optional[str]:
+    try:
+        return SubjectType(subject_type).name
+    except ValueError:
+        return None
+
+
+def analyze_subjects(
+    chunks: Iterable[Chunk], prior_votes: Optional[float] = None, top: int = 10
+) -> Dict[str, Any]:
+    """
+    Report of SubjectScoreAnalytics over chunks, see the module docstring.
+    """
+    analytics = SubjectScoreAnalytics()
+    for chunk in chunks:
+        analytics.add(chunk)
+    return analytics.report(prior_votes, top)
@@ -0,0 +1,62 @@
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from bgm_archive.analytics.subject_scores import (
+    analyze_subjects,
+    archive_chunks,
+    bayesian_scores,
+    cache_chunks,
+)
+from bgm_archive.loader.columnar import ColumnarCache
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def test_groups_match_per_subject_loop(wiki_archive_path):
+    report = analyze_subjects(archive_chunks(WikiArchiveLoader(str(wiki_archive_path)), 7))
+
+    expected = defaultdict(lambda: {"subjects": 0, "votes": 0, "points": 0, "done": 0, "total": 0})
+    for subject in WikiArchiveLoader(str(wiki_archive_path)).subjects():
+        group = expected[(subject.type, subject.platform)]
+        details = subject.score_details.model_dump() if subject.score_details else {}
+        group["subjects"] += 1
+        group["votes"] += sum(details.values())
+        group["points"] += sum(int(key.removeprefix("score_")) * n for key, n in details.items())
+        group["done"] += subject.favorite.done
+        group["total"] += sum(subject.favorite.model_dump().values())
+
+    assert report["subjects"] == 20
+    assert [(g["type"], g["platform"]) for g in report["groups"]] == sorted(expected)
+    for group in report["groups"]:
+        values = expected[(group["type"], group["platform"])]
+        assert group["subjects"] == values["subjects"]
+        assert group["votes"] == sum(group["histogram"]) == values["votes"]
+        assert group["mean_vote"] == pytest.approx(values["points"] / values["votes"])
+        assert group["done_ratio"] == pytest.approx(values["done"] / values["total"])
+
+
+def test_rank_checks(wiki_archive_path):
+    report = analyze_subjects(archive_chunks(WikiArchiveLoader(str(wiki_archive_path))), top=3)
+    anime = next(scores for scores in report["types"] if scores["type_name"] == "ANIME")
+
+    assert anime["rated"] == 2
+    # subject 8 has more votes and a higher mean than subject 12
+    assert [entry["id"] for entry in anime["top"]] == [8, 12]
+    assert anime["rank_checks"]["ranked"] == 2
+    assert anime["rank_checks"]["score_mismatches"] == 0
+    assert anime["rank_checks"]["spearman_vs_bayesian"] == pytest.approx(1.0)
+    # subject 11 has votes but no rank
+    book = next(scores for scores in report["types"] if scores["type_name"] == "BOOK")
+    assert book["rank_checks"]["ranked"] == book["rated"] - 1
+
+
+def test_columnar_cache_gives_the_same_report(wiki_archive_path, tmp_path):
+    cache = ColumnarCache.build(str(wiki_archive_path), str(tmp_path / "columns"))
+    streamed = analyze_subjects(archive_chunks(WikiArchiveLoader(str(wiki_archive_path))))
+    assert analyze_subjects(cache_chunks(cache, chunk_rows=6)) == streamed
+
+
+def test_bayesian_scores():
+    scores = bayesian_scores(np.array([0, 10, 1000]), np.array([0.0, 9.0, 9.0]), 10, 7.0)
+    assert scores.tolist() == pytest.approx([7.0, 8.0, 9.0 - 20 / 1010])
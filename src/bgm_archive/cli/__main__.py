@@ -1,5 +1,18 @@
 import click
 from .validate_archive import validate_wiki_archive
+from .export_columns import export_columns
+from .build_index import build_archive_index
+from .build_graph import build_relation_graph
+from .archive_diff import archive_diff
+from .generate_archive import generate_synthetic_archive
+from .es_ingest import es_ingest
+from .build_name_index import build_name_index
+from .search import search
+from .serve import serve
+from .export_documents import export_documents
+from .subject_stats import subject_stats
+from .history_ingest import history_ingest
+from .history_show import history_show
 
 
 @click.group()
@@ -10,6 +23,19 @@ def cli():
 
 # Register commands
 cli.add_command(validate_wiki_archive)
+cli.add_command(export_columns)
+cli.add_command(build_archive_index)
+cli.add_command(build_relation_graph)
+cli.add_command(archive_diff)
+cli.add_command(generate_synthetic_archive)
+cli.add_command(es_ingest)
+cli.add_command(build_name_index)
+cli.add_command(search)
+cli.add_command(serve)
+cli.add_command(export_documents)
+cli.add_command(subject_stats)
+cli.add_command(history_ingest)
+cli.add_command(history_show)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,45 @@
+import sys
+import click
+from pathlib import Path
+from ..diff.archive_diff import diff_archives
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@click.command("archive-diff")
+@click.argument("old", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "-o",
+    "--output",
+    type=click.File("w", encoding="utf-8"),
+    default="-",
+    help="Jsonlines delta file, stdout by default.",
+)
+@click.option(
+    "--member",
+    "members",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to diff (default: all).",
+)
+def archive_diff(old: Path, new: Path, output, members: tuple[str, ...]):
+    """
+    Diff two Bangumi wiki archives and emit added/changed/removed records as jsonlines.
+
+    Args:
+        old: Path to the older archive
+        new: Path to the newer archive
+
+    Returns:
+        Dictionary mapping member names to Counters of added/changed/removed/unchanged
+    """
+    results = diff_archives(str(old), str(new), output, members or None)
+
+    # the delta may go to stdout, so the summary goes to stderr
+    print("Diff Summary:", file=sys.stderr)
+    for filename, counts in results.items():
+        summary = ", ".join(
+            f"{counts[op]} {op}" for op in ("added", "changed", "removed", "unchanged")
+        )
+        print(f"  {filename}: {summary}", file=sys.stderr)
+    return results
@@ -0,0 +1,31 @@
+import click
+from pathlib import Path
+from ..graph.csr_graph import RelationGraph
+
+
+@click.command("build-graph")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("out", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "--validate/--trusted",
+    default=False,
+    help="Validate relation lines with the Pydantic models instead of only parsing them.",
+)
+def build_relation_graph(path: Path, out: Path, validate: bool):
+    """
+    Build CSR relation graphs from a Bangumi wiki archive and save them as .npz.
+
+    Args:
+        path: Path to the archive file
+        out: Path of the .npz file to write
+
+    Returns:
+        The RelationGraph
+    """
+    graph = RelationGraph.from_archive(str(path), trusted=not validate)
+    graph.save(str(out))
+
+    print(f"Saved relation graphs to {out}:")
+    for name, csr in graph.graphs.items():
+        print(f"  {name}: {len(csr.nodes)} sources, {len(csr)} edges")
+    return graph
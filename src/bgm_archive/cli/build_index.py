@@ -0,0 +1,40 @@
+import os
+import time
+import click
+from pathlib import Path
+from ..index.sqlite_index import build_index
+
+
+@click.command("build-index")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("out", type=click.Path(dir_okay=False, path_type=Path))
+@click.option("--force", is_flag=True, help="Replace OUT if it exists.")
+@click.option("--batch-size", default=10_000, show_default=True, help="Entries per executemany.")
+@click.option(
+    "--commit-every", default=500_000, show_default=True, help="Rows per transaction."
+)
+def build_archive_index(path: Path, out: Path, force: bool, batch_size: int, commit_every: int):
+    """
+    Build an indexed SQLite database from a Bangumi wiki archive.
+
+    Args:
+        path: Path to the archive file
+        out: Path of the SQLite database to create
+
+    Returns:
+        Dictionary mapping member names to numbers of loaded entries
+    """
+    if out.exists():
+        if not force:
+            raise click.ClickException(f"{out} already exists, use --force to replace it")
+        os.remove(out)
+
+    start = time.perf_counter()
+    counts = build_index(
+        str(path), str(out), batch_size=batch_size, commit_every=commit_every, progress=True
+    )
+
+    print(f"\nBuilt {out} in {time.perf_counter() - start:.1f}s:")
+    for filename, count in counts.items():
+        print(f"  {filename}: {count} entries")
+    return counts
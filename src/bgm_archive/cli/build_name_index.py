@@ -0,0 +1,36 @@
+import click
+from pathlib import Path
+from ..index.name_index import NameIndex
+
+
+@click.command("build-name-index")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("index_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("--force", is_flag=True, help="Rebuild even if the index is up to date.")
+@click.option(
+    "--hash/--no-hash",
+    "with_hash",
+    default=False,
+    help="Record the archive's sha256, so a touched but unchanged archive keeps its index.",
+)
+def build_name_index(path: Path, index_dir: Path, force: bool, with_hash: bool):
+    """
+    Build the full-text index of subject, person and character names used by search.
+
+    Args:
+        path: Path to the archive file
+        index_dir: Output directory of the name index
+
+    Returns:
+        The NameIndex
+    """
+    if not force and not NameIndex.is_stale(str(index_dir), str(path)):
+        print(f"Name index at {index_dir} is up to date")
+        return NameIndex(str(index_dir))
+
+    index = NameIndex.build(str(path), str(index_dir), with_hash=with_hash)
+    manifest = index.manifest
+    documents = ", ".join(f"{count} {kind}s" for kind, count in manifest["documents"].items())
+    print(f"Indexed {documents} into {index_dir}:")
+    print(f"  {manifest['terms']} terms, {manifest['postings']} postings")
+    return index
@@ -0,0 +1,82 @@
+import click
+from pathlib import Path
+from ..index.es_bulk import ingest_archive
+from ..loader.raw_loader import RawWikiArchiveLoader
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@click.command("es-ingest")
+@click.argument("path", type=click.Path(exists=True, path_type=Path))
+@click.argument("url")
+@click.option(
+    "--member",
+    "members",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to ingest (default: all).",
+)
+@click.option("--index-prefix", default="bgm", show_default=True, help="Prefix of index names.")
+@click.option(
+    "--max-bytes",
+    type=click.IntRange(min=1),
+    default=5 * 2**20,
+    show_default=True,
+    help="Maximum body size of one _bulk request.",
+)
+@click.option(
+    "-c",
+    "--concurrency",
+    type=click.IntRange(min=1),
+    default=4,
+    show_default=True,
+    help="Maximum number of _bulk requests in flight.",
+)
+@click.option("--max-retries", type=click.IntRange(min=0), default=5, show_default=True)
+@click.option(
+    "--validate/--trusted",
+    default=True,
+    help="Validate entries with the Pydantic models, or only parse them.",
+)
+def es_ingest(
+    path: Path,
+    url: str,
+    members: tuple[str, ...],
+    index_prefix: str,
+    max_bytes: int,
+    concurrency: int,
+    max_retries: int,
+    validate: bool,
+):
+    """
+    Bulk index a Bangumi wiki archive into Elasticsearch, one index per member.
+
+    Args:
+        path: Path to the zip archive or a directory of members
+        url: Base URL of the cluster, e.g. http://localhost:9200
+
+    Returns:
+        IngestStats of the run
+    """
+    if validate:
+        loader = WikiArchiveLoader(str(path), stop_on_error=False)
+    else:
+        loader = RawWikiArchiveLoader(str(path))
+    with loader:
+        stats = ingest_archive(
+            loader,
+            url,
+            members=members or None,
+            prefix=index_prefix,
+            max_bytes=max_bytes,
+            concurrency=concurrency,
+            max_retries=max_retries,
+        )
+
+    print(
+        f"Indexed {stats.indexed} of {stats.docs} documents in {stats.seconds:.1f}s"
+        f" ({stats.docs_per_sec:,.0f} docs/s, {stats.requests} requests,"
+        f" {stats.retried_items} items retried, {stats.failed} failed)"
+    )
+    for error in stats.errors:
+        print(f"  - {error}")
+    return stats
@@ -0,0 +1,43 @@
+import click
+from pathlib import Path
+from ..loader.columnar import ColumnarCache
+
+
+@click.command("export-columns")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("cache_dir", type=click.Path(file_okay=False, path_type=Path))
+@click.option("--force", is_flag=True, help="Rebuild even if the cache is up to date.")
+@click.option(
+    "--hash/--no-hash",
+    "with_hash",
+    default=False,
+    help="Record the archive's sha256, so a touched but unchanged archive keeps its cache.",
+)
+@click.option(
+    "--validate-sample-rate",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Fully validate 1 in N records while exporting.",
+)
+def export_columns(path: Path, cache_dir: Path, force: bool, with_hash: bool, validate_sample_rate):
+    """
+    Export numeric subject/person/character fields as memory-mappable .npy columns.
+
+    Args:
+        path: Path to the archive file
+        cache_dir: Output directory of the columnar cache
+
+    Returns:
+        The ColumnarCache
+    """
+    if not force and not ColumnarCache.is_stale(str(cache_dir), str(path)):
+        print(f"Columnar cache at {cache_dir} is up to date")
+        return ColumnarCache(str(cache_dir))
+
+    cache = ColumnarCache.build(
+        str(path), str(cache_dir), with_hash=with_hash, validate_sample_rate=validate_sample_rate
+    )
+    print(f"Exported columns to {cache_dir}:")
+    for name, meta in cache.manifest["entities"].items():
+        print(f"  {name}: {meta['rows']} rows, {len(meta['columns'])} columns")
+    return cache
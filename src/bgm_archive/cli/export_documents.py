@@ -0,0 +1,60 @@
+import time
+import click
+from pathlib import Path
+from ..join.subject_documents import write_subject_documents
+from ..loader.raw_loader import RawWikiArchiveLoader
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@click.command("export-documents")
+@click.argument("path", type=click.Path(exists=True, path_type=Path))
+@click.argument("out")
+@click.option(
+    "--memory-mb",
+    type=click.IntRange(min=1),
+    default=512,
+    show_default=True,
+    help="Memory budget of the sort buffers; larger archives spill to --tmp-dir.",
+)
+@click.option(
+    "--tmp-dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Directory of the spilled sort runs (default: system temp directory).",
+)
+@click.option(
+    "--validate/--trusted",
+    default=False,
+    help="Validate entries with the Pydantic models, or only parse them.",
+)
+def export_documents(path: Path, out: str, memory_mb: int, tmp_dir: Path, validate: bool):
+    """
+    Write one denormalized JSON document per subject, with its episodes, staff, cast
+    (with voice actors) and related subjects.
+
+    Args:
+        path: Path to the archive file
+        out: Output jsonlines path, gzip-compressed if it ends with .gz, "-" for stdout
+
+    Returns:
+        Counts of written documents and skipped orphan entries
+    """
+    if validate:
+        loader = WikiArchiveLoader(str(path), stop_on_error=False)
+    else:
+        loader = RawWikiArchiveLoader(str(path))
+    start = time.perf_counter()
+    with loader:
+        stats = write_subject_documents(
+            loader,
+            out,
+            memory_budget=memory_mb * 2**20,
+            tmp_dir=str(tmp_dir) if tmp_dir else None,
+        )
+
+    if out != "-":
+        print(f"Wrote {stats['documents']} documents to {out} in {time.perf_counter() - start:.1f}s")
+        for name, count in stats.items():
+            if name.startswith("orphan_") and count:
+                print(f"  skipped {count} {name.removeprefix('orphan_')} of missing subjects")
+    return stats
@@ -0,0 +1,67 @@
+import click
+from pathlib import Path
+from ..loader.synthetic import generate_archive
+
+
+def _parse_rows(ctx, param, values: tuple[str, ...]) -> dict:
+    rows = {}
+    for value in values:
+        member, sep, count = value.partition("=")
+        if not sep or not count.isdigit():
+            raise click.BadParameter(f"expected MEMBER=COUNT, got {value!r}")
+        rows[member if member.endswith(".jsonlines") else f"{member}.jsonlines"] = int(count)
+    return rows
+
+
+@click.command("generate-archive")
+@click.argument("out", type=click.Path(dir_okay=False, path_type=Path))
+@click.option(
+    "--scale",
+    type=click.FloatRange(min=0, min_open=True),
+    default=1.0,
+    show_default=True,
+    help="Multiplier of the default row counts (about a full dump at 1.0).",
+)
+@click.option(
+    "--rows",
+    multiple=True,
+    callback=_parse_rows,
+    help="Explicit row count of a member, e.g. --rows episode=20000000.",
+)
+@click.option("--seed", default=0, show_default=True)
+@click.option(
+    "--invalid-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    show_default=True,
+    help="Fraction of lines made invalid on purpose.",
+)
+@click.option("--compresslevel", type=click.IntRange(0, 9), default=6, show_default=True)
+def generate_synthetic_archive(
+    out: Path, scale: float, rows: dict, seed: int, invalid_rate: float, compresslevel: int
+):
+    """
+    Generate a synthetic archive at dump scale from the bundled fixture records.
+
+    Args:
+        out: Path of the zip archive to write
+
+    Returns:
+        Dictionary mapping member names to row counts
+    """
+    try:
+        counts = generate_archive(
+            str(out),
+            rows=rows,
+            scale=scale,
+            seed=seed,
+            invalid_rate=invalid_rate,
+            compresslevel=compresslevel,
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+    print(f"Wrote {out} ({out.stat().st_size / 2**20:.1f} MiB):")
+    for filename, count in counts.items():
+        print(f"  {filename}: {count} lines")
+    return counts
@@ -0,0 +1,49 @@
+import time
+import click
+from pathlib import Path
+from ..history.history_store import HistoryStore, dump_date
+
+
+@click.command("history-ingest")
+@click.argument("db", type=click.Path(dir_okay=False, path_type=Path))
+@click.argument(
+    "archives", nargs=-1, required=True, type=click.Path(exists=True, path_type=Path)
+)
+@click.option(
+    "--date",
+    default=None,
+    help="Date of the dump (YYYY-MM-DD), for a single archive without a date in its name.",
+)
+def history_ingest(db: Path, archives: tuple[Path, ...], date):
+    """
+    Add Bangumi wiki archives to a history store, oldest first; unchanged records are
+    stored once.
+
+    Args:
+        db: Path of the history database, created if missing
+        archives: Paths to the archives, dated by their file names
+
+    Returns:
+        Dictionary mapping dump dates to the per-member counts of HistoryStore.ingest()
+    """
+    if date is not None and len(archives) > 1:
+        raise click.BadParameter("--date needs a single archive", param_hint="--date")
+    try:
+        dated = [(date or dump_date(str(path)), path) for path in archives]
+    except ValueError as e:
+        raise click.ClickException(f"{e}, pass --date") from e
+
+    results = {}
+    with HistoryStore(str(db)) as store:
+        for dump, path in sorted(dated):
+            start = time.perf_counter()
+            try:
+                results[dump] = store.ingest(str(path), dump)
+            except ValueError as e:
+                raise click.ClickException(str(e)) from e
+            print(f"{dump} {path.name}: {time.perf_counter() - start:.1f}s")
+            for filename, counts in results[dump].items():
+                summary = ", ".join(f"{count} {op}" for op, count in counts.items())
+                print(f"  {filename}: {summary}")
+        print(", ".join(f"{count} {table}s" for table, count in store.counts().items()))
+    return results
@@ -0,0 +1,40 @@
+import json
+import click
+from pathlib import Path
+from ..history.history_store import ENTITY_MEMBERS, HistoryStore
+
+
+@click.command("history-show")
+@click.argument("db", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("entity_type", type=click.Choice(list(ENTITY_MEMBERS)))
+@click.argument("entity_id", type=int)
+@click.option("--at", "date", default=None, help="Show the entity as of this date (YYYY-MM-DD).")
+def history_show(db: Path, entity_type: str, entity_id: int, date):
+    """
+    Print the versions of an entity in a history store, or the entity as of a date, as JSON.
+
+    Args:
+        db: Path of the history database
+        entity_type: subject, person, character or episode
+        entity_id: Id of the entity
+
+    Returns:
+        The entity as of --at, or the list of its versions
+    """
+    with HistoryStore(str(db)) as store:
+        if date is not None:
+            try:
+                result = store.get_entity_at(entity_type, entity_id, date)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--at") from e
+            if result is None:
+                raise click.ClickException(f"No {entity_type} {entity_id} on {date}")
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        else:
+            result = store.history(entity_type, entity_id)
+            versions = [
+                {"valid_from": v.valid_from, "valid_to": v.valid_to, "record": v.record}
+                for v in result
+            ]
+            print(json.dumps(versions, ensure_ascii=False, indent=2))
+    return result
@@ -0,0 +1,45 @@
+import json
+import time
+import click
+from dataclasses import asdict
+from pathlib import Path
+from ..index.name_index import KINDS, NameIndex
+
+
+@click.command("search")
+@click.argument("index_dir", type=click.Path(exists=True, file_okay=False, path_type=Path))
+@click.argument("query", nargs=-1, required=True)
+@click.option(
+    "--kind",
+    "kinds",
+    multiple=True,
+    type=click.Choice([kind for kind, _ in KINDS]),
+    help="Only return these kinds of entities (default: all).",
+)
+@click.option("-n", "--limit", type=click.IntRange(min=1), default=20, show_default=True)
+@click.option("--json", "as_json", is_flag=True, help="Print one JSON hit per line.")
+def search(index_dir: Path, query: tuple[str, ...], kinds: tuple[str, ...], limit: int, as_json: bool):
+    """
+    Search subject, person and character names in an index built by build-name-index.
+
+    Args:
+        index_dir: Directory of the name index
+        query: Words of the query, joined by spaces
+
+    Returns:
+        List of SearchHit, best first
+    """
+    index = NameIndex(str(index_dir))
+    start = time.perf_counter()
+    hits = index.search(" ".join(query), kinds=kinds or None, limit=limit)
+    elapsed = time.perf_counter() - start
+
+    for hit in hits:
+        if as_json:
+            print(json.dumps(asdict(hit), ensure_ascii=False))
+        else:
+            name = f"{hit.name} / {hit.name_cn}" if hit.name_cn else hit.name
+            print(f"{hit.kind:<9} {hit.id:>8}  {hit.score:.3f}  {name}")
+    if not as_json:
+        print(f"{len(hits)} hits in {elapsed * 1000:.1f}ms")
+    return hits
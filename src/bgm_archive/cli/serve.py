@@ -0,0 +1,60 @@
+import click
+from pathlib import Path
+from ..service.server import ArchiveHTTPServer, ArchiveService, ResponseCache
+
+
+@click.command("serve")
+@click.argument("db_path", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option(
+    "--names",
+    "name_index_dir",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Name index built by build-name-index, enables /search.",
+)
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=click.IntRange(min=0), default=8080, show_default=True)
+@click.option(
+    "--cache-entries",
+    type=click.IntRange(min=0),
+    default=100_000,
+    show_default=True,
+    help="Maximum number of cached responses (0 disables the cache).",
+)
+@click.option(
+    "--cache-mb",
+    type=click.IntRange(min=0),
+    default=256,
+    show_default=True,
+    help="Maximum size of the cached responses.",
+)
+@click.option("--access-log", is_flag=True, help="Log every request to stderr.")
+def serve(
+    db_path: Path,
+    name_index_dir: Path,
+    host: str,
+    port: int,
+    cache_entries: int,
+    cache_mb: int,
+    access_log: bool,
+):
+    """
+    Serve entity, relation, staff/cast and name lookups over HTTP as JSON.
+
+    Args:
+        db_path: Database built by build-index
+    """
+    service = ArchiveService(
+        str(db_path),
+        str(name_index_dir) if name_index_dir else None,
+        ResponseCache(max_entries=cache_entries, max_bytes=cache_mb * 2**20),
+    )
+    server = ArchiveHTTPServer((host, port), service, access_log=access_log)
+    print(f"Serving {db_path} on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
@@ -0,0 +1,97 @@
+import json
+import time
+import click
+from pathlib import Path
+from ..analytics.subject_scores import analyze_subjects, archive_chunks, cache_chunks
+from ..loader.columnar import ColumnarCache
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def _percent(value) -> str:
+    return f"{value * 100:5.1f}%" if value is not None else "     -"
+
+
+def _print_report(report: dict):
+    print(f"{report['subjects']} subjects")
+    print()
+    print(
+        f"{'type':<6} {'platform':>8} {'subjects':>9} {'rated':>8} {'votes':>10} {'mean':>5}"
+        f" {'done':>6} {'wish':>6} {'dropped':>7} {'drop rate':>9}"
+    )
+    for group in report["groups"]:
+        mean = f"{group['mean_vote']:5.2f}" if group["mean_vote"] is not None else "    -"
+        print(
+            f"{group['type_name'] or group['type']:<6} {group['platform']:>8}"
+            f" {group['subjects']:>9} {group['rated']:>8} {group['votes']:>10} {mean}"
+            f" {_percent(group['done_ratio'])} {_percent(group['wish_ratio'])}"
+            f" {_percent(group['dropped_ratio']):>7} {_percent(group['drop_rate']):>9}"
+        )
+
+    for scores in report["types"]:
+        checks = scores["rank_checks"]
+        spearman = checks["spearman_vs_bayesian"]
+        print()
+        print(
+            f"{scores['type_name'] or scores['type']}: {scores['rated']}/{scores['subjects']} rated,"
+            f" prior m={scores['prior_votes']:g} C={scores['prior_mean']:.3f}"
+        )
+        print(
+            f"  ranks: {checks['ranked']} ranked, {checks['ranked_without_votes']} without votes,"
+            f" {checks['duplicate_ranks']} duplicates, {checks['score_mismatches']} score"
+            f" mismatches, spearman vs bayesian "
+            + (f"{spearman:.4f}" if spearman is not None else "-")
+        )
+        for entry in scores["top"]:
+            print(f"  {entry['id']:>8}  {entry['bayesian']:.3f}  ({entry['votes']} votes)")
+
+
+@click.command("subject-stats")
+@click.argument("path", type=click.Path(exists=True, path_type=Path))
+@click.option(
+    "--columns",
+    "cache_dir",
+    type=click.Path(file_okay=False, path_type=Path),
+    default=None,
+    help="Read a columnar cache (see export-columns), built first if stale, instead of "
+    "parsing the archive.",
+)
+@click.option(
+    "--prior-votes",
+    type=click.FloatRange(min=0),
+    default=None,
+    help="m of the Bayesian score (default: median votes of each type's rated subjects).",
+)
+@click.option("--top", type=click.IntRange(min=0), default=10, show_default=True)
+@click.option("--chunk-rows", type=click.IntRange(min=1), default=65536, show_default=True)
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON.")
+def subject_stats(
+    path: Path, cache_dir: Path, prior_votes, top: int, chunk_rows: int, as_json: bool
+):
+    """
+    Score histograms, favorite ratios per type and platform, Bayesian-weighted scores and
+    rank sanity checks of the subjects of an archive.
+
+    Args:
+        path: Path to the archive file
+
+    Returns:
+        The report of analyze_subjects()
+    """
+    start = time.perf_counter()
+    if cache_dir is not None:
+        cache = ColumnarCache.open_or_build(str(path), str(cache_dir))
+        report = analyze_subjects(cache_chunks(cache, chunk_rows), prior_votes, top)
+    else:
+        with WikiArchiveLoader(str(path), stop_on_error=False) as loader:
+            report = analyze_subjects(archive_chunks(loader, chunk_rows), prior_votes, top)
+            errors = loader.get_error_sink().total()
+        if errors:
+            click.echo(f"Skipped {errors} invalid subjects", err=True)
+
+    if as_json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        _print_report(report)
+        print()
+        print(f"Done in {time.perf_counter() - start:.2f}s")
+    return report
@@ -0,0 +1,80 @@
+import json
+import zipfile
+
+import pytest
+from click.testing import CliRunner
+
+from bgm_archive.cli.validate_archive import validate_wiki_archive
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def _run(*args):
+    result = CliRunner().invoke(validate_wiki_archive, list(args), standalone_mode=False)
+    assert result.exception is None, result.output
+    return result
+
+
+def test_parallel_matches_sequential(wiki_archive_path):
+    sequential = _run(str(wiki_archive_path))
+    parallel = _run(str(wiki_archive_path), "--jobs", "3")
+
+    assert parallel.return_value == sequential.return_value
+    assert parallel.return_value["subject_relations"] == 19
+    assert parallel.return_value["episodes"] == 20
+
+    summary = parallel.output[parallel.output.index("Validation Summary") :]
+    assert summary == sequential.output[sequential.output.index("Validation Summary") :]
+    assert "Validation errors for SubjectRelation: 1" in summary
+    assert "relation_type: 1 errors, values: 4018 x1" in summary
+
+
+def test_stats_json(wiki_archive_path, tmp_path):
+    stats_path = tmp_path / "stats.json"
+    _run(str(wiki_archive_path), "--jobs", "2", "--stats-json", str(stats_path))
+
+    stats = json.loads(stats_path.read_text())
+    assert set(stats["members"]) == set(WikiArchiveLoader.FILE_MODEL_MAP)
+    relations = stats["members"]["subject-relations.jsonlines"]
+    assert (relations["lines"], relations["valid"], relations["errors"]) == (20, 19, 1)
+    assert relations["validate_seconds"] > 0
+    assert stats["errors"]["SubjectRelation"]["fields"]["relation_type"] == {
+        "errors": 1,
+        "values": [[4018, 1]],
+    }
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_errors_jsonl(wiki_archive_path, tmp_path, jobs):
+    errors_path = tmp_path / "errors.jsonl"
+    _run(str(wiki_archive_path), "--jobs", jobs, "--errors-jsonl", str(errors_path))
+
+    records = [json.loads(line) for line in errors_path.read_text().splitlines()]
+    assert records == [
+        {
+            "member": "subject-relations.jsonlines",
+            "line": 3,
+            "model": "SubjectRelation",
+            "errors": [{"loc": ["relation_type"], "type": "enum", "input": 4018}],
+        }
+    ]
+    assert list(tmp_path.iterdir()) == [errors_path]
+
+
+def test_stdin_member(wiki_archive_path):
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        data = archive.read("subject-relations.jsonlines")
+    result = CliRunner().invoke(
+        validate_wiki_archive,
+        ["-", "--member", "subject-relations.jsonlines"],
+        input=data,
+        standalone_mode=False,
+    )
+
+    assert result.exception is None, result.output
+    assert result.return_value == {"subject_relations": 19}
+
+
+def test_stdin_needs_one_member():
+    result = CliRunner().invoke(validate_wiki_archive, ["-"], input=b"", standalone_mode=False)
+
+    assert result.exception is not None
@@ -1,76 +1,229 @@
+import json
+import contextlib
+import os
+import shutil
+import sys
 import click
 import tqdm
 from pathlib import Path
+from typing import Optional, TextIO, Union
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from ..loader.errors import ErrorSink
+from ..loader.sources import ArchiveSource, StreamSource, open_source
+from ..loader.stats import MemberStats
 from ..loader.wiki_archive_loader import WikiArchiveLoader
 
+# (entity key in the summary, progress label, archive member)
+MEMBERS = [
+    ("subjects", "Subjects", "subject.jsonlines"),
+    ("persons", "Persons", "person.jsonlines"),
+    ("characters", "Characters", "character.jsonlines"),
+    ("episodes", "Episodes", "episode.jsonlines"),
+    ("subject_relations", "Subject Relations", "subject-relations.jsonlines"),
+    ("subject_persons", "Subject-Person Relations", "subject-persons.jsonlines"),
+    ("subject_characters", "Subject-Character Relations", "subject-characters.jsonlines"),
+    ("person_characters", "Person-Character Relations", "person-characters.jsonlines"),
+]
+
+
+def _validate_member(
+    archive_path: str, filename: str, timings: bool = False, errors_path: Optional[str] = None
+) -> tuple[str, int, ErrorSink, dict[str, MemberStats]]:
+    """
+    Validate a single archive member. Runs in a worker process, which opens the zip itself.
+
+    Error records are streamed to errors_path, a part file of this member only.
+
+    Returns:
+        Tuple of (member name, count of valid entries, error sink, loader stats)
+    """
+    with contextlib.ExitStack() as stack:
+        stream = None
+        if errors_path is not None:
+            stream = stack.enter_context(open(errors_path, "w", encoding="utf-8"))
+        loader = WikiArchiveLoader(
+            archive_path, stop_on_error=False, timings=timings, error_sink=ErrorSink(stream=stream)
+        )
+        stack.enter_context(loader)
+        count = sum(1 for _ in loader.iter_member(filename))
+        return filename, count, loader.get_error_sink(), loader.stats()
+
+
+def _largest_first(archive_path: str, filenames: list[str]) -> list[str]:
+    """
+    Order members by decompressed size, so the slowest member (episodes) starts first.
+    """
+    with open_source(archive_path) as source:
+        sizes = {filename: source.size(filename) or 0 for filename in filenames}
+    return sorted(filenames, key=sizes.__getitem__, reverse=True)
+
+
+def _validate_parallel(
+    archive_path: str,
+    jobs: int,
+    timings: bool = False,
+    members=MEMBERS,
+    errors_out: Optional[TextIO] = None,
+) -> tuple[Counter, ErrorSink, dict[str, MemberStats]]:
+    """
+    Validate members in a process pool, merging per-member results in MEMBERS order.
+
+    Workers stream error records to per-member part files next to errors_out, which are
+    appended to it in MEMBERS order once all workers are done.
+    """
+    filenames = _largest_first(archive_path, [filename for _, _, filename in members])
+    parts = {}
+    if errors_out is not None:
+        parts = {filename: f"{errors_out.name}.{filename}.part" for filename in filenames}
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(jobs, len(filenames))) as executor:
+        futures = [
+            executor.submit(
+                _validate_member, archive_path, filename, timings, parts.get(filename)
+            )
+            for filename in filenames
+        ]
+        for future in tqdm.tqdm(as_completed(futures), total=len(futures), desc="Members"):
+            filename, count, errors, stats = future.result()
+            results[filename] = (count, errors, stats)
+
+    entity_counts = Counter()
+    error_sink = ErrorSink()
+    all_stats: dict[str, MemberStats] = {}
+    for entity_type, _, filename in members:
+        count, errors, stats = results[filename]
+        if count:
+            entity_counts[entity_type] = count
+        error_sink.merge(errors)
+        all_stats.update(stats)
+        if filename in parts:
+            with open(parts[filename], encoding="utf-8") as part:
+                shutil.copyfileobj(part, errors_out)
+            os.remove(parts[filename])
+    return entity_counts, error_sink, all_stats
+
+
+def _validate_sequential(
+    archive: Union[str, ArchiveSource],
+    timings: bool = False,
+    members=MEMBERS,
+    errors_out: Optional[TextIO] = None,
+) -> tuple[Counter, ErrorSink, dict[str, MemberStats]]:
+    entity_counts = Counter()
+    error_sink = ErrorSink(stream=errors_out)
+
+    with WikiArchiveLoader(
+        archive, stop_on_error=False, timings=timings, error_sink=error_sink
+    ) as loader:
+        for entity_type, desc, filename in members:
+            print(f"Validating {desc.lower()}...")
+            for _ in tqdm.tqdm(loader.iter_member(filename), desc=desc):
+                entity_counts[entity_type] += 1
+
+        return entity_counts, error_sink, loader.stats()
+
 
 @click.command("validate-archive")
-@click.argument("path", type=click.Path(exists=True, path_type=Path))
-def validate_wiki_archive(path: Path):
+@click.argument("path", type=click.Path(exists=True, allow_dash=True, path_type=Path))
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=0),
+    default=1,
+    show_default=True,
+    help="Number of worker processes, each validating its own members. 0 for one per CPU.",
+)
+@click.option(
+    "--stats-json",
+    type=click.File("w", encoding="utf-8"),
+    default=None,
+    help="Write per-member loader metrics (bytes, lines, time per stage, errors) as JSON.",
+)
+@click.option(
+    "--member",
+    "member_names",
+    multiple=True,
+    type=click.Choice(list(WikiArchiveLoader.FILE_MODEL_MAP)),
+    help="Members to validate (default: all). Required, once, when PATH is - (stdin).",
+)
+@click.option(
+    "--errors-jsonl",
+    type=click.File("w", encoding="utf-8", lazy=False),
+    default=None,
+    help="Stream one JSON record per invalid line (member, line, model, errors).",
+)
+def validate_wiki_archive(
+    path: Path,
+    jobs: int = 1,
+    stats_json=None,
+    member_names: tuple[str, ...] = (),
+    errors_jsonl=None,
+):
     """
     Validate a Bangumi wiki archive by iterating through all entity types.
 
+    PATH is a zip archive, a directory of extracted (optionally .gz/.zst compressed)
+    members, or - to read the jsonlines of a single --member from stdin.
+
     Args:
         path: Path to the archive file
+        jobs: Number of worker processes (1 validates in this process)
+        stats_json: Stream receiving the per-member MemberStats as JSON
+        member_names: Members to validate, all by default
+        errors_jsonl: Stream receiving the error records, see ErrorSink
 
     Returns:
         Counter with counts of each entity type
     """
-    loader = WikiArchiveLoader(str(path), stop_on_error=False)
-    entity_counts = Counter()
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    members = [member for member in MEMBERS if not member_names or member[2] in member_names]
+    timings = stats_json is not None
+    if str(path) == "-":
+        if len(member_names) != 1:
+            raise click.UsageError("Reading stdin needs exactly one --member")
+        source = StreamSource(sys.stdin.buffer, member_names[0])
+        entity_counts, error_sink, stats = _validate_sequential(
+            source, timings, members, errors_jsonl
+        )
+    # workers stream errors to part files named after errors_jsonl, so stdout needs one process
+    elif jobs > 1 and (errors_jsonl is None or errors_jsonl.name != "<stdout>"):
+        print(f"Validating {len(members)} members with {jobs} workers...")
+        entity_counts, error_sink, stats = _validate_parallel(
+            str(path), jobs, timings, members, errors_jsonl
+        )
+    else:
+        entity_counts, error_sink, stats = _validate_sequential(
+            str(path), timings, members, errors_jsonl
+        )
 
-    # Process subjects
-    print("Validating subjects...")
-    for _ in tqdm.tqdm(loader.subjects(), desc="Subjects"):
-        entity_counts["subjects"] += 1
-
-    # Process persons
-    print("Validating persons...")
-    for _ in tqdm.tqdm(loader.persons(), desc="Persons"):
-        entity_counts["persons"] += 1
-
-    # Process characters
-    print("Validating characters...")
-    for _ in tqdm.tqdm(loader.characters(), desc="Characters"):
-        entity_counts["characters"] += 1
-
-    # Process episodes
-    print("Validating episodes...")
-    for _ in tqdm.tqdm(loader.episodes(), desc="Episodes"):
-        entity_counts["episodes"] += 1
-
-    # Process subject relations
-    print("Validating subject relations...")
-    for _ in tqdm.tqdm(loader.subject_relations(), desc="Subject Relations"):
-        entity_counts["subject_relations"] += 1
-
-    # Process subject persons
-    print("Validating subject-person relations...")
-    for _ in tqdm.tqdm(loader.subject_persons(), desc="Subject-Person Relations"):
-        entity_counts["subject_persons"] += 1
-
-    # Process subject characters
-    print("Validating subject-character relations...")
-    for _ in tqdm.tqdm(loader.subject_characters(), desc="Subject-Character Relations"):
-        entity_counts["subject_characters"] += 1
-
-    # Process person characters
-    print("Validating person-character relations...")
-    for _ in tqdm.tqdm(loader.person_characters(), desc="Person-Character Relations"):
-        entity_counts["person_characters"] += 1
+    if stats_json is not None:
+        json.dump(
+            {
+                "archive": str(path),
+                "jobs": jobs,
+                "members": {filename: member.to_dict() for filename, member in stats.items()},
+                "errors": error_sink.summary(),
+            },
+            stats_json,
+            indent=2,
+        )
 
     # Print summary
     print("\nValidation Summary:")
     for entity_type, count in entity_counts.items():
         print(f"  {entity_type}: {count} succeeded")
 
-    all_errors = loader.get_validation_errors()
-    for model_class, errors in all_errors.items():
-        print(f"First validation errors for {model_class.__name__}:")
-        for error in errors[:3]:
+    samples = error_sink.samples()
+    for model_class, error_count in error_sink.model_counts.items():
+        print(f"Validation errors for {model_class.__name__}: {error_count}")
+        for error in samples.get(model_class, [])[:3]:
             print(f"  - {error}")
-        problematic_values = set(ed["input"] for e in errors for ed in e.errors())
-        print(f"  - input values: {problematic_values}")
+        for field, field_count in error_sink.field_counts[model_class].most_common():
+            top_values = error_sink.value_counts[model_class, field].most_common(5)
+            values = ", ".join(f"{value!r} x{count}" for value, count in top_values)
+            print(f"  - {field}: {field_count} errors, values: {values}")
 
     return entity_counts
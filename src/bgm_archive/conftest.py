@@ -0,0 +1,21 @@
+import zipfile
+from pathlib import Path
+
+import pytest
+
+TEST_DATA_DIR = Path(__file__).parent / "loader" / "__test_data"
+
+
+@pytest.fixture(scope="session")
+def wiki_archive_path(tmp_path_factory) -> Path:
+    """
+    Zip archive built from the jsonlines fixtures in loader/__test_data.
+
+    The fixture files carry a doubled ``.jsonlines.jsonlines`` suffix, so members are
+    renamed to the ``FILE_MODEL_MAP`` names while zipping.
+    """
+    path = tmp_path_factory.mktemp("archive") / "archive.zip"
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for fixture in sorted(TEST_DATA_DIR.glob("*.jsonlines.jsonlines")):
+            archive.write(fixture, fixture.name.removesuffix(".jsonlines"))
+    return path
@@ -0,0 +1,208 @@
+"""
+Streaming diff between two archive releases, one member at a time.
+
+Each record is reduced to a 64-bit key and a 64-bit hash of its canonical JSON (sorted
+keys, compact separators), kept in numpy arrays: 16 bytes per record instead of the
+record itself. Keys present on one side only are added/removed, keys whose content hash
+differs are changed. A second pass over the dumps emits only those records.
+
+Lines that are not JSON objects or whose key fields are not 64-bit ints are skipped and
+counted as invalid; of several lines with the same key, the first one is diffed and the
+others are counted as duplicates.
+"""
+
+from array import array
+import hashlib
+import json
+import logging
+import struct
+from collections import Counter
+from typing import Dict, Iterable, Optional, TextIO, Tuple
+
+import numpy as np
+from pydantic_core import from_json
+
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+# Fields identifying a record: the id for entities, a composite key for relation members.
+MEMBER_KEYS: Dict[str, Tuple[str, ...]] = {
+    "subject.jsonlines": ("id",),
+    "person.jsonlines": ("id",),
+    "character.jsonlines": ("id",),
+    "episode.jsonlines": ("id",),
+    "subject-relations.jsonlines": ("subject_id", "related_subject_id"),
+    "subject-persons.jsonlines": ("subject_id", "person_id", "position"),
+    "subject-characters.jsonlines": ("subject_id", "character_id"),
+    "person-characters.jsonlines": ("person_id", "subject_id", "character_id"),
+}
+
+
+def canonical_json(record: dict) -> str:
+    return json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def content_hash(record: dict) -> int:
+    """
+    64-bit hash of a record's canonical JSON, as a signed int to fit an int64 array.
+    """
+    digest = hashlib.blake2b(canonical_json(record).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def record_key(record: dict, key_fields: Tuple[str, ...]) -> int:
+    """
+    64-bit key of a record: the id itself for entities, a hash of the fields otherwise.
+    """
+    if len(key_fields) == 1:
+        return record[key_fields[0]]
+    packed = struct.pack(f"<{len(key_fields)}q", *(record[field] for field in key_fields))
+    return int.from_bytes(hashlib.blake2b(packed, digest_size=8).digest(), "little", signed=True)
+
+
+def keyed_record(line: bytes, key_fields: Tuple[str, ...]) -> Tuple[dict, int]:
+    """
+    The record of a JSON line and its record_key().
+
+    Raises:
+        ValueError: if the line is not a JSON object, or a key field is missing or not
+            an int in the int64 range
+    """
+    try:
+        record = from_json(line)
+        values = [record[field] for field in key_fields]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError(f"not a record with {', '.join(key_fields)}: {e!r}") from e
+    for field, value in zip(key_fields, values):
+        # bool is an int subclass, but never a valid id
+        if type(value) is not int or not -(2**63) <= value < 2**63:
+            raise ValueError(f"{field} is not an int64: {value!r}")
+    return record, record_key(record, key_fields)
+
+
+def _fingerprints(
+    loader: WikiArchiveLoader, filename: str, key_fields: Tuple[str, ...], counts: Counter
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Key and content hash of every record in a member, sorted by key. Invalid and
+    duplicate lines are skipped and counted in counts.
+    """
+    keys, hashes = array("q"), array("q")
+    seen = set()
+    for line_number, line in loader.iter_raw_lines(filename):
+        try:
+            record, key = keyed_record(line, key_fields)
+        except ValueError as e:
+            logger.warning(f"Skipping invalid line {filename}:{line_number}: {e}")
+            counts["invalid"] += 1
+            continue
+        if key in seen:
+            counts["duplicate"] += 1
+            continue
+        seen.add(key)
+        keys.append(key)
+        hashes.append(content_hash(record))
+    keys_array = np.frombuffer(keys, dtype=np.int64)
+    hashes_array = np.frombuffer(hashes, dtype=np.int64)
+    order = np.argsort(keys_array, kind="stable")
+    return keys_array[order], hashes_array[order]
+
+
+def _emit(
+    loader: WikiArchiveLoader,
+    filename: str,
+    key_fields: Tuple[str, ...],
+    wanted: Dict[int, str],
+    out: TextIO,
+):
+    """
+    Write the records whose key is in wanted, tagged with the op wanted maps them to.
+    Keys are popped from wanted, so only the first line of a duplicated key is written.
+    """
+    if not wanted:
+        return
+    for _, line in loader.iter_raw_lines(filename):
+        try:
+            record, key = keyed_record(line, key_fields)
+        except ValueError:
+            # counted by _fingerprints()
+            continue
+        op = wanted.pop(key, None)
+        if op is not None:
+            delta = {
+                "member": filename,
+                "op": op,
+                "key": [record[field] for field in key_fields],
+                "record": record,
+            }
+            out.write(json.dumps(delta, ensure_ascii=False) + "\n")
+
+
+def diff_member(
+    old: WikiArchiveLoader, new: WikiArchiveLoader, filename: str, out: TextIO
+) -> Counter:
+    """
+    Diff one member of two archives, writing added/changed/removed records to out.
+
+    Returns:
+        Counter of added, changed, removed and unchanged records, and of the invalid and
+        duplicate lines skipped in both archives
+    """
+    key_fields = MEMBER_KEYS[filename]
+    skipped = Counter(invalid=0, duplicate=0)
+    old_keys, old_hashes = _fingerprints(old, filename, key_fields, skipped)
+    new_keys, new_hashes = _fingerprints(new, filename, key_fields, skipped)
+
+    if len(old_keys):
+        positions = np.minimum(np.searchsorted(old_keys, new_keys), len(old_keys) - 1)
+        present = old_keys[positions] == new_keys
+        changed = present & (old_hashes[positions] != new_hashes)
+    else:
+        present = changed = np.zeros(len(new_keys), dtype=bool)
+    added = ~present
+    removed = ~np.isin(old_keys, new_keys)
+
+    wanted_new = {key: "added" for key in new_keys[added].tolist()}
+    wanted_new.update({key: "changed" for key in new_keys[changed].tolist()})
+    _emit(new, filename, key_fields, wanted_new, out)
+    _emit(old, filename, key_fields, {key: "removed" for key in old_keys[removed].tolist()}, out)
+
+    counts = Counter(
+        added=int(added.sum()),
+        changed=int(changed.sum()),
+        removed=int(removed.sum()),
+    )
+    counts["unchanged"] = len(new_keys) - counts["added"] - counts["changed"]
+    counts.update(skipped)
+    return counts
+
+
+def diff_archives(
+    old_path: str,
+    new_path: str,
+    out: TextIO,
+    members: Optional[Iterable[str]] = None,
+) -> Dict[str, Counter]:
+    """
+    Diff two archives member by member, writing a jsonlines delta to out.
+
+    Each delta line is {"member", "op", "key", "record"}, where op is "added" or "changed"
+    (record from the new archive) or "removed" (record from the old archive).
+
+    Args:
+        old_path: Path to the older archive
+        new_path: Path to the newer archive
+        out: Text stream receiving the delta
+        members: Members to diff, defaults to all of FILE_MODEL_MAP
+
+    Returns:
+        Dictionary mapping member names to Counters of added/changed/removed/unchanged
+        records and invalid/duplicate lines
+    """
+    results = {}
+    with WikiArchiveLoader(old_path) as old, WikiArchiveLoader(new_path) as new:
+        for filename in members or WikiArchiveLoader.FILE_MODEL_MAP:
+            results[filename] = diff_member(old, new, filename, out)
+            logger.info(f"{filename}: {dict(results[filename])}")
+    return results
@@ -0,0 +1,99 @@
+import io
+from collections import Counter
+import json
+import zipfile
+
+from bgm_archive.diff.archive_diff import canonical_json, diff_archives
+
+
+def _rewrite(source, target, edits):
+    """
+    Copy a zip archive, passing each member's lines through edits[member] when present.
+    """
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(target, "w") as dst:
+        for info in src.infolist():
+            lines = src.read(info).decode("utf-8").splitlines()
+            records = [json.loads(line) for line in lines if line.strip()]
+            if info.filename in edits:
+                records = edits[info.filename](records)
+            dst.writestr(info.filename, "".join(json.dumps(r) + "\n" for r in records))
+
+
+def _change_subject(records):
+    records[0]["score"] = 9.9
+    return records
+
+
+def _add_relation(records):
+    return records + [
+        {"subject_id": 1, "relation_type": 2, "related_subject_id": 2, "order": 0}
+    ]
+
+
+def test_diff(wiki_archive_path, tmp_path):
+    new_path = tmp_path / "new.zip"
+    _rewrite(
+        wiki_archive_path,
+        new_path,
+        {
+            "subject.jsonlines": _change_subject,
+            "episode.jsonlines": lambda records: records[1:],
+            "subject-relations.jsonlines": _add_relation,
+        },
+    )
+    out = io.StringIO()
+
+    results = diff_archives(str(wiki_archive_path), str(new_path), out)
+
+    assert results["subject.jsonlines"] == Counter(changed=1, unchanged=19)
+    assert results["episode.jsonlines"]["removed"] == 1
+    assert results["subject-relations.jsonlines"]["added"] == 1
+    # rewritten lines are formatted differently but carry the same content
+    assert results["person.jsonlines"] == Counter(unchanged=20)
+
+    deltas = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(d["member"], d["op"], d["key"]) for d in deltas] == [
+        ("subject.jsonlines", "changed", [1]),
+        ("episode.jsonlines", "removed", [2]),
+        ("subject-relations.jsonlines", "added", [1, 2]),
+    ]
+    assert deltas[0]["record"]["score"] == 9.9
+
+
+def test_invalid_and_duplicate_lines(wiki_archive_path, tmp_path):
+    new_path = tmp_path / "invalid.zip"
+    with zipfile.ZipFile(wiki_archive_path) as src, zipfile.ZipFile(new_path, "w") as dst:
+        for info in src.infolist():
+            lines = src.read(info).splitlines(keepends=True)
+            if info.filename == "subject.jsonlines":
+                first = json.loads(lines[0])
+                changed = json.dumps({**first, "score": 9.9}).encode() + b"\n"
+                extra = [
+                    {**first, "id": f"invalid-{first['id']}"},  # as generate-archive writes
+                    {**first, "id": True},
+                ]
+                lines = [changed, *lines[1:], changed, b"not json\n"]
+                lines += [json.dumps(r).encode() + b"\n" for r in extra]
+            dst.writestr(info.filename, b"".join(lines))
+    out = io.StringIO()
+
+    results = diff_archives(str(wiki_archive_path), str(new_path), out)
+
+    assert results["subject.jsonlines"] == Counter(changed=1, unchanged=19, invalid=3, duplicate=1)
+    # the duplicated key is written once
+    deltas = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(d["op"], d["key"]) for d in deltas] == [("changed", [first["id"]])]
+
+
+def test_identical_archives(wiki_archive_path):
+    out = io.StringIO()
+    results = diff_archives(str(wiki_archive_path), str(wiki_archive_path), out)
+    assert out.getvalue() == ""
+    for counts in results.values():
+        assert counts["added"] == counts["changed"] == counts["removed"] == 0
+
+
+def test_canonical_json_ignores_key_order():
+    assert canonical_json({"b": 1, "a": [1, {"d": 2, "c": 3}]}) == canonical_json(
+        {"a": [1, {"c": 3, "d": 2}], "b": 1}
+    )
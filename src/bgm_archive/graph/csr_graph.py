@@ -0,0 +1,346 @@
+"""
+Compact CSR adjacency over subjects, persons and characters.
+
+Edges of the four relation members are accumulated into typed buffers while streaming and
+then sorted into CSR form: for each source id, its targets and per-edge attributes
+(relation_type, position, type, ...) are contiguous slices of parallel numpy arrays.
+"""
+
+from array import array
+from collections import deque
+import logging
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..loader.model import RelationType
+from ..loader.raw_loader import RawWikiArchiveLoader
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+# Relations followed by RelationGraph.franchise() by default.
+FRANCHISE_RELATIONS = (
+    RelationType.PREQUEL,
+    RelationType.SEQUEL,
+    RelationType.SIDE_STORY,
+)
+
+
+class CSRGraph:
+    """
+    Directed graph in CSR form, with integer attribute arrays parallel to the targets.
+
+    Sources are the sorted unique ids in `nodes`; the edges of nodes[i] are
+    targets[indptr[i]:indptr[i + 1]], in the order they were added.
+    """
+
+    def __init__(
+        self,
+        nodes: np.ndarray,
+        indptr: np.ndarray,
+        targets: np.ndarray,
+        edge_data: Dict[str, np.ndarray],
+    ):
+        self.nodes = nodes
+        self.indptr = indptr
+        self.targets = targets
+        self.edge_data = edge_data
+
+    @classmethod
+    def from_edges(
+        cls,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        edge_data: Optional[Dict[str, np.ndarray]] = None,
+    ) -> "CSRGraph":
+        edge_data = edge_data or {}
+        order = np.argsort(sources, kind="stable")
+        sorted_sources = sources[order]
+        nodes, counts = np.unique(sorted_sources, return_counts=True)
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return cls(
+            nodes,
+            indptr,
+            targets[order],
+            {name: values[order] for name, values in edge_data.items()},
+        )
+
+    def __len__(self) -> int:
+        """
+        Number of edges.
+        """
+        return len(self.targets)
+
+    def _slice(self, node_id: int) -> slice:
+        position = int(np.searchsorted(self.nodes, node_id))
+        if position >= len(self.nodes) or self.nodes[position] != node_id:
+            return slice(0, 0)
+        return slice(int(self.indptr[position]), int(self.indptr[position + 1]))
+
+    def neighbors(self, node_id: int, **filters: Iterable[int]) -> np.ndarray:
+        """
+        Targets of node_id, optionally keeping only edges whose attributes are in the
+        given values, e.g. neighbors(8, relation_type=[2, 3]).
+        """
+        edges = self._slice(node_id)
+        targets = self.targets[edges]
+        if filters:
+            mask = np.ones(len(targets), dtype=bool)
+            for name, values in filters.items():
+                mask &= np.isin(self.edge_data[name][edges], list(values))
+            targets = targets[mask]
+        return targets
+
+    def edges(self, node_id: int) -> Dict[str, np.ndarray]:
+        """
+        All edges of node_id as parallel arrays: "target" plus every edge attribute.
+        """
+        edges = self._slice(node_id)
+        return {
+            "target": self.targets[edges],
+            **{name: values[edges] for name, values in self.edge_data.items()},
+        }
+
+    def transpose(self) -> "CSRGraph":
+        """
+        The same edges with sources and targets swapped.
+        """
+        sources = np.repeat(self.nodes, np.diff(self.indptr))
+        return CSRGraph.from_edges(self.targets, sources, self.edge_data)
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {
+            f"{prefix}__nodes": self.nodes,
+            f"{prefix}__indptr": self.indptr,
+            f"{prefix}__targets": self.targets,
+        }
+        for name, values in self.edge_data.items():
+            arrays[f"{prefix}__edge__{name}"] = values
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix: str) -> "CSRGraph":
+        edge_prefix = f"{prefix}__edge__"
+        return cls(
+            arrays[f"{prefix}__nodes"],
+            arrays[f"{prefix}__indptr"],
+            arrays[f"{prefix}__targets"],
+            {
+                key[len(edge_prefix) :]: arrays[key]
+                for key in arrays.keys()
+                if key.startswith(edge_prefix)
+            },
+        )
+
+
+# graph name -> (archive member, source field, target field, [(edge attribute, typecode)])
+GRAPH_MEMBERS: Dict[str, Tuple[str, str, str, List[Tuple[str, str]]]] = {
+    "subject_relations": (
+        "subject-relations.jsonlines",
+        "subject_id",
+        "related_subject_id",
+        [("relation_type", "h"), ("order", "i")],
+    ),
+    "subject_persons": (
+        "subject-persons.jsonlines",
+        "subject_id",
+        "person_id",
+        [("position", "h")],
+    ),
+    "subject_characters": (
+        "subject-characters.jsonlines",
+        "subject_id",
+        "character_id",
+        [("type", "b"), ("order", "i")],
+    ),
+    "person_characters": (
+        "person-characters.jsonlines",
+        "person_id",
+        "character_id",
+        [("subject_id", "i")],
+    ),
+}
+
+
+def _collect_edges(
+    entries: Iterator, source: str, target: str, attributes: List[Tuple[str, str]]
+) -> CSRGraph:
+    """
+    Accumulate edges into typed buffers, then convert once to numpy and sort into CSR.
+
+    Entries may be Pydantic models or raw named tuples; both expose fields as attributes.
+    """
+    sources, targets = array("i"), array("i")
+    buffers = [array(typecode) for _, typecode in attributes]
+    names = [name for name, _ in attributes]
+    for entry in entries:
+        sources.append(getattr(entry, source))
+        targets.append(getattr(entry, target))
+        for name, buffer in zip(names, buffers):
+            buffer.append(getattr(entry, name))
+    return CSRGraph.from_edges(
+        np.frombuffer(sources, dtype=np.int32),
+        np.frombuffer(targets, dtype=np.int32),
+        {
+            name: np.frombuffer(buffer, dtype=typecode)
+            for (name, typecode), buffer in zip(attributes, buffers)
+        },
+    )
+
+
+class RelationGraph:
+    """
+    CSR graphs of the four relation members, with query helpers.
+
+    - subject_relations: subject -> related subject (relation_type, order)
+    - subject_persons: subject -> person (position)
+    - subject_characters: subject -> character (type, order)
+    - person_characters: person -> character (subject_id)
+    """
+
+    def __init__(self, graphs: Dict[str, CSRGraph]):
+        self.graphs = graphs
+        self.__reversed: Dict[str, CSRGraph] = {}
+
+    @classmethod
+    def from_archive(cls, archive_path: str, trusted: bool = True) -> "RelationGraph":
+        """
+        Build the graphs from an archive, streaming each relation member once.
+
+        Args:
+            archive_path: Path to the zip archive
+            trusted: Parse lines into raw tuples (RawWikiArchiveLoader) instead of validating
+                them; invalid lines are skipped when validating
+        """
+        if trusted:
+            loader = RawWikiArchiveLoader(archive_path, record_type="tuple")
+        else:
+            loader = WikiArchiveLoader(archive_path, stop_on_error=False)
+        with loader:
+            return cls.from_loader(loader)
+
+    @classmethod
+    def from_loader(cls, loader: WikiArchiveLoader) -> "RelationGraph":
+        graphs = {}
+        for name, (filename, source, target, attributes) in GRAPH_MEMBERS.items():
+            entries = loader.iter_member(filename)
+            graphs[name] = _collect_edges(entries, source, target, attributes)
+            logger.info(f"Loaded {len(graphs[name])} edges from {filename}")
+        return cls(graphs)
+
+    def save(self, path: str):
+        arrays = {}
+        for name, graph in self.graphs.items():
+            arrays.update(graph.to_arrays(name))
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "RelationGraph":
+        with np.load(path) as arrays:
+            loaded = {key: arrays[key] for key in arrays.files}
+        return cls(
+            {
+                name: CSRGraph.from_arrays(loaded, name)
+                for name in GRAPH_MEMBERS
+                if f"{name}__nodes" in loaded
+            }
+        )
+
+    def reversed(self, name: str) -> CSRGraph:
+        """
+        Transposed graph, built on first use (e.g. person -> subject for subject_persons).
+        """
+        if name not in self.__reversed:
+            self.__reversed[name] = self.graphs[name].transpose()
+        return self.__reversed[name]
+
+    def related_subjects(
+        self, subject_id: int, relation_types: Optional[Iterable[int]] = None
+    ) -> np.ndarray:
+        graph = self.graphs["subject_relations"]
+        if relation_types is None:
+            return graph.neighbors(subject_id)
+        return graph.neighbors(subject_id, relation_type=relation_types)
+
+    def staff(self, subject_id: int, positions: Optional[Iterable[int]] = None) -> np.ndarray:
+        graph = self.graphs["subject_persons"]
+        if positions is None:
+            return graph.neighbors(subject_id)
+        return graph.neighbors(subject_id, position=positions)
+
+    def cast(self, subject_id: int, types: Optional[Iterable[int]] = None) -> np.ndarray:
+        graph = self.graphs["subject_characters"]
+        if types is None:
+            return graph.neighbors(subject_id)
+        return graph.neighbors(subject_id, type=types)
+
+    def subjects_of_person(self, person_id: int) -> np.ndarray:
+        return self.reversed("subject_persons").neighbors(person_id)
+
+    def characters_of_person(self, person_id: int) -> np.ndarray:
+        return self.graphs["person_characters"].neighbors(person_id)
+
+    def franchise(
+        self,
+        subject_id: int,
+        relation_types: Iterable[int] = FRANCHISE_RELATIONS,
+        undirected: bool = True,
+    ) -> List[int]:
+        """
+        Subjects reachable from subject_id over relations of the given types, in BFS order.
+
+        With undirected, edges are also followed backwards, so the result does not depend
+        on which side of a relation the archive recorded.
+        """
+        relation_types = [int(t) for t in relation_types]
+        graphs = [self.graphs["subject_relations"]]
+        if undirected:
+            graphs.append(self.reversed("subject_relations"))
+
+        seen = {subject_id}
+        order = [subject_id]
+        queue = deque([subject_id])
+        while queue:
+            current = queue.popleft()
+            for graph in graphs:
+                for neighbor in graph.neighbors(current, relation_type=relation_types).tolist():
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        order.append(neighbor)
+                        queue.append(neighbor)
+        return order
+
+    def connected_components(
+        self, relation_types: Optional[Iterable[int]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Weakly connected components of the subject relation graph.
+
+        Labels are computed with vectorized min-label propagation plus pointer jumping.
+
+        Returns:
+            (subject ids, component labels), where a label is the smallest subject id
+            of its component
+        """
+        graph = self.graphs["subject_relations"]
+        sources = np.repeat(graph.nodes, np.diff(graph.indptr))
+        targets = graph.targets
+        if relation_types is not None:
+            mask = np.isin(graph.edge_data["relation_type"], [int(t) for t in relation_types])
+            sources, targets = sources[mask], targets[mask]
+
+        ids = np.unique(np.concatenate([graph.nodes, graph.targets]))
+        u = np.searchsorted(ids, sources)
+        v = np.searchsorted(ids, targets)
+        labels = np.arange(len(ids))
+        while True:
+            previous = labels.copy()
+            edge_min = np.minimum(labels[u], labels[v])
+            np.minimum.at(labels, u, edge_min)
+            np.minimum.at(labels, v, edge_min)
+            labels = labels[labels]  # pointer jumping
+            if np.array_equal(labels, previous):
+                break
+        return ids, ids[labels]
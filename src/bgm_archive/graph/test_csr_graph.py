@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from bgm_archive.graph.csr_graph import CSRGraph, RelationGraph
+from bgm_archive.loader.model import RelationType
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@pytest.fixture(scope="module")
+def relation_graph(wiki_archive_path):
+    return RelationGraph.from_archive(str(wiki_archive_path))
+
+
+def _franchise_graph() -> RelationGraph:
+    # 1 -sequel-> 2 -sequel-> 3, 3 -side story-> 4, 4 -character-> 5, 6 -prequel-> 7
+    edges = [
+        (1, 2, RelationType.SEQUEL),
+        (2, 3, RelationType.SEQUEL),
+        (3, 4, RelationType.SIDE_STORY),
+        (4, 5, RelationType.CHARACTER),
+        (6, 7, RelationType.PREQUEL),
+    ]
+    sources, targets, types = (np.array(column) for column in zip(*edges))
+    graph = CSRGraph.from_edges(
+        sources, targets, {"relation_type": types, "order": np.zeros(len(edges))}
+    )
+    return RelationGraph({"subject_relations": graph})
+
+
+def test_matches_loader(relation_graph, wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+    persons_of_8 = [r.person_id for r in loader.subject_persons() if r.subject_id == 8]
+
+    assert relation_graph.staff(8).tolist() == persons_of_8
+    assert relation_graph.staff(8, positions=[73]).tolist() == [39, 185]
+    assert sorted(relation_graph.subjects_of_person(162).tolist()) == [8, 8, 8]
+    assert relation_graph.cast(4, types=[2]).tolist() == [77990, 96105]
+    assert len(relation_graph.characters_of_person(1)) == 20
+    # the trusted path keeps the relation with an unknown relation_type
+    assert relation_graph.related_subjects(6).tolist() == [108488, 121872]
+    assert relation_graph.related_subjects(8, [RelationType.BOOK_ALBUM]).tolist() == [85, 1081]
+    assert relation_graph.related_subjects(12345).tolist() == []
+
+
+def test_validated_build_skips_invalid(wiki_archive_path):
+    graph = RelationGraph.from_archive(str(wiki_archive_path), trusted=False)
+    assert graph.related_subjects(6).tolist() == [121872]
+
+
+def test_franchise_and_components():
+    graph = _franchise_graph()
+
+    assert graph.franchise(1) == [1, 2, 3, 4]
+    assert graph.franchise(3) == [3, 4, 2, 1]
+    assert graph.franchise(1, undirected=False) == [1, 2, 3, 4]
+    assert graph.franchise(3, undirected=False) == [3, 4]
+
+    ids, labels = graph.connected_components()
+    assert dict(zip(ids.tolist(), labels.tolist())) == {1: 1, 2: 1, 3: 1, 4: 1, 5: 1, 6: 6, 7: 6}
+    ids, labels = graph.connected_components(relation_types=[RelationType.SEQUEL])
+    assert dict(zip(ids.tolist(), labels.tolist())) == {1: 1, 2: 1, 3: 1, 4: 4, 5: 5, 6: 6, 7: 7}
+
+
+def test_save_load(relation_graph, tmp_path):
+    path = tmp_path / "graph.npz"
+    relation_graph.save(str(path))
+    loaded = RelationGraph.load(str(path))
+
+    for name, graph in relation_graph.graphs.items():
+        other = loaded.graphs[name]
+        np.testing.assert_array_equal(graph.nodes, other.nodes)
+        np.testing.assert_array_equal(graph.targets, other.targets)
+        assert graph.edge_data.keys() == other.edge_data.keys()
+        for key in graph.edge_data:
+            np.testing.assert_array_equal(graph.edge_data[key], other.edge_data[key])
+    assert loaded.staff(8).tolist() == relation_graph.staff(8).tolist()
@@ -0,0 +1,375 @@
+"""
+Content-addressed history of successive archive dumps, for time-travel queries.
+
+Every record is stored once per distinct content: blobs hold the zlib-compressed canonical
+JSON of a record, keyed by its content_hash(). A version row says that a record key (see
+archive_diff.record_key) had some content from one dump up to, but excluding, another:
+a record that stays the same over a year of weekly dumps is one blob and one version row.
+
+Dumps must be ingested in date order. An ingest reads the dump once and compares each raw
+line against the lines of the open versions by a 64-bit hash, so unchanged lines are not
+parsed; only added, changed and removed records are parsed, hashed and written. A dump that
+only reformats lines (same content, different bytes) updates the line hashes and creates no
+version.
+
+    store = HistoryStore("history.db")
+    store.ingest("dump-2024-01-02.zip", "2024-01-02")
+    store.get_entity_at("subject", 8, "2024-03-01")
+    store.history("subject", 8)
+    store.get_records_at("subject-persons.jsonlines", 8, "2024-03-01")  # staff of subject 8
+"""
+
+import datetime
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from pydantic_core import from_json
+
+from ..diff.archive_diff import MEMBER_KEYS, canonical_json, content_hash, keyed_record
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+# Stored in version.member; append new members, never reorder.
+MEMBER_IDS: Dict[str, int] = {filename: index for index, filename in enumerate(MEMBER_KEYS)}
+
+# get_entity_at() and history() types, the members keyed by id alone.
+ENTITY_MEMBERS: Dict[str, str] = {
+    "subject": "subject.jsonlines",
+    "person": "person.jsonlines",
+    "character": "character.jsonlines",
+    "episode": "episode.jsonlines",
+}
+
+SCHEMA = """
+CREATE TABLE dump (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL UNIQUE,
+    source TEXT NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE blob (
+    hash INTEGER PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE version (
+    member INTEGER NOT NULL,
+    key INTEGER NOT NULL,
+    owner INTEGER NOT NULL,
+    valid_from INTEGER NOT NULL,
+    valid_to INTEGER,
+    hash INTEGER NOT NULL,
+    line_hash INTEGER NOT NULL
+);
+CREATE INDEX version_key ON version (member, key, valid_from);
+CREATE INDEX version_owner ON version (member, owner, valid_from);
+CREATE INDEX version_open ON version (member) WHERE valid_to IS NULL;
+"""
+
+# Rows buffered per executemany while ingesting.
+WRITE_BATCH = 10_000
+
+DateLike = Union[str, datetime.date]
+
+
+@dataclass(frozen=True)
+class Version:
+    """
+    Content of a record from the dump of valid_from until the dump of valid_to, exclusive;
+    valid_to is None while the record is unchanged in the latest dump.
+    """
+
+    valid_from: str
+    valid_to: Optional[str]
+    record: dict
+
+
+def _as_date(value: DateLike) -> str:
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return datetime.date.fromisoformat(value).isoformat()
+
+
+def dump_date(path: str) -> str:
+    """
+    The date in a dump's file name, e.g. 2024-01-02 for dump-2024-01-02.210517Z.zip.
+
+    Raises:
+        ValueError: if the name holds no YYYY-MM-DD or YYYYMMDD date
+    """
+    match = re.search(r"(\d{4})-?(\d{2})-?(\d{2})", os.path.basename(path))
+    if match is None:
+        raise ValueError(f"No date in dump name {path}")
+    return _as_date("-".join(match.groups()))
+
+
+def line_hash(line: bytes) -> int:
+    """
+    64-bit hash of a raw line, as a signed int like content_hash().
+    """
+    digest = hashlib.blake2b(line, digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+class HistoryStore:
+    """
+    SQLite database of dump versions, see the module docstring.
+    """
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path, isolation_level=None)
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version == 0:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        elif version != SCHEMA_VERSION:
+            raise ValueError(f"{db_path} has history schema {version}, not {SCHEMA_VERSION}")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def dumps(self) -> List[Tuple[str, str]]:
+        """
+        (date, source path) of the ingested dumps, oldest first.
+        """
+        return self.conn.execute("SELECT date, source FROM dump ORDER BY date").fetchall()
+
+    def ingest(
+        self,
+        archive_path: str,
+        date: Optional[DateLike] = None,
+        members: Optional[Iterable[str]] = None,
+    ) -> Dict[str, Counter]:
+        """
+        Add a dump newer than every ingested one, in one transaction.
+
+        Members missing from the archive are skipped, so their records stay current.
+
+        Args:
+            archive_path: Path to the archive
+            date: Date of the dump, taken from the file name by default (see dump_date())
+            members: Members to ingest, defaults to all of MEMBER_KEYS
+
+        Returns:
+            Dictionary mapping member names to Counters of added/changed/removed/unchanged
+            records, and of invalid and duplicate lines, which are skipped
+
+        Raises:
+            ValueError: if the dump is not newer than the latest ingested one
+        """
+        date = _as_date(date) if date is not None else dump_date(archive_path)
+        latest = self.conn.execute("SELECT max(date) FROM dump").fetchone()[0]
+        if latest is not None and date <= latest:
+            raise ValueError(f"Dump of {date} is not newer than the latest one, {latest}")
+
+        results: Dict[str, Counter] = {}
+        with WikiArchiveLoader(archive_path) as loader:
+            available = set(loader.members())
+            self.conn.execute("BEGIN")
+            try:
+                dump_id = self.conn.execute(
+                    "INSERT INTO dump (date, source, ingested_at) VALUES (?, ?, ?)",
+                    (date, os.path.abspath(archive_path), datetime.datetime.now().isoformat()),
+                ).lastrowid
+                for filename in members or MEMBER_KEYS:
+                    if filename not in available:
+                        logger.warning(f"{filename} not in {archive_path}, keeping its records")
+                        continue
+                    results[filename] = self._ingest_member(loader, filename, dump_id)
+                    logger.info(f"{date} {filename}: {dict(results[filename])}")
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return results
+
+    def _ingest_member(self, loader: WikiArchiveLoader, filename: str, dump_id: int) -> Counter:
+        member = MEMBER_IDS[filename]
+        key_fields = MEMBER_KEYS[filename]
+        counts = Counter(added=0, changed=0, removed=0, unchanged=0)
+
+        # open versions: key -> (rowid, content hash), and line hash -> key
+        current: Dict[int, Tuple[int, int]] = {}
+        current_lines: Dict[int, int] = {}
+        for rowid, key, content, line in self.conn.execute(
+            "SELECT rowid, key, hash, line_hash FROM version"
+            " WHERE member = ? AND valid_to IS NULL",
+            (member,),
+        ):
+            current[key] = (rowid, content)
+            current_lines[line] = key
+
+        seen = set()
+        closed: List[Tuple[int, int]] = []
+        versions: List[tuple] = []
+        blobs: Dict[int, bytes] = {}
+        relined: List[Tuple[int, int]] = []
+
+        def flush():
+            self.conn.executemany("INSERT OR IGNORE INTO blob VALUES (?, ?)", blobs.items())
+            self.conn.executemany("UPDATE version SET valid_to = ? WHERE rowid = ?", closed)
+            self.conn.executemany("UPDATE version SET line_hash = ? WHERE rowid = ?", relined)
+            self.conn.executemany("INSERT INTO version VALUES (?, ?, ?, ?, NULL, ?, ?)", versions)
+            for pending in (blobs, closed, relined, versions):
+                pending.clear()
+
+        for line_number, line in loader.iter_raw_lines(filename):
+            line = line.strip()
+            raw_hash = line_hash(line)
+            # popped, so a repeated line is parsed and reported as a duplicate
+            key = current_lines.pop(raw_hash, None)
+            if key is not None and key not in seen:
+                seen.add(key)
+                counts["unchanged"] += 1
+                continue
+
+            try:
+                # keys and owners that are not ints, e.g. "invalid-123", never become versions
+                record, key = keyed_record(line, key_fields)
+            except ValueError as e:
+                logger.warning(f"Skipping invalid line {filename}:{line_number}: {e}")
+                counts["invalid"] += 1
+                continue
+            if key in seen:
+                counts["duplicate"] += 1
+                continue
+            seen.add(key)
+            owner = record[key_fields[0]]
+
+            content = content_hash(record)
+            previous = current.get(key)
+            if previous is not None and previous[1] == content:
+                # same content in different bytes
+                relined.append((raw_hash, previous[0]))
+                counts["unchanged"] += 1
+            else:
+                if previous is not None:
+                    closed.append((dump_id, previous[0]))
+                    counts["changed"] += 1
+                else:
+                    counts["added"] += 1
+                if content not in blobs:
+                    blobs[content] = zlib.compress(canonical_json(record).encode("utf-8"))
+                versions.append((member, key, owner, dump_id, content, raw_hash))
+            if len(versions) + len(relined) >= WRITE_BATCH:
+                flush()
+
+        for key, (rowid, _) in current.items():
+            if key not in seen:
+                closed.append((dump_id, rowid))
+                counts["removed"] += 1
+        flush()
+        return counts
+
+    def _dump_at(self, date: DateLike) -> Optional[int]:
+        """
+        Id of the latest dump taken on or before date.
+        """
+        row = self.conn.execute(
+            "SELECT id FROM dump WHERE date <= ? ORDER BY date DESC LIMIT 1", (_as_date(date),)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def _record(self, content: int) -> dict:
+        data = self.conn.execute("SELECT data FROM blob WHERE hash = ?", (content,)).fetchone()[0]
+        return from_json(zlib.decompress(data))
+
+    @staticmethod
+    def _entity_member(entity_type: str) -> int:
+        if entity_type not in ENTITY_MEMBERS:
+            raise ValueError(
+                f"Unknown entity type {entity_type}, expected one of {list(ENTITY_MEMBERS)}"
+            )
+        return MEMBER_IDS[ENTITY_MEMBERS[entity_type]]
+
+    def get_entity_at(self, entity_type: str, entity_id: int, date: DateLike) -> Optional[dict]:
+        """
+        An entity as it was in the latest dump taken on or before date.
+
+        Args:
+            entity_type: subject, person, character or episode
+            entity_id: Id of the entity
+            date: Date as YYYY-MM-DD or datetime.date
+
+        Returns:
+            The record as it appeared in the dump, or None if that dump did not have it
+        """
+        member = self._entity_member(entity_type)
+        dump_id = self._dump_at(date)
+        if dump_id is None:
+            return None
+        row = self.conn.execute(
+            "SELECT hash FROM version WHERE member = ? AND key = ? AND valid_from <= ?"
+            " AND (valid_to IS NULL OR valid_to > ?)",
+            (member, entity_id, dump_id, dump_id),
+        ).fetchone()
+        return self._record(row[0]) if row is not None else None
+
+    def history(self, entity_type: str, entity_id: int) -> List[Version]:
+        """
+        Every distinct content of an entity, oldest first; gaps between versions are dumps
+        that did not have it.
+        """
+        member = self._entity_member(entity_type)
+        rows = self.conn.execute(
+            "SELECT f.date, t.date, v.hash FROM version v"
+            " JOIN dump f ON f.id = v.valid_from LEFT JOIN dump t ON t.id = v.valid_to"
+            " WHERE v.member = ? AND v.key = ? ORDER BY v.valid_from",
+            (member, entity_id),
+        ).fetchall()
+        return [
+            Version(valid_from, valid_to, self._record(content))
+            for valid_from, valid_to, content in rows
+        ]
+
+    def get_records_at(self, filename: str, owner_id: int, date: DateLike) -> List[dict]:
+        """
+        Records of a member whose first key field is owner_id, as they were in the latest
+        dump taken on or before date, e.g. the staff of a subject from subject-persons.
+
+        Args:
+            filename: Member name, one of MEMBER_KEYS
+            owner_id: Value of the member's first key field (subject_id for subject-persons)
+            date: Date as YYYY-MM-DD or datetime.date
+
+        Returns:
+            The records, in the order their current versions were stored
+        """
+        if filename not in MEMBER_IDS:
+            raise ValueError(f"Unknown member {filename}")
+        dump_id = self._dump_at(date)
+        if dump_id is None:
+            return []
+        rows = self.conn.execute(
+            "SELECT hash FROM version WHERE member = ? AND owner = ? AND valid_from <= ?"
+            " AND (valid_to IS NULL OR valid_to > ?) ORDER BY rowid",
+            (MEMBER_IDS[filename], owner_id, dump_id, dump_id),
+        ).fetchall()
+        return [self._record(content) for (content,) in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Numbers of dumps, distinct record contents (blobs) and version rows.
+        """
+        return {
+            table: self.conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            for table in ("dump", "blob", "version")
+        }
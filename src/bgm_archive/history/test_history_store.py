@@ -0,0 +1,151 @@
+import json
+import zipfile
+from collections import Counter
+
+import pytest
+
+from bgm_archive.history.history_store import HistoryStore, dump_date
+
+
+def _rewrite(source, target, edits, reformat=()):
+    """
+    Copy a zip archive, passing each member's records through edits[member] when present
+    and re-serializing the members in reformat with spaces.
+    """
+    with zipfile.ZipFile(source) as src, zipfile.ZipFile(target, "w") as dst:
+        for info in src.infolist():
+            lines = src.read(info).splitlines(keepends=True)
+            if info.filename in edits or info.filename in reformat:
+                records = [json.loads(line) for line in lines if line.strip()]
+                records = edits.get(info.filename, lambda records: records)(records)
+                lines = [json.dumps(record).encode() + b"\n" for record in records]
+            dst.writestr(info.filename, b"".join(lines))
+
+
+def _set_score(score):
+    def edit(records):
+        records[0]["score"] = score
+        return records
+
+    return edit
+
+
+@pytest.fixture
+def dumps(wiki_archive_path, tmp_path):
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        original_score = json.loads(archive.read("subject.jsonlines").splitlines()[0])["score"]
+    second = tmp_path / "dump-2024-01-08.zip"
+    _rewrite(
+        wiki_archive_path,
+        second,
+        {
+            "subject.jsonlines": _set_score(9.9),
+            "episode.jsonlines": lambda records: records[1:],
+            "subject-relations.jsonlines": lambda records: records
+            + [{"subject_id": 1, "relation_type": 2, "related_subject_id": 2, "order": 0}],
+        },
+        reformat=["person.jsonlines"],
+    )
+    third = tmp_path / "dump-20240115.zip"
+    _rewrite(second, third, {"subject.jsonlines": _set_score(original_score)})
+    return wiki_archive_path, second, third
+
+
+def test_ingest_stores_changes_only(dumps, tmp_path):
+    first, second, third = dumps
+    store = HistoryStore(str(tmp_path / "history.db"))
+
+    results = store.ingest(str(first), "2024-01-01")
+    assert results["subject.jsonlines"] == Counter(added=20, changed=0, removed=0, unchanged=0)
+    after_first = store.counts()
+
+    results = store.ingest(str(second))
+    assert results["subject.jsonlines"] == Counter(changed=1, unchanged=19, added=0, removed=0)
+    assert results["episode.jsonlines"]["removed"] == 1
+    assert results["subject-relations.jsonlines"]["added"] == 1
+    # reformatted lines with the same content are no new versions
+    assert results["person.jsonlines"]["unchanged"] == 20
+    assert store.counts()["version"] == after_first["version"] + 2
+
+    results = store.ingest(str(third))
+    assert results["subject.jsonlines"]["changed"] == 1
+    assert results["person.jsonlines"] == Counter(unchanged=20, added=0, changed=0, removed=0)
+    # the reverted subject reuses its first blob
+    assert store.counts()["blob"] == after_first["blob"] + 2
+    assert [date for date, _ in store.dumps()] == ["2024-01-01", "2024-01-08", "2024-01-15"]
+
+    with pytest.raises(ValueError, match="not newer"):
+        store.ingest(str(first), "2024-01-15")
+    store.close()
+
+
+def test_time_travel_queries(dumps, tmp_path, wiki_archive_path):
+    first, second, third = dumps
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        original = json.loads(archive.read("subject.jsonlines").splitlines()[0])
+        episode = json.loads(archive.read("episode.jsonlines").splitlines()[0])
+
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        for path, date in ((first, "2024-01-01"), (second, None), (third, None)):
+            store.ingest(str(path), date)
+
+        subject_id = original["id"]
+        assert store.get_entity_at("subject", subject_id, "2023-12-31") is None
+        assert store.get_entity_at("subject", subject_id, "2024-01-07") == original
+        assert store.get_entity_at("subject", subject_id, "2024-01-08")["score"] == 9.9
+        assert store.get_entity_at("subject", subject_id, "2030-01-01") == original
+
+        versions = store.history("subject", subject_id)
+        assert [(v.valid_from, v.valid_to) for v in versions] == [
+            ("2024-01-01", "2024-01-08"),
+            ("2024-01-08", "2024-01-15"),
+            ("2024-01-15", None),
+        ]
+        assert [v.record["score"] for v in versions] == [original["score"], 9.9, original["score"]]
+
+        assert store.get_entity_at("episode", episode["id"], "2024-01-01") == episode
+        assert store.get_entity_at("episode", episode["id"], "2024-01-08") is None
+        assert [v.valid_to for v in store.history("episode", episode["id"])] == ["2024-01-08"]
+
+        relations = "subject-relations.jsonlines"
+        before = store.get_records_at(relations, 1, "2024-01-01")
+        after = store.get_records_at(relations, 1, "2024-01-08")
+        assert [r["related_subject_id"] for r in after] == [
+            r["related_subject_id"] for r in before
+        ] + [2]
+
+        with pytest.raises(ValueError):
+            store.history("subject-relations", 1)
+
+
+def test_invalid_keys_are_skipped(wiki_archive_path, tmp_path):
+    def add_invalid(field):
+        # as generate-archive --invalid-rate writes them
+        return lambda records: records + [{**records[0], field: f"invalid-{records[0][field]}"}]
+
+    path = tmp_path / "dump-2024-01-01.zip"
+    _rewrite(
+        wiki_archive_path,
+        path,
+        {
+            "subject.jsonlines": add_invalid("id"),
+            # the owner of a relation line
+            "subject-persons.jsonlines": add_invalid("subject_id"),
+        },
+    )
+
+    with HistoryStore(str(tmp_path / "history.db")) as store:
+        results = store.ingest(str(path))
+
+        for filename in ("subject.jsonlines", "subject-persons.jsonlines"):
+            assert results[filename]["invalid"] == 1
+            assert results[filename]["added"] == 20
+        types = store.conn.execute("SELECT DISTINCT typeof(key), typeof(owner) FROM version")
+        assert types.fetchall() == [("integer", "integer")]
+
+
+def test_dump_date():
+    assert dump_date("/dumps/dump-2024-01-02.210517Z.zip") == "2024-01-02"
+    assert dump_date("bangumi-20240102.zip") == "2024-01-02"
+    with pytest.raises(ValueError):
+        dump_date("archive.zip")
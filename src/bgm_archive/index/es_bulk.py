@@ -0,0 +1,310 @@
+"""
+Bulk ingest of archive entries into Elasticsearch (or any server speaking its _bulk API).
+
+Entries are encoded once into NDJSON action/source line pairs and packed into requests of
+at most max_bytes. Up to `concurrency` requests are in flight at a time, each on a
+keep-alive connection of its worker thread, closed when ingest() returns. Items a partial response reports as
+retryable (429 / 5xx) are re-sent alone, with exponential backoff; other item errors are
+counted as failed. Only the standard library is used.
+"""
+
+import http.client
+import json
+import logging
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel
+
+from ..diff.archive_diff import MEMBER_KEYS
+from ..loader.records import Record
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+# Item statuses worth re-sending: rejected for back pressure or failed on the server side.
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# (action line, source line), both encoded and newline-terminated
+BulkItem = Tuple[bytes, bytes]
+
+
+@dataclass
+class IngestStats:
+    docs: int = 0
+    indexed: int = 0
+    failed: int = 0
+    retried_items: int = 0
+    requests: int = 0
+    bytes_sent: int = 0
+    seconds: float = 0.0
+    # first error of each failed item, up to 10
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def docs_per_sec(self) -> float:
+        return self.indexed / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**asdict(self), "docs_per_sec": self.docs_per_sec}
+
+
+class BulkRequestError(Exception):
+    """
+    A _bulk request failed as a whole, after all retries.
+    """
+
+
+def encode_item(index: str, doc_id: Optional[str], source: Any) -> BulkItem:
+    """
+    The NDJSON lines indexing one document. source is a model, a slots Record, a named
+    tuple or a dict; models are dumped by alias, so documents keep the archive's field names.
+    """
+    action: Dict[str, Any] = {"_index": index}
+    if doc_id is not None:
+        action["_id"] = doc_id
+    if isinstance(source, Record):
+        source = source.to_model()
+    if isinstance(source, BaseModel):
+        body = source.model_dump_json(by_alias=True).encode("utf-8")
+    else:
+        if hasattr(source, "_asdict"):
+            source = source._asdict()
+        body = json.dumps(source, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps({"index": action}).encode("utf-8") + b"\n", body + b"\n"
+
+
+def pack_batches(items: Iterable[BulkItem], max_bytes: int) -> Iterator[List[BulkItem]]:
+    """
+    Group items into batches whose NDJSON body stays within max_bytes; an item larger
+    than max_bytes is sent in a batch of its own.
+    """
+    batch: List[BulkItem] = []
+    size = 0
+    for item in items:
+        item_size = len(item[0]) + len(item[1])
+        if batch and size + item_size > max_bytes:
+            yield batch
+            batch, size = [], 0
+        batch.append(item)
+        size += item_size
+    if batch:
+        yield batch
+
+
+class BulkIngester:
+    """
+    Sends NDJSON batches to <url>/_bulk with a bounded window of concurrent requests.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        max_bytes: int = 5 * 2**20,
+        concurrency: int = 4,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        timeout: float = 60.0,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Args:
+            url: Base URL of the cluster, e.g. http://localhost:9200
+            max_bytes: Maximum body size of one _bulk request
+            concurrency: Maximum number of requests in flight
+            max_retries: Attempts after the first for a request or a failed item
+            backoff: Delay before the first retry, doubled for each further one
+            timeout: Socket timeout of one request
+            headers: Extra HTTP headers, e.g. Authorization
+        """
+        parsed = urllib.parse.urlsplit(url)
+        if parsed.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {url}")
+        self.__scheme = parsed.scheme
+        self.__netloc = parsed.netloc
+        self.__path = parsed.path.rstrip("/") + "/_bulk"
+        self.__headers = {"Content-Type": "application/x-ndjson", **(headers or {})}
+        self.max_bytes = max_bytes
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__connections: List[http.client.HTTPConnection] = []
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self.__local, "connection", None)
+        if connection is None:
+            cls = (
+                http.client.HTTPSConnection
+                if self.__scheme == "https"
+                else http.client.HTTPConnection
+            )
+            connection = cls(self.__netloc, timeout=self.timeout)
+            self.__local.connection = connection
+            with self.__lock:
+                self.__connections.append(connection)
+        return connection
+
+    def _close_connections(self):
+        with self.__lock:
+            connections, self.__connections = self.__connections, []
+        for connection in connections:
+            connection.close()
+
+    def _post(self, body: bytes) -> Tuple[int, bytes]:
+        connection = self._connection()
+        try:
+            connection.request("POST", self.__path, body=body, headers=self.__headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            # drop the connection, the retry reconnects
+            connection.close()
+            self.__local.connection = None
+            with self.__lock:
+                self.__connections.remove(connection)
+            raise
+
+    def _send(self, batch: Sequence[BulkItem], stats: IngestStats):
+        """
+        Send one batch, re-sending retryable failed items until they succeed or retries
+        run out. Runs in a worker thread.
+        """
+        pending = list(batch)
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            responded = False
+            body = b"".join(line for item in pending for line in item)
+            try:
+                status, payload = self._post(body)
+            except (OSError, http.client.HTTPException) as e:
+                logger.warning(f"_bulk request failed ({e}), attempt {attempt + 1}")
+                continue
+            with self.__lock:
+                stats.requests += 1
+                stats.bytes_sent += len(body)
+            if status in RETRYABLE_STATUSES:
+                logger.warning(f"_bulk request rejected with {status}, attempt {attempt + 1}")
+                continue
+            if status >= 300:
+                raise BulkRequestError(f"_bulk request failed with {status}: {payload[:500]!r}")
+
+            response = json.loads(payload)
+            items = response.get("items", [])
+            if len(items) != len(pending):
+                raise BulkRequestError(f"{len(items)} results for {len(pending)} items")
+            responded = True
+            retry, indexed, failed = [], 0, []
+            for item, result in zip(pending, items):
+                outcome = next(iter(result.values()))
+                item_status = outcome.get("status", 500)
+                if item_status < 300:
+                    indexed += 1
+                elif item_status in RETRYABLE_STATUSES:
+                    retry.append(item)
+                else:
+                    failed.append(outcome)
+            with self.__lock:
+                stats.indexed += indexed
+                stats.failed += len(failed)
+                stats.retried_items += len(retry) if attempt < self.max_retries else 0
+                stats.errors.extend(failed[: max(10 - len(stats.errors), 0)])
+            if not retry:
+                return
+            pending = retry
+
+        with self.__lock:
+            stats.failed += len(pending)
+        # items still rejected in a valid response are counted as failed above
+        if not responded:
+            raise BulkRequestError(f"_bulk request failed after {self.max_retries} retries")
+
+    def ingest(self, items: Iterable[BulkItem]) -> IngestStats:
+        """
+        Send all items, keeping at most `concurrency` requests in flight.
+
+        Raises:
+            BulkRequestError: when a request fails as a whole after all retries, or the
+                server rejects it as invalid
+        """
+        stats = IngestStats()
+        start = time.perf_counter()
+        in_flight: set[Future] = set()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                try:
+                    for batch in pack_batches(items, self.max_bytes):
+                        if len(in_flight) >= self.concurrency:
+                            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                future.result()
+                        stats.docs += len(batch)
+                        in_flight.add(executor.submit(self._send, batch, stats))
+                    for future in in_flight:
+                        future.result()
+                finally:
+                    for future in in_flight:
+                        future.cancel()
+                    stats.seconds = time.perf_counter() - start
+        finally:
+            # the worker threads are gone, their keep-alive connections must not linger
+            self._close_connections()
+        return stats
+
+
+def index_name(prefix: str, filename: str) -> str:
+    """
+    Index of an archive member, e.g. "bgm-subject" or "bgm-subject-relations".
+    """
+    return f"{prefix}-{filename.removesuffix('.jsonlines')}"
+
+
+def archive_items(
+    loader: WikiArchiveLoader, members: Iterable[str], prefix: str = "bgm"
+) -> Iterator[BulkItem]:
+    """
+    Encoded items of the given members; documents are keyed by id, or by their composite
+    key joined with "-" for relation members.
+    """
+    for filename in members:
+        key_fields = MEMBER_KEYS[filename]
+        index = index_name(prefix, filename)
+        for entry in loader.iter_member(filename):
+            if isinstance(entry, dict):
+                key = [entry[name] for name in key_fields]
+            else:
+                key = [getattr(entry, name) for name in key_fields]
+            yield encode_item(index, "-".join(map(str, key)), entry)
+
+
+def ingest_archive(
+    loader: WikiArchiveLoader,
+    url: str,
+    members: Optional[Iterable[str]] = None,
+    prefix: str = "bgm",
+    **ingester_kwargs,
+) -> IngestStats:
+    """
+    Bulk index the members of an archive, one index per member.
+
+    Args:
+        loader: Loader to read entries with, e.g. a RawWikiArchiveLoader for trusted dumps
+        url: Base URL of the cluster
+        members: Members to ingest, defaults to all of FILE_MODEL_MAP
+        prefix: Prefix of the index names
+        **ingester_kwargs: Passed to BulkIngester
+
+    Returns:
+        IngestStats of the whole run
+    """
+    ingester = BulkIngester(url, **ingester_kwargs)
+    return ingester.ingest(
+        archive_items(loader, members or WikiArchiveLoader.FILE_MODEL_MAP, prefix)
+    )
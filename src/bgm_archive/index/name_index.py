@@ -0,0 +1,453 @@
+"""
+Inverted index over the names of subjects, persons and characters.
+
+Names come from name / name_cn, the 中文名 / 简体中文名 infobox fields and the 别名 list.
+Text is NFKC-normalized and case-folded, then tokenized:
+
+- Chinese / Japanese / Korean runs into overlapping bigrams ("鲁路修" -> "鲁路", "路修"),
+  plus single characters, so one-character queries still match
+- everything else into words of letters and digits
+
+Each term's posting list holds the document indexes (delta-encoded varints) and a flag
+byte per document telling whether the term occurs in a name or only in an alias. All
+arrays are .npy files memory-mapped on open, so a query only touches the pages of its
+terms' posting lists.
+
+Layout:
+    INDEX_DIR/manifest.json
+    INDEX_DIR/term_hash.npy, term.heap.npy, term.offsets.npy
+    INDEX_DIR/posting_offsets.npy, postings.npy, flag_offsets.npy, flags.npy
+    INDEX_DIR/kind.npy, id.npy, name_terms.npy, popularity.npy
+    INDEX_DIR/name.heap.npy, name.offsets.npy, name_cn.heap.npy, name_cn.offsets.npy
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..loader.columnar import StringHeap
+from ..loader.fingerprint import archive_fingerprint, fingerprint_matches
+from ..loader.infobox import parse_infobox
+from ..loader.raw_loader import RawWikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# Document kinds, in document order: (kind, archive member)
+KINDS: List[Tuple[str, str]] = [
+    ("subject", "subject.jsonlines"),
+    ("person", "person.jsonlines"),
+    ("character", "character.jsonlines"),
+]
+
+# Infobox fields holding a translated name, indexed like name_cn.
+NAME_KEYS = ("中文名", "简体中文名")
+
+# Posting flags, and the weight of a match in a name vs. only in an alias
+NAME = 1
+ALIAS = 2
+ALIAS_WEIGHT = 0.7
+
+# Kana (except the "・" separator), CJK ideographs and Hangul syllables.
+_CJK_RUN = re.compile(
+    "([\u3040-\u30fa\u30fc-\u30ff\u31f0-\u31ff\u3400-\u4dbf\u4e00-\u9fff"
+    "\uf900-\ufaff\uac00-\ud7af]+)"
+)
+_WORD = re.compile(r"[^\W_]+")
+
+
+def normalize(text: str) -> str:
+    """
+    NFKC and case folding, so full-width letters, half-width kana and case all match.
+    """
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+def tokenize(text: str, unigrams: bool = False) -> List[str]:
+    """
+    Terms of a text, in order and with repetitions.
+
+    Args:
+        text: Text to tokenize
+        unigrams: Also emit every character of CJK runs of two or more characters, as
+            the index does. Queries leave it off: their bigrams are more selective.
+
+    Returns:
+        Bigrams of CJK runs (single characters for one-character runs) and words of the
+        remaining text
+    """
+    terms: List[str] = []
+    # re.split with a capturing group alternates non-CJK and CJK parts
+    for position, part in enumerate(_CJK_RUN.split(normalize(text))):
+        if position % 2 == 0:
+            terms.extend(_WORD.findall(part))
+        elif len(part) == 1:
+            terms.append(part)
+        else:
+            terms.extend(part[i : i + 2] for i in range(len(part) - 1))
+            if unigrams:
+                terms.extend(part)
+    return terms
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little"
+    )
+
+
+def encode_varints(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    LEB128-encode non-negative integers below 2**35.
+
+    Returns:
+        Tuple of (encoded bytes as uint8, byte length of each value)
+    """
+    values = np.asarray(values, dtype=np.int64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in (7, 14, 21, 28):
+        lengths += values >= (1 << shift)
+    starts = np.cumsum(lengths) - lengths
+    out = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    for byte in range(5):
+        mask = lengths > byte
+        if not mask.any():
+            break
+        chunk = (values[mask] >> (7 * byte)) & 0x7F
+        more = (lengths[mask] > byte + 1).astype(np.int64) << 7
+        out[starts[mask] + byte] = chunk | more
+    return out, lengths
+
+
+def decode_varints(data: np.ndarray) -> np.ndarray:
+    """
+    Inverse of encode_varints, vectorized over the whole buffer.
+    """
+    data = np.asarray(data, dtype=np.int64)
+    if not len(data):
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(data)) - np.repeat(starts, ends - starts + 1)
+    return np.add.reduceat((data & 0x7F) << (7 * position), starts)
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    kind: str
+    id: int
+    score: float
+    name: str
+    name_cn: str
+
+
+def _entity_names(kind: str, record: dict) -> Tuple[List[str], List[str], int]:
+    """
+    (names, aliases, popularity) of an archive record.
+    """
+    infobox = parse_infobox(record["infobox"])
+    names = [record["name"], record.get("name_cn", "")]
+    names.extend(infobox.text(key) or "" for key in NAME_KEYS)
+    if kind == "subject":
+        popularity = sum(record["favorite"].values())
+    else:
+        popularity = record["collects"]
+    return [name for name in names if name], infobox.aliases, popularity
+
+
+def _translated_name(kind: str, record: dict) -> str:
+    if kind == "subject":
+        return record["name_cn"]
+    return parse_infobox(record["infobox"]).text("简体中文名") or ""
+
+
+class NameIndex:
+    """
+    Reader for a name index directory written by NameIndex.build().
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / MANIFEST_NAME, encoding="utf-8") as file:
+            self.manifest = json.load(file)
+
+        def load(name: str) -> np.ndarray:
+            return np.load(self.index_dir / f"{name}.npy", mmap_mode="r")
+
+        self.__term_hash = load("term_hash")
+        self.__terms = StringHeap(load("term.heap"), load("term.offsets"))
+        self.__posting_offsets = load("posting_offsets")
+        self.__postings = load("postings")
+        self.__flag_offsets = load("flag_offsets")
+        self.__flags = load("flags")
+        self.__kind = load("kind")
+        self.__id = load("id")
+        self.__name_terms = load("name_terms")
+        self.__popularity = load("popularity")
+        self.__names = StringHeap(load("name.heap"), load("name.offsets"))
+        self.__names_cn = StringHeap(load("name_cn.heap"), load("name_cn.offsets"))
+
+    def __len__(self) -> int:
+        return len(self.__id)
+
+    def _term_index(self, term: str) -> Optional[int]:
+        hashed = np.uint64(term_hash(term))
+        index = int(np.searchsorted(self.__term_hash, hashed))
+        # colliding hashes are adjacent; the term heap tells them apart
+        while index < len(self.__term_hash) and self.__term_hash[index] == hashed:
+            if self.__terms[index] == term:
+                return index
+            index += 1
+        return None
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Document indexes and flags of a term, empty arrays if it is not indexed.
+        """
+        index = self._term_index(term)
+        if index is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.uint8)
+        start, end = self.__posting_offsets[index], self.__posting_offsets[index + 1]
+        docs = np.cumsum(decode_varints(self.__postings[start:end]))
+        start, end = self.__flag_offsets[index], self.__flag_offsets[index + 1]
+        return docs, np.asarray(self.__flags[start:end])
+
+    def search(
+        self, query: str, kinds: Optional[Iterable[str]] = None, limit: int = 20
+    ) -> List[SearchHit]:
+        """
+        Documents matching any term of the query, best first.
+
+        A document scores the idf-weighted share of query terms it contains (terms found
+        only in aliases count ALIAS_WEIGHT), raised by up to a quarter when the query
+        covers most of one of its names, plus a small popularity prior for ties.
+
+        Args:
+            query: Free text, tokenized like the indexed names
+            kinds: Restrict results to some of "subject", "person" and "character"
+            limit: Maximum number of hits
+
+        Returns:
+            Hits ordered by descending score
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or limit <= 0:
+            return []
+
+        total = len(self)
+        doc_parts, score_parts, name_parts = [], [], []
+        idf_sum = 0.0
+        for term in terms:
+            docs, flags = self.postings(term)
+            # unknown terms still count in idf_sum: a query with them matches worse
+            idf = math.log(1 + total / (len(docs) + 1))
+            idf_sum += idf
+            if not len(docs):
+                continue
+            in_name = (flags & NAME) != 0
+            doc_parts.append(docs)
+            score_parts.append(np.where(in_name, idf, idf * ALIAS_WEIGHT))
+            name_parts.append(in_name)
+        if not doc_parts:
+            return []
+
+        docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        coverage = np.bincount(inverse, np.concatenate(score_parts)) / idf_sum
+        name_matches = np.bincount(inverse, np.concatenate(name_parts).astype(np.float64))
+        tightness = np.minimum(1.0, name_matches / np.maximum(self.__name_terms[docs], 1))
+        scores = coverage * (1 + 0.25 * tightness) + 0.01 * self.__popularity[docs]
+
+        if kinds is not None:
+            codes = [code for code, (kind, _) in enumerate(KINDS) if kind in set(kinds)]
+            mask = np.isin(self.__kind[docs], codes)
+            docs, scores = docs[mask], scores[mask]
+        if len(docs) > limit:
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            docs, scores = docs[top], scores[top]
+        order = np.lexsort((docs, -scores))
+
+        return [
+            SearchHit(
+                kind=KINDS[self.__kind[doc]][0],
+                id=int(self.__id[doc]),
+                score=float(score),
+                name=self.__names[doc],
+                name_cn=self.__names_cn[doc],
+            )
+            for doc, score in zip(docs[order], scores[order])
+        ]
+
+    @staticmethod
+    def is_stale(index_dir: str, archive_path: str) -> bool:
+        """
+        Check whether the index is missing, outdated, or built from a different archive.
+        """
+        try:
+            with open(Path(index_dir) / MANIFEST_NAME, encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return True
+        if manifest.get("version") != INDEX_VERSION:
+            return True
+        return not fingerprint_matches(manifest["archive"], archive_path)
+
+    @classmethod
+    def build(cls, archive_path: str, index_dir: str, with_hash: bool = False) -> "NameIndex":
+        """
+        (Re)build the index from an archive, streaming each entity member once.
+
+        Args:
+            archive_path: Path to the zip archive
+            index_dir: Output directory, existing index files are replaced
+            with_hash: Record the archive's sha256 for staleness checks
+
+        Returns:
+            A reader for the new index
+        """
+        index_path = Path(index_dir)
+        index_path.mkdir(parents=True, exist_ok=True)
+        # the manifest is written last: an index without one is never considered fresh
+        (index_path / MANIFEST_NAME).unlink(missing_ok=True)
+
+        fingerprint = archive_fingerprint(archive_path, with_hash=with_hash)
+        postings: Dict[str, Tuple[array, bytearray]] = {}
+        columns = {name: array(code) for name, code in _DOC_COLUMNS}
+        names = {"name": _HeapWriter(), "name_cn": _HeapWriter()}
+        documents = {}
+
+        with RawWikiArchiveLoader(archive_path) as loader:
+            for code, (kind, filename) in enumerate(KINDS):
+                count = 0
+                for record in loader.iter_member(filename):
+                    doc = len(columns["id"])
+                    entity_names, aliases, popularity = _entity_names(kind, record)
+                    flags: Dict[str, int] = {}
+                    for flag, texts in ((NAME, entity_names), (ALIAS, aliases)):
+                        for text in texts:
+                            for term in tokenize(text, unigrams=True):
+                                flags[term] = flags.get(term, 0) | flag
+                    for term, flag in flags.items():
+                        entry = postings.get(term)
+                        if entry is None:
+                            entry = postings[term] = (array("I"), bytearray())
+                        entry[0].append(doc)
+                        entry[1].append(flag)
+
+                    columns["kind"].append(code)
+                    columns["id"].append(record["id"])
+                    columns["name_terms"].append(
+                        min(len(set(tokenize(name))) for name in entity_names)
+                        if entity_names
+                        else 0
+                    )
+                    columns["popularity"].append(popularity)
+                    names["name"].append(record["name"])
+                    names["name_cn"].append(_translated_name(kind, record))
+                    count += 1
+                documents[kind] = count
+                logger.info(f"Indexed the names of {count} {kind}s")
+
+        stats = _write_index(index_path, postings, columns, names)
+        manifest = {
+            "version": INDEX_VERSION,
+            "archive": {"path": os.path.abspath(archive_path), **fingerprint},
+            "documents": documents,
+            **stats,
+        }
+        with open(index_path / MANIFEST_NAME, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        return cls(index_dir)
+
+    @classmethod
+    def open_or_build(cls, archive_path: str, index_dir: str, **build_kwargs) -> "NameIndex":
+        """
+        Open the index, rebuilding it first when it is stale for archive_path.
+        """
+        if cls.is_stale(index_dir, archive_path):
+            logger.info(f"Name index at {index_dir} is stale, rebuilding")
+            return cls.build(archive_path, index_dir, **build_kwargs)
+        return cls(index_dir)
+
+
+# (column, array module typecode while building); popularity is normalized on write
+_DOC_COLUMNS = [("kind", "B"), ("id", "i"), ("name_terms", "H"), ("popularity", "q")]
+
+
+class _HeapWriter:
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("q", [0])
+
+    def append(self, text: str):
+        self.data += text.encode("utf-8")
+        self.offsets.append(len(self.data))
+
+    def save(self, directory: Path, name: str):
+        np.save(directory / f"{name}.heap.npy", np.frombuffer(self.data, dtype=np.uint8))
+        np.save(directory / f"{name}.offsets.npy", np.frombuffer(self.offsets, dtype=np.int64))
+
+
+def _write_index(
+    directory: Path,
+    postings: Dict[str, Tuple[array, bytearray]],
+    columns: Dict[str, array],
+    names: Dict[str, _HeapWriter],
+) -> dict:
+    """
+    Save the term dictionary sorted by term hash, with all posting lists delta-encoded in
+    one vectorized pass, and the document columns.
+    """
+    terms: Sequence[str] = list(postings)
+    if not terms:
+        raise ValueError("The archive has no names to index")
+    hashes = np.array([term_hash(term) for term in terms], dtype=np.uint64)
+    order = np.argsort(hashes, kind="stable")
+    terms = [terms[index] for index in order]
+
+    counts = np.array([len(postings[term][0]) for term in terms], dtype=np.int64)
+    flag_offsets = np.concatenate(([0], np.cumsum(counts)))
+    docs = np.concatenate(
+        [np.frombuffer(postings[term][0], dtype=np.uint32) for term in terms]
+    ).astype(np.int64)
+    flags = np.frombuffer(b"".join(postings[term][1] for term in terms), dtype=np.uint8)
+    # deltas within each list; the first entry of a list is its document index itself
+    deltas = np.diff(docs, prepend=0)
+    deltas[flag_offsets[:-1]] = docs[flag_offsets[:-1]]
+    encoded, lengths = encode_varints(deltas)
+    byte_ends = np.cumsum(lengths)
+    posting_offsets = np.concatenate(([0], byte_ends[flag_offsets[1:] - 1]))
+
+    term_heap = _HeapWriter()
+    for term in terms:
+        term_heap.append(term)
+    term_heap.save(directory, "term")
+    np.save(directory / "term_hash.npy", hashes[order])
+    np.save(directory / "posting_offsets.npy", posting_offsets)
+    np.save(directory / "postings.npy", encoded)
+    np.save(directory / "flag_offsets.npy", flag_offsets)
+    np.save(directory / "flags.npy", flags)
+
+    np.save(directory / "kind.npy", np.frombuffer(columns["kind"], dtype=np.uint8))
+    np.save(directory / "id.npy", np.frombuffer(columns["id"], dtype=np.int32))
+    np.save(directory / "name_terms.npy", np.frombuffer(columns["name_terms"], dtype=np.uint16))
+    # log-scaled to [0, 1], only used to break near ties
+    popularity = np.log1p(np.frombuffer(columns["popularity"], dtype=np.int64).clip(0))
+    if len(popularity) and popularity.max() > 0:
+        popularity /= popularity.max()
+    np.save(directory / "popularity.npy", popularity.astype(np.float32))
+    for name, heap in names.items():
+        heap.save(directory, name)
+
+    return {"terms": len(terms), "postings": len(docs), "posting_bytes": len(encoded)}
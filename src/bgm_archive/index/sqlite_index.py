@@ -0,0 +1,437 @@
+"""
+Indexed SQLite database built from a wiki archive.
+
+Every FILE_MODEL_MAP member is streamed into a normalized table with batched executemany
+inside large transactions. Secondary indexes are created after the load, so inserts never
+maintain them.
+"""
+
+import logging
+import os
+import sqlite3
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import tqdm
+from pydantic import BaseModel
+
+from ..loader.model import (
+    Subject,
+    Person,
+    Character,
+    Episode,
+    SubjectRelation,
+    SubjectPerson,
+    SubjectCharacter,
+    PersonCharacter,
+    ScoreDetails,
+)
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE subject (
+    id INTEGER PRIMARY KEY,
+    type INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_cn TEXT NOT NULL,
+    infobox TEXT NOT NULL,
+    platform INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    nsfw INTEGER NOT NULL,
+    score REAL NOT NULL,
+    rank INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    series INTEGER NOT NULL,
+    meta_tags TEXT,
+    score_1 INTEGER, score_2 INTEGER, score_3 INTEGER, score_4 INTEGER, score_5 INTEGER,
+    score_6 INTEGER, score_7 INTEGER, score_8 INTEGER, score_9 INTEGER, score_10 INTEGER,
+    favorite_wish INTEGER NOT NULL,
+    favorite_done INTEGER NOT NULL,
+    favorite_doing INTEGER NOT NULL,
+    favorite_on_hold INTEGER NOT NULL,
+    favorite_dropped INTEGER NOT NULL
+);
+CREATE TABLE subject_tag (
+    subject_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE person (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    type INTEGER NOT NULL,
+    infobox TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    comments INTEGER NOT NULL,
+    collects INTEGER NOT NULL
+);
+CREATE TABLE person_career (
+    person_id INTEGER NOT NULL,
+    career TEXT NOT NULL
+);
+CREATE TABLE character (
+    id INTEGER PRIMARY KEY,
+    role INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    infobox TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    comments INTEGER NOT NULL,
+    collects INTEGER NOT NULL
+);
+CREATE TABLE episode (
+    id INTEGER PRIMARY KEY,
+    subject_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    name_cn TEXT NOT NULL,
+    description TEXT NOT NULL,
+    airdate TEXT NOT NULL,
+    disc INTEGER NOT NULL,
+    duration TEXT NOT NULL,
+    sort REAL NOT NULL,
+    type INTEGER NOT NULL
+);
+CREATE TABLE subject_relation (
+    subject_id INTEGER NOT NULL,
+    relation_type INTEGER NOT NULL,
+    related_subject_id INTEGER NOT NULL,
+    "order" INTEGER NOT NULL
+);
+CREATE TABLE subject_person (
+    subject_id INTEGER NOT NULL,
+    person_id INTEGER NOT NULL,
+    position INTEGER NOT NULL
+);
+CREATE TABLE subject_character (
+    subject_id INTEGER NOT NULL,
+    character_id INTEGER NOT NULL,
+    type INTEGER NOT NULL,
+    "order" INTEGER NOT NULL
+);
+CREATE TABLE person_character (
+    person_id INTEGER NOT NULL,
+    subject_id INTEGER NOT NULL,
+    character_id INTEGER NOT NULL,
+    summary TEXT NOT NULL
+);
+"""
+
+# Created after the load. Entity tables are looked up through their INTEGER PRIMARY KEY.
+INDEXES = [
+    "CREATE INDEX subject_tag_subject_id ON subject_tag (subject_id)",
+    "CREATE INDEX person_career_person_id ON person_career (person_id)",
+    "CREATE INDEX episode_subject_id ON episode (subject_id)",
+    "CREATE INDEX subject_relation_subject_id ON subject_relation (subject_id)",
+    "CREATE INDEX subject_relation_related_subject_id ON subject_relation (related_subject_id)",
+    "CREATE INDEX subject_person_subject_id ON subject_person (subject_id)",
+    "CREATE INDEX subject_person_person_id ON subject_person (person_id)",
+    "CREATE INDEX subject_character_subject_id ON subject_character (subject_id)",
+    "CREATE INDEX subject_character_character_id ON subject_character (character_id)",
+    "CREATE INDEX person_character_person_id ON person_character (person_id)",
+    "CREATE INDEX person_character_subject_id ON person_character (subject_id)",
+    "CREATE INDEX person_character_character_id ON person_character (character_id)",
+]
+
+Rows = Dict[str, List[tuple]]
+
+_SCORE_FIELDS = list(ScoreDetails.model_fields)
+
+
+def _subject_rows(subjects: List[Subject]) -> Rows:
+    rows: Rows = {"subject": [], "subject_tag": []}
+    for s in subjects:
+        d = s.score_details
+        buckets = [getattr(d, name) if d is not None else None for name in _SCORE_FIELDS]
+        f = s.favorite
+        rows["subject"].append(
+            (s.id, s.type, s.name, s.name_cn, s.infobox, s.platform, s.summary, s.nsfw)
+            + (s.score, s.rank, s.date, s.series, s.meta_tags, *buckets)
+            + (f.wish, f.done, f.doing, f.on_hold, f.dropped)
+        )
+        rows["subject_tag"].extend((s.id, tag.name, tag.count) for tag in s.tags)
+    return rows
+
+
+def _person_rows(persons: List[Person]) -> Rows:
+    return {
+        "person": [
+            (p.id, p.name, p.type, p.infobox, p.summary, p.comments, p.collects)
+            for p in persons
+        ],
+        "person_career": [(p.id, career) for p in persons for career in p.career],
+    }
+
+
+def _character_rows(characters: List[Character]) -> Rows:
+    return {
+        "character": [
+            (c.id, c.role, c.name, c.infobox, c.summary, c.comments, c.collects)
+            for c in characters
+        ]
+    }
+
+
+def _episode_rows(episodes: List[Episode]) -> Rows:
+    return {
+        "episode": [
+            (
+                e.id,
+                e.subject_id,
+                e.name,
+                e.name_cn,
+                e.description,
+                e.airdate,
+                e.disc,
+                e.duration,
+                e.sort,
+                e.type,
+            )
+            for e in episodes
+        ]
+    }
+
+
+def _subject_relation_rows(relations: List[SubjectRelation]) -> Rows:
+    return {
+        "subject_relation": [
+            (r.subject_id, r.relation_type, r.related_subject_id, r.order) for r in relations
+        ]
+    }
+
+
+def _subject_person_rows(relations: List[SubjectPerson]) -> Rows:
+    return {"subject_person": [(r.subject_id, r.person_id, r.position) for r in relations]}
+
+
+def _subject_character_rows(relations: List[SubjectCharacter]) -> Rows:
+    return {
+        "subject_character": [
+            (r.subject_id, r.character_id, r.type, r.order) for r in relations
+        ]
+    }
+
+
+def _person_character_rows(relations: List[PersonCharacter]) -> Rows:
+    return {
+        "person_character": [
+            (r.person_id, r.subject_id, r.character_id, r.summary) for r in relations
+        ]
+    }
+
+
+MEMBER_ROWS: Dict[str, Callable[[List], Rows]] = {
+    "subject.jsonlines": _subject_rows,
+    "person.jsonlines": _person_rows,
+    "character.jsonlines": _character_rows,
+    "episode.jsonlines": _episode_rows,
+    "subject-relations.jsonlines": _subject_relation_rows,
+    "subject-persons.jsonlines": _subject_person_rows,
+    "subject-characters.jsonlines": _subject_character_rows,
+    "person-characters.jsonlines": _person_character_rows,
+}
+
+
+def _insert_sql(conn: sqlite3.Connection, table: str) -> str:
+    columns = conn.execute(f"PRAGMA table_info({table})").fetchall()
+    return f"INSERT INTO {table} VALUES ({', '.join('?' * len(columns))})"
+
+
+def build_index(
+    archive_path: str,
+    db_path: str,
+    batch_size: int = 10_000,
+    commit_every: int = 500_000,
+    progress: bool = False,
+) -> Dict[str, int]:
+    """
+    Build an indexed SQLite database from a wiki archive.
+
+    The database is built next to db_path with WAL and synchronous=OFF, and only renamed
+    to db_path once all members are loaded and indexed, so a crashed build never leaves a
+    database that looks complete.
+
+    Args:
+        archive_path: Path to the zip archive
+        db_path: Path of the database to create, must not exist
+        batch_size: Entries validated (iter_batches) and inserted (executemany) per batch
+        commit_every: Rows per transaction
+        progress: Show tqdm progress bars
+
+    Returns:
+        Dictionary mapping member names to numbers of loaded entries
+    """
+    if os.path.exists(db_path):
+        raise FileExistsError(f"Database {db_path} already exists")
+
+    partial_path = db_path + ".partial"
+    for path in (partial_path, partial_path + "-wal", partial_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
+    conn = sqlite3.connect(partial_path, isolation_level=None)
+    counts: Dict[str, int] = {}
+    with WikiArchiveLoader(archive_path, stop_on_error=False) as loader:
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = OFF")
+            conn.execute("PRAGMA temp_store = MEMORY")
+            conn.execute("PRAGMA cache_size = -262144")  # 256 MiB
+            conn.executescript(SCHEMA)
+            tables = [
+                row[0]
+                for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            ]
+            insert_sql = {table: _insert_sql(conn, table) for table in tables}
+
+            for filename, model_class in WikiArchiveLoader.FILE_MODEL_MAP.items():
+                to_rows = MEMBER_ROWS[filename]
+                batches: Iterator[List[BaseModel]] = loader.iter_batches(model_class, batch_size)
+                if progress:
+                    batches = tqdm.tqdm(batches, desc=filename, unit="batch")
+
+                count = pending = 0
+                conn.execute("BEGIN")
+                for batch in batches:
+                    for table, rows in to_rows(batch).items():
+                        conn.executemany(insert_sql[table], rows)
+                        pending += len(rows)
+                    count += len(batch)
+                    if pending >= commit_every:
+                        conn.execute("COMMIT")
+                        conn.execute("BEGIN")
+                        pending = 0
+                conn.execute("COMMIT")
+                counts[filename] = count
+                logger.info(f"Loaded {count} entries from {filename}")
+
+            for statement in tqdm.tqdm(INDEXES, desc="Indexes", disable=not progress):
+                conn.execute(statement)
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+    os.replace(partial_path, db_path)
+
+    # exact counts: get_validation_errors() is a sample capped per model
+    for model_class, count in loader.get_error_sink().model_counts.items():
+        logger.warning(f"Skipped {count} invalid {model_class.__name__} entries")
+    return counts
+
+
+class ArchiveIndex:
+    """
+    Read-only lookups against a database built by build_index().
+
+    Entities are returned as dicts of their table columns. The connection may be shared
+    across threads; sqlite3 serializes access to it.
+    """
+
+    def __init__(self, db_path: str):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        self.conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self):
+        self.conn.close()
+
+    def _one(self, sql: str, params: Sequence) -> Optional[dict]:
+        row = self.conn.execute(sql, params).fetchone()
+        return dict(row) if row is not None else None
+
+    def _all(self, sql: str, params: Sequence) -> List[dict]:
+        return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def subject(self, subject_id: int) -> Optional[dict]:
+        subject = self._one("SELECT * FROM subject WHERE id = ?", (subject_id,))
+        if subject is not None:
+            subject["tags"] = self._all(
+                "SELECT name, count FROM subject_tag WHERE subject_id = ? ORDER BY rowid",
+                (subject_id,),
+            )
+        return subject
+
+    def person(self, person_id: int) -> Optional[dict]:
+        person = self._one("SELECT * FROM person WHERE id = ?", (person_id,))
+        if person is not None:
+            person["career"] = [
+                row["career"]
+                for row in self._all(
+                    "SELECT career FROM person_career WHERE person_id = ? ORDER BY rowid",
+                    (person_id,),
+                )
+            ]
+        return person
+
+    def character(self, character_id: int) -> Optional[dict]:
+        return self._one("SELECT * FROM character WHERE id = ?", (character_id,))
+
+    def episode(self, episode_id: int) -> Optional[dict]:
+        return self._one("SELECT * FROM episode WHERE id = ?", (episode_id,))
+
+    def episodes_of(self, subject_id: int) -> List[dict]:
+        return self._all(
+            "SELECT * FROM episode WHERE subject_id = ? ORDER BY type, sort", (subject_id,)
+        )
+
+    def relations_of(self, subject_id: int) -> List[dict]:
+        """
+        Subjects related to subject_id, in the direction stored in the archive.
+        """
+        return self._all(
+            'SELECT * FROM subject_relation WHERE subject_id = ? ORDER BY "order"',
+            (subject_id,),
+        )
+
+    def staff_of(self, subject_id: int) -> List[dict]:
+        return self._all(
+            "SELECT sp.person_id, sp.position, p.name FROM subject_person sp"
+            " LEFT JOIN person p ON p.id = sp.person_id WHERE sp.subject_id = ?",
+            (subject_id,),
+        )
+
+    def cast_of(self, subject_id: int) -> List[dict]:
+        """
+        Characters of a subject, with the persons (voice actors) credited for them in it.
+        """
+        cast = self._all(
+            'SELECT sc.character_id, sc.type, sc."order", c.name FROM subject_character sc'
+            " LEFT JOIN character c ON c.id = sc.character_id"
+            ' WHERE sc.subject_id = ? ORDER BY sc.type, sc."order"',
+            (subject_id,),
+        )
+        actors: Dict[int, List[dict]] = {}
+        for row in self._all(
+            "SELECT pc.character_id, pc.person_id, p.name FROM person_character pc"
+            " LEFT JOIN person p ON p.id = pc.person_id WHERE pc.subject_id = ?",
+            (subject_id,),
+        ):
+            actors.setdefault(row.pop("character_id"), []).append(row)
+        for character in cast:
+            character["actors"] = actors.get(character["character_id"], [])
+        return cast
+
+    def subjects_of_person(self, person_id: int) -> List[dict]:
+        return self._all(
+            "SELECT subject_id, position FROM subject_person WHERE person_id = ?", (person_id,)
+        )
+
+    def subjects_of_character(self, character_id: int) -> List[dict]:
+        return self._all(
+            'SELECT subject_id, type, "order" FROM subject_character WHERE character_id = ?',
+            (character_id,),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        tables = [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+            )
+        ]
+        return {
+            table: self.conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+            for table in tables
+        }
@@ -0,0 +1,209 @@
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from click.testing import CliRunner
+
+from bgm_archive.cli.es_ingest import es_ingest
+from bgm_archive.index.es_bulk import (
+    BulkIngester,
+    BulkRequestError,
+    encode_item,
+    ingest_archive,
+    pack_batches,
+)
+from bgm_archive.loader.raw_loader import RawWikiArchiveLoader
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+class StandInCluster(ThreadingHTTPServer):
+    """
+    Minimal _bulk endpoint: indexes everything, except ids listed in reject_once (429 on
+    their first attempt), reject (429 every time) and fail (400 every time).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0, status: int = 200):
+        super().__init__(("127.0.0.1", 0), BulkHandler)
+        self.delay = delay
+        self.status = status
+        self.reject_once: set = set()
+        self.reject: set = set()
+        self.fail: set = set()
+        self.attempts: Counter = Counter()
+        self.documents: dict = {}
+        self.body_sizes: list = []
+        self.batch_sizes: list = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.open_connections = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class BulkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.open_connections += 1
+
+    def finish(self):
+        super().finish()
+        with self.server.lock:
+            self.server.open_connections -= 1
+
+    def do_POST(self):
+        server: StandInCluster = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            server.body_sizes.append(len(body))
+            server.batch_sizes.append(body.count(b"\n") // 2)
+        time.sleep(server.delay)
+
+        items = []
+        lines = body.splitlines()
+        with server.lock:
+            for action_line, source_line in zip(lines[::2], lines[1::2]):
+                action = json.loads(action_line)["index"]
+                key = (action["_index"], action["_id"])
+                server.attempts[key] += 1
+                if action["_id"] in server.fail:
+                    status = 400
+                elif action["_id"] in server.reject or (
+                    action["_id"] in server.reject_once and server.attempts[key] == 1
+                ):
+                    status = 429
+                else:
+                    status = 201
+                    server.documents[key] = json.loads(source_line)
+                result = {"_index": action["_index"], "_id": action["_id"], "status": status}
+                if status >= 300:
+                    result["error"] = {"type": "mapper_parsing_exception" if status == 400 else "es_rejected_execution_exception"}
+                items.append({"index": result})
+            server.in_flight -= 1
+
+        payload = json.dumps({"errors": any(i["index"]["status"] >= 300 for i in items), "items": items})
+        payload = payload.encode() if server.status == 200 else b"{}"
+        self.send_response(server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def cluster():
+    server = StandInCluster()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _items(count: int):
+    return [encode_item("test", f"{i:04d}", {"id": 1000 + i, "text": "x" * 50}) for i in range(count)]
+
+
+def test_pack_batches_by_bytes():
+    items = _items(100)
+    item_size = sum(map(len, items[0]))
+
+    batches = list(pack_batches(items, max_bytes=item_size * 7 + 1))
+
+    assert [len(batch) for batch in batches] == [7] * 14 + [2]
+    assert list(pack_batches(items[:2], max_bytes=1)) == [[items[0]], [items[1]]]
+
+
+def test_ingest_archive(cluster, wiki_archive_path):
+    with RawWikiArchiveLoader(str(wiki_archive_path)) as loader:
+        stats = ingest_archive(loader, cluster.url, max_bytes=4096, concurrency=3)
+
+    assert stats.docs == stats.indexed == 160
+    assert stats.failed == 0
+    # only documents larger than max_bytes on their own exceed it
+    for body_size, batch_size in zip(cluster.body_sizes, cluster.batch_sizes):
+        assert body_size <= 4096 or batch_size == 1
+    assert cluster.documents["bgm-subject", "8"]["id"] == 8
+    assert ("bgm-subject-relations", "1-296317") in cluster.documents
+    assert stats.docs_per_sec > 0
+
+
+def test_validated_models_are_encoded(cluster, wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+    stats = ingest_archive(loader, cluster.url, members=["subject.jsonlines"])
+
+    assert stats.indexed == 20
+    assert cluster.documents["bgm-subject", "1"]["date"] == "1998-09-25"
+    assert cluster.documents["bgm-subject", "1"]["score_details"]["10"] == 6
+
+
+def test_concurrency_window(cluster):
+    cluster.delay = 0.05
+    ingester = BulkIngester(cluster.url, max_bytes=1000, concurrency=3)
+    stats = ingester.ingest(_items(200))
+
+    assert stats.indexed == 200
+    assert stats.requests > 6
+    assert 1 < cluster.max_in_flight <= 3
+    # the keep-alive connections are closed when ingest() returns
+    deadline = time.monotonic() + 5
+    while cluster.open_connections and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cluster.open_connections == 0
+
+
+def test_retries_only_failed_items(cluster):
+    cluster.reject_once = {"0003", "0017"}
+    cluster.fail = {"0005"}
+    stats = BulkIngester(cluster.url, max_bytes=10_000, backoff=0.01).ingest(_items(30))
+
+    assert (stats.indexed, stats.failed, stats.retried_items) == (29, 1, 2)
+    assert stats.errors[0]["error"]["type"] == "mapper_parsing_exception"
+    assert cluster.attempts["test", "0003"] == 2
+    assert cluster.attempts["test", "0004"] == 1
+    assert cluster.attempts["test", "0005"] == 1
+
+
+def test_rejected_items_exhaust_retries(cluster):
+    cluster.reject = {f"{i:04d}" for i in range(5)}
+    stats = BulkIngester(cluster.url, max_retries=2, backoff=0.01).ingest(_items(5))
+
+    # every request got a valid response, so the items fail without a request error
+    assert (stats.indexed, stats.failed, stats.requests) == (0, 5, 3)
+
+
+def test_request_failure(cluster):
+    cluster.status = 503
+    ingester = BulkIngester(cluster.url, max_retries=2, backoff=0.01)
+
+    with pytest.raises(BulkRequestError):
+        ingester.ingest(_items(5))
+    assert len(cluster.body_sizes) == 3
+
+
+def test_cli(cluster, wiki_archive_path):
+    result = CliRunner().invoke(
+        es_ingest,
+        [str(wiki_archive_path), cluster.url, "--member", "subject-relations.jsonlines"],
+        standalone_mode=False,
+    )
+
+    assert result.exception is None, result.output
+    # the validated run skips the invalid relation
+    assert (result.return_value.docs, result.return_value.indexed) == (19, 19)
+    assert "Indexed 19 of 19 documents" in result.output
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import numpy as np
+from click.testing import CliRunner
+
+from bgm_archive.cli.search import search
+from bgm_archive.index.name_index import (
+    NameIndex,
+    decode_varints,
+    encode_varints,
+    tokenize,
+)
+
+
+def test_tokenize():
+    assert tokenize("反逆のルルーシュR2") == ["反逆", "逆の", "のル", "ルル", "ルー", "ーシ", "シュ", "r2"]
+    # full-width and half-width forms fold to the same terms; "・" separates runs
+    assert tokenize("ＣＬＡＮＮＡＤ ﾙﾙｰｼｭ・ゼロ") == ["clannad", "ルル", "ルー", "ーシ", "シュ", "ゼロ"]
+    assert tokenize("Code Geass: Hangyaku-no") == ["code", "geass", "hangyaku", "no"]
+    assert tokenize("古河渚", unigrams=True) == ["古河", "河渚", "古", "河", "渚"]
+    assert tokenize("渚") == ["渚"]
+
+
+def test_varints_round_trip():
+    values = np.array([0, 1, 127, 128, 16383, 16384, 2**21 + 3, 2**28, 2**34 + 1])
+    encoded, lengths = encode_varints(values)
+
+    assert lengths.tolist() == [1, 1, 1, 2, 2, 3, 4, 5, 5]
+    assert len(encoded) == lengths.sum()
+    assert decode_varints(encoded).tolist() == values.tolist()
+    assert decode_varints(np.zeros(0, dtype=np.uint8)).tolist() == []
+
+
+def test_search(wiki_archive_path, tmp_path):
+    index = NameIndex.build(str(wiki_archive_path), str(tmp_path / "names"))
+
+    assert len(index) == 60
+    assert index.manifest["documents"] == {"subject": 20, "person": 20, "character": 20}
+
+    # name_cn of the subject, 简体中文名 of the character
+    hits = index.search("鲁路修")
+    assert {(hit.kind, hit.id) for hit in hits} == {("character", 1), ("subject", 8)}
+    assert hits[0].name_cn == "鲁路修·兰佩路基"
+
+    # Latin words, case-insensitive; aliases count
+    assert [(hit.kind, hit.id) for hit in index.search("code GEASS")] == [("subject", 8)]
+    assert index.search("mizuki nana")[0].id == 1
+    assert index.search("metal slug", kinds=["subject"])[0].id == 4
+    assert index.search("渚")[0].name == "古河渚"
+
+    # a full name match ranks above a partial one
+    hits = index.search("Pico Magic")
+    assert [hit.id for hit in hits] == [18, 19]
+    assert hits[0].score > hits[1].score
+
+    assert index.search("CLANNAD", kinds=["person"]) == []
+    assert index.search("zzz") == []
+    assert len(index.search("c", limit=1)) == 1
+
+
+def test_staleness(wiki_archive_path, tmp_path):
+    archive = tmp_path / "archive.zip"
+    shutil.copy(wiki_archive_path, archive)
+    index_dir = str(tmp_path / "names")
+
+    assert NameIndex.is_stale(index_dir, str(archive))
+    NameIndex.open_or_build(str(archive), index_dir)
+    assert not NameIndex.is_stale(index_dir, str(archive))
+
+    stat = os.stat(archive)
+    os.utime(archive, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert NameIndex.is_stale(index_dir, str(archive))
+
+
+def test_search_cli(wiki_archive_path, tmp_path):
+    NameIndex.build(str(wiki_archive_path), str(tmp_path / "names"))
+
+    result = CliRunner().invoke(
+        search,
+        [str(tmp_path / "names"), "Team", "Fortress", "--kind", "subject"],
+        standalone_mode=False,
+    )
+
+    assert result.exception is None, result.output
+    assert [hit.id for hit in result.return_value] == [6]
+    assert "Team Fortress 2 / 军团要塞2" in result.output
@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+from bgm_archive.index.sqlite_index import ArchiveIndex, build_index
+from bgm_archive.loader.synthetic import generate_archive
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@pytest.fixture(scope="module")
+def archive_index(wiki_archive_path, tmp_path_factory):
+    db_path = tmp_path_factory.mktemp("index") / "archive.db"
+    counts = build_index(str(wiki_archive_path), str(db_path), batch_size=7, commit_every=10)
+    assert counts["subject-relations.jsonlines"] == 19
+    assert all(count == 20 for name, count in counts.items() if "relations" not in name)
+    index = ArchiveIndex(str(db_path))
+    yield index
+    index.close()
+
+
+def test_entities_by_id(archive_index, wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+    subject = next(loader.subjects())
+
+    row = archive_index.subject(subject.id)
+    assert row["name"] == subject.name
+    assert row["score"] == subject.score
+    assert row["favorite_done"] == subject.favorite.done
+    assert row["tags"] == [tag.model_dump() for tag in subject.tags]
+
+    person = next(loader.persons())
+    assert archive_index.person(person.id)["career"] == person.career
+
+    episode = next(loader.episodes())
+    assert archive_index.episode(episode.id)["subject_id"] == episode.subject_id
+    assert archive_index.subject(-1) is None
+
+
+def test_relations(archive_index):
+    assert [r["related_subject_id"] for r in archive_index.relations_of(4)] == [9944, 9950]
+    assert {s["person_id"] for s in archive_index.staff_of(8)} >= {39, 56, 162, 185}
+    assert [c["character_id"] for c in archive_index.cast_of(6)][:2] == [10, 11]
+    staff = archive_index.subjects_of_person(162)
+    assert sorted((r["subject_id"], r["position"]) for r in staff) == [(8, 14), (8, 15), (8, 20)]
+    assert archive_index.subjects_of_character(77990) == [{"subject_id": 4, "type": 2, "order": 0}]
+    assert archive_index.subjects_of_person(1) == []
+    assert len(archive_index.episodes_of(15)) > 1
+
+    counts = archive_index.counts()
+    assert counts["subject"] == 20
+    assert counts["person_character"] == 20
+
+
+def test_indexes_exist(archive_index):
+    plan = archive_index.conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM subject_person WHERE person_id = 1"
+    ).fetchall()
+    assert "subject_person_person_id" in str([tuple(row) for row in plan])
+
+
+def test_refuses_existing_database(wiki_archive_path, tmp_path):
+    db_path = tmp_path / "exists.db"
+    db_path.touch()
+    with pytest.raises(FileExistsError):
+        build_index(str(wiki_archive_path), str(db_path))
+
+
+def test_skipped_counts_are_exact(tmp_path, caplog):
+    archive_path = tmp_path / "invalid.zip"
+    rows = {filename: 10 for filename in WikiArchiveLoader.FILE_MODEL_MAP}
+    generate_archive(str(archive_path), rows={**rows, "episode.jsonlines": 2000}, invalid_rate=0.2)
+    with WikiArchiveLoader(str(archive_path), stop_on_error=False) as loader:
+        valid = sum(1 for _ in loader.episodes())
+
+    with caplog.at_level(logging.WARNING, logger="bgm_archive.index.sqlite_index"):
+        build_index(str(archive_path), str(tmp_path / "archive.db"))
+
+    # more than the 100 errors sampled per model
+    assert 2000 - valid > 100
+    assert f"Skipped {2000 - valid} invalid Episode entries" in caplog.text
@@ -0,0 +1,141 @@
+"""
+External merge sort of (key, record) pairs under a memory budget.
+
+Records are pickled as they are added, so the buffer's size is known exactly. When the
+buffer outgrows the budget it is sorted and spilled to a temporary run file; iterating
+merges the runs (at most fan_in files open at a time, in several passes if needed) with
+the records still in memory. Sorting is stable: records with equal keys come out in the
+order they were added.
+"""
+
+import heapq
+import os
+import pickle
+import tempfile
+from operator import itemgetter
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Approximate per-record cost of the buffer list, key tuple and bytes object headers.
+RECORD_OVERHEAD = 120
+
+# I/O buffer of each run file; a merge keeps fan_in of them open per sorter.
+_RUN_BUFFER = 64 * 1024
+
+_first = itemgetter(0)
+
+
+def _write_run(items: Iterator[Tuple[Any, bytes]], directory: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(fd, "wb", buffering=_RUN_BUFFER) as file:
+        # one pickle per item: a shared (Un)pickler memoizes, and so retains, every item
+        for item in items:
+            pickle.dump(item, file, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _read_run(path: str) -> Iterator[Tuple[Any, bytes]]:
+    with open(path, "rb", buffering=_RUN_BUFFER) as file:
+        while True:
+            try:
+                yield pickle.load(file)
+            except EOFError:
+                return
+
+
+class ExternalSorter:
+    """
+    Sorts records by key using at most about memory_budget bytes for buffered records.
+
+        with ExternalSorter(64 * 2**20) as sorter:
+            for record in records:
+                sorter.add(record["subject_id"], record)
+            for key, record in sorter:
+                ...
+
+    The sorted output can be iterated once. Keys must be mutually comparable, e.g. ints or
+    tuples of ints. Temporary files are removed by close().
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = 256 * 2**20,
+        tmp_dir: Optional[str] = None,
+        fan_in: int = 64,
+    ):
+        """
+        Args:
+            memory_budget: Bytes of pickled records buffered before spilling a run
+            tmp_dir: Directory of the run files, the system temp directory by default
+            fan_in: Maximum number of runs merged (and files open) at once
+        """
+        if fan_in < 2:
+            raise ValueError(f"fan_in must be at least 2, got {fan_in}")
+        self.memory_budget = memory_budget
+        self.fan_in = fan_in
+        self.records = 0
+        self.spilled_runs = 0
+        self.spilled_bytes = 0
+        self.__directory = tempfile.mkdtemp(prefix="bgm-sort-", dir=tmp_dir)
+        self.__buffer: List[Tuple[Any, bytes]] = []
+        self.__buffered_bytes = 0
+        self.__runs: List[str] = []
+        self.__consumed = False
+
+    def add(self, key: Any, record: Any):
+        if self.__consumed:
+            raise RuntimeError("Records cannot be added after iterating the sorter")
+        data = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        self.__buffer.append((key, data))
+        self.__buffered_bytes += len(data) + RECORD_OVERHEAD
+        self.records += 1
+        if self.__buffered_bytes >= self.memory_budget:
+            self._spill()
+
+    def _spill(self):
+        self.__buffer.sort(key=_first)
+        self.spilled_bytes += self.__buffered_bytes
+        self.__runs.append(_write_run(iter(self.__buffer), self.__directory))
+        self.spilled_runs += 1
+        self.__buffer = []
+        self.__buffered_bytes = 0
+
+    def _merge_runs(self, runs: List[str]) -> str:
+        path = _write_run(heapq.merge(*map(_read_run, runs), key=_first), self.__directory)
+        for run in runs:
+            os.remove(run)
+        return path
+
+    def __iter__(self) -> Iterator[Tuple[Any, Any]]:
+        if self.__consumed:
+            raise RuntimeError("The sorted output can only be iterated once")
+        self.__consumed = True
+        self.__buffer.sort(key=_first)
+
+        # leave one slot for the in-memory buffer; merging in order keeps the sort stable
+        runs = self.__runs
+        while len(runs) >= self.fan_in:
+            merged = [
+                self._merge_runs(runs[start : start + self.fan_in])
+                for start in range(0, len(runs), self.fan_in)
+            ]
+            runs = self.__runs = merged
+
+        sources = [_read_run(run) for run in runs] + [iter(self.__buffer)]
+        for key, data in heapq.merge(*sources, key=_first):
+            yield key, pickle.loads(data)
+        self.__buffer = []
+
+    def close(self):
+        for run in self.__runs:
+            if os.path.exists(run):
+                os.remove(run)
+        self.__runs = []
+        self.__buffer = []
+        if os.path.isdir(self.__directory):
+            os.rmdir(self.__directory)
+
+    def __enter__(self) -> "ExternalSorter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,351 @@
+"""
+Denormalized per-subject documents built with external sort-merge joins.
+
+Every member is read once and fed into ExternalSorters, so memory stays within the
+budget whatever the archive size:
+
+1. persons, characters and subjects by id, alongside the full subjects
+2. staff: subject-persons sorted by person_id, merge-joined with person names
+3. voice actors: person-characters sorted by person_id, merge-joined with person names
+4. cast: subject-characters sorted by character_id, merge-joined with character names,
+   then by (subject_id, character_id) with the voice actors of step 3
+5. relations: subject-relations sorted by related_subject_id, merge-joined with subject
+   names
+6. episodes by subject_id
+
+The final pass walks the subjects by id and takes the group of each step's output with
+the same subject_id. A document is the subject record with four lists added, each in a
+deterministic order: episodes by (type, sort, id), staff by (person_id, position), cast by
+(type, order, character_id) and relations by (order, related_subject_id).
+
+    {...subject, "episodes": [...], "staff": [...], "cast": [...], "relations": [...]}
+
+staff entries are {person_id, name, position}; cast entries {character_id, name, type,
+order, actors: [{person_id, name, summary}]}; relation entries {related_subject_id, name,
+name_cn, relation_type, order}. Names of entities missing from the archive are None.
+"""
+
+import contextlib
+import gzip
+import json
+import logging
+import sys
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import BaseModel
+
+from ..loader.model import (
+    Character,
+    Episode,
+    Person,
+    PersonCharacter,
+    Subject,
+    SubjectCharacter,
+    SubjectPerson,
+    SubjectRelation,
+)
+from ..loader.records import Record
+from ..loader.wiki_archive_loader import WikiArchiveLoader
+from .external_sort import ExternalSorter
+
+logger = logging.getLogger(__name__)
+
+# Most sorters holding buffered records at the same time (while building the cast), which
+# split the memory budget between them.
+_BUFFERING_SORTERS = 7
+
+Sorted = Iterator[Tuple[Any, Any]]
+
+
+def _as_dict(entry: Any) -> Dict[str, Any]:
+    if isinstance(entry, Record):
+        # dumped through the model, for the same aliases and JSON types as engine="pydantic"
+        entry = entry.to_model()
+    if isinstance(entry, BaseModel):
+        return entry.model_dump(mode="json", by_alias=True)
+    if hasattr(entry, "_asdict"):
+        return entry._asdict()
+    return entry
+
+
+def merge_join(left: Sorted, right: Sorted, key=itemgetter(0)) -> Iterator[Tuple[Any, Any]]:
+    """
+    Left outer join of two streams sorted by key: each right item with the value of the
+    left item with the same key, or None.
+
+    Args:
+        left: (key, value) pairs sorted by key, keys unique
+        right: Items sorted by key(item)
+
+    Yields:
+        (right item, left value or None), in right order
+    """
+    left = iter(left)
+    current = next(left, None)
+    for item in right:
+        item_key = key(item)
+        while current is not None and current[0] < item_key:
+            current = next(left, None)
+        if current is not None and current[0] == item_key:
+            yield item, current[1]
+        else:
+            yield item, None
+
+
+def _groups(items: Sorted, group_key=itemgetter(0)) -> Iterator[Tuple[Any, list]]:
+    """
+    Records grouped by group_key(key), from (key, record) pairs sorted by key. The
+    default groups keys of the form (subject_id, ...) by subject_id.
+    """
+    for value, group in groupby(items, key=lambda item: group_key(item[0])):
+        yield value, [record for _, record in group]
+
+
+class _GroupCursor:
+    """
+    Hands out the group of a subject_id from a stream of groups sorted by subject_id.
+    """
+
+    def __init__(self, groups: Iterator[Tuple[int, list]]):
+        self.__groups = groups
+        self.__current = next(groups, None)
+        self.orphans = 0
+
+    def take(self, subject_id: int) -> list:
+        # groups of subjects missing from the archive are skipped
+        while self.__current is not None and self.__current[0] < subject_id:
+            self.orphans += len(self.__current[1])
+            self.__current = next(self.__groups, None)
+        if self.__current is not None and self.__current[0] == subject_id:
+            group = self.__current[1]
+            self.__current = next(self.__groups, None)
+            return group
+        return []
+
+
+class SubjectDocumentBuilder:
+    """
+    Builds the documents of an archive, see the module docstring.
+
+        with SubjectDocumentBuilder(loader, memory_budget=512 * 2**20) as builder:
+            for document in builder.documents():
+                ...
+    """
+
+    def __init__(
+        self,
+        loader: WikiArchiveLoader,
+        memory_budget: int = 512 * 2**20,
+        tmp_dir: Optional[str] = None,
+        fan_in: int = 64,
+    ):
+        """
+        Args:
+            loader: Loader to read entries with, e.g. a RawWikiArchiveLoader for trusted dumps;
+                slots records are dumped like the models they mirror
+            memory_budget: Bytes of records buffered by all sorters together
+            tmp_dir: Directory of the sorters' run files
+            fan_in: Maximum number of run files merged at once
+        """
+        self.loader = loader
+        self.memory_budget = memory_budget
+        self.tmp_dir = tmp_dir
+        self.fan_in = fan_in
+        self.stats: Dict[str, int] = {}
+        self.__stack = contextlib.ExitStack()
+
+    def _sorter(self) -> ExternalSorter:
+        sorter = ExternalSorter(
+            max(self.memory_budget // _BUFFERING_SORTERS, 1), self.tmp_dir, self.fan_in
+        )
+        return self.__stack.enter_context(sorter)
+
+    def _entries(self, model_class: type) -> Iterator[Dict[str, Any]]:
+        filename = next(
+            name for name, cls in WikiArchiveLoader.FILE_MODEL_MAP.items() if cls is model_class
+        )
+        for entry in self.loader.iter_member(filename):
+            yield _as_dict(entry)
+
+    def _names(self, model_class: type, fields: Iterable[str], copies: int = 1) -> List[ExternalSorter]:
+        """
+        (id, names) sorters of an entity member, filled in one pass; each is consumed by
+        one join.
+        """
+        sorters = [self._sorter() for _ in range(copies)]
+        for record in self._entries(model_class):
+            names = tuple(record[field] for field in fields)
+            for sorter in sorters:
+                sorter.add(record["id"], names)
+        return sorters
+
+    def _staff(self, person_names: ExternalSorter) -> ExternalSorter:
+        by_person = self._sorter()
+        for record in self._entries(SubjectPerson):
+            by_person.add(record["person_id"], record)
+        staff = self._sorter()
+        for (_, record), names in merge_join(person_names, by_person):
+            staff.add(
+                (record["subject_id"], record["person_id"], record["position"]),
+                {
+                    "person_id": record["person_id"],
+                    "name": names[0] if names else None,
+                    "position": record["position"],
+                },
+            )
+        return staff
+
+    def _actors(self, person_names: ExternalSorter) -> ExternalSorter:
+        by_person = self._sorter()
+        for record in self._entries(PersonCharacter):
+            by_person.add(record["person_id"], record)
+        actors = self._sorter()
+        for (_, record), names in merge_join(person_names, by_person):
+            actors.add(
+                (record["subject_id"], record["character_id"]),
+                {
+                    "person_id": record["person_id"],
+                    "name": names[0] if names else None,
+                    "summary": record["summary"],
+                },
+            )
+        return actors
+
+    def _cast(self, character_names: ExternalSorter, actors: ExternalSorter) -> ExternalSorter:
+        by_character = self._sorter()
+        for record in self._entries(SubjectCharacter):
+            by_character.add(record["character_id"], record)
+        by_pair = self._sorter()
+        for (_, record), names in merge_join(character_names, by_character):
+            by_pair.add(
+                (record["subject_id"], record["character_id"]),
+                {
+                    "character_id": record["character_id"],
+                    "name": names[0] if names else None,
+                    "type": record["type"],
+                    "order": record["order"],
+                },
+            )
+
+        cast = self._sorter()
+        actor_groups = _groups(actors, group_key=lambda key: key)
+        for (key, entry), group in merge_join(actor_groups, by_pair):
+            entry["actors"] = group or []
+            cast.add((key[0], entry["type"], entry["order"], key[1]), entry)
+        return cast
+
+    def _relations(self, subject_names: ExternalSorter) -> ExternalSorter:
+        by_related = self._sorter()
+        for record in self._entries(SubjectRelation):
+            by_related.add(record["related_subject_id"], record)
+        relations = self._sorter()
+        for (_, record), names in merge_join(subject_names, by_related):
+            relations.add(
+                (record["subject_id"], record["order"], record["related_subject_id"]),
+                {
+                    "related_subject_id": record["related_subject_id"],
+                    "name": names[0] if names else None,
+                    "name_cn": names[1] if names else None,
+                    "relation_type": record["relation_type"],
+                    "order": record["order"],
+                },
+            )
+        return relations
+
+    def _episodes(self) -> ExternalSorter:
+        episodes = self._sorter()
+        for record in self._entries(Episode):
+            episodes.add(
+                (record["subject_id"], record["type"], record["sort"], record["id"]), record
+            )
+        return episodes
+
+    def documents(self) -> Iterator[Dict[str, Any]]:
+        """
+        The documents, ordered by subject id. Can be iterated once per builder.
+        """
+        subjects = self._sorter()
+        subject_names = self._sorter()
+        for record in self._entries(Subject):
+            subjects.add(record["id"], record)
+            subject_names.add(record["id"], (record["name"], record["name_cn"]))
+
+        staff_names, actor_names = self._names(Person, ("name",), copies=2)
+        staff = self._staff(staff_names)
+        actors = self._actors(actor_names)
+        (character_names,) = self._names(Character, ("name",))
+        cast = self._cast(character_names, actors)
+        relations = self._relations(subject_names)
+        episodes = self._episodes()
+
+        lists = {
+            "episodes": _GroupCursor(_groups(episodes)),
+            "staff": _GroupCursor(_groups(staff)),
+            "cast": _GroupCursor(_groups(cast)),
+            "relations": _GroupCursor(_groups(relations)),
+        }
+        count = 0
+        for subject_id, subject in subjects:
+            for name, cursor in lists.items():
+                subject[name] = cursor.take(subject_id)
+            count += 1
+            yield subject
+
+        # drain the cursors, so orphans after the last subject are counted too
+        for cursor in lists.values():
+            cursor.take(sys.maxsize)
+        self.stats = {
+            "documents": count,
+            **{f"orphan_{name}": cursor.orphans for name, cursor in lists.items()},
+        }
+        for name, cursor in lists.items():
+            if cursor.orphans:
+                logger.info(f"Skipped {cursor.orphans} {name} of subjects not in the archive")
+
+    def close(self):
+        self.__stack.close()
+
+    def __enter__(self) -> "SubjectDocumentBuilder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+@contextlib.contextmanager
+def _open_output(path: str) -> Iterator[TextIO]:
+    if path == "-":
+        yield sys.stdout
+    elif path.endswith(".gz"):
+        with gzip.open(path, "wt", encoding="utf-8") as file:
+            yield file
+    else:
+        with open(path, "w", encoding="utf-8") as file:
+            yield file
+
+
+def write_subject_documents(
+    loader: WikiArchiveLoader,
+    out_path: str,
+    memory_budget: int = 512 * 2**20,
+    tmp_dir: Optional[str] = None,
+) -> Dict[str, int]:
+    """
+    Stream the documents of an archive to a jsonlines file.
+
+    Args:
+        loader: Loader to read entries with
+        out_path: Output path, gzip-compressed when it ends with ".gz", "-" for stdout
+        memory_budget: Bytes of records buffered by all sorters together
+        tmp_dir: Directory of the sorters' run files
+
+    Returns:
+        Counts of written documents and of list entries whose subject is missing
+    """
+    with SubjectDocumentBuilder(loader, memory_budget, tmp_dir) as builder:
+        with _open_output(out_path) as out:
+            for document in builder.documents():
+                out.write(json.dumps(document, ensure_ascii=False) + "\n")
+        return builder.stats
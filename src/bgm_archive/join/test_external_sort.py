@@ -0,0 +1,33 @@
+import random
+
+import pytest
+
+from bgm_archive.join.external_sort import ExternalSorter
+
+
+def test_sorts_stably_across_runs(tmp_path):
+    rng = random.Random(0)
+    items = [(rng.randrange(100), {"seq": seq, "pad": "x" * rng.randrange(50)}) for seq in range(2000)]
+
+    with ExternalSorter(memory_budget=4096, tmp_dir=str(tmp_path), fan_in=4) as sorter:
+        for key, record in items:
+            sorter.add(key, record)
+        result = list(sorter)
+        assert sorter.spilled_runs > 16
+
+    assert result == sorted(items, key=lambda item: item[0])
+    assert sorter.records == 2000
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_in_memory_only(tmp_path):
+    with ExternalSorter(tmp_dir=str(tmp_path)) as sorter:
+        for key in (3, 1, 2):
+            sorter.add((key, -key), str(key))
+        assert list(sorter) == [((1, -1), "1"), ((2, -2), "2"), ((3, -3), "3")]
+        assert sorter.spilled_runs == 0
+
+        with pytest.raises(RuntimeError):
+            list(sorter)
+        with pytest.raises(RuntimeError):
+            sorter.add(4, "4")
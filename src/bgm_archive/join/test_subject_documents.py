@@ -0,0 +1,154 @@
+import gzip
+import json
+from collections import defaultdict
+
+import pytest
+
+from bgm_archive.join.subject_documents import (
+    SubjectDocumentBuilder,
+    merge_join,
+    write_subject_documents,
+)
+from bgm_archive.loader.raw_loader import RawWikiArchiveLoader
+from bgm_archive.loader.synthetic import generate_archive
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@pytest.fixture(scope="module")
+def synthetic_archive(tmp_path_factory):
+    path = tmp_path_factory.mktemp("documents") / "synthetic.zip"
+    generate_archive(
+        str(path),
+        rows={
+            "subject.jsonlines": 60,
+            "person.jsonlines": 40,
+            "character.jsonlines": 40,
+            "episode.jsonlines": 300,
+            "subject-relations.jsonlines": 150,
+            "subject-persons.jsonlines": 200,
+            "subject-characters.jsonlines": 150,
+            "person-characters.jsonlines": 150,
+        },
+        seed=3,
+    )
+    return path
+
+
+def _rows(loader, filename):
+    return list(loader._load_entries(filename, loader.FILE_MODEL_MAP[filename]))
+
+
+def _in_memory_documents(archive) -> dict:
+    """
+    The same documents, joined with dicts.
+    """
+    loader = RawWikiArchiveLoader(str(archive))
+    subjects = {s["id"]: s for s in _rows(loader, "subject.jsonlines")}
+    persons = {p["id"]: p["name"] for p in _rows(loader, "person.jsonlines")}
+    characters = {c["id"]: c["name"] for c in _rows(loader, "character.jsonlines")}
+    lists = defaultdict(lambda: defaultdict(list))
+
+    for e in _rows(loader, "episode.jsonlines"):
+        lists[e["subject_id"]]["episodes"].append(e)
+    for sp in _rows(loader, "subject-persons.jsonlines"):
+        lists[sp["subject_id"]]["staff"].append(
+            {"person_id": sp["person_id"], "name": persons.get(sp["person_id"]), "position": sp["position"]}
+        )
+    actors = defaultdict(list)
+    for pc in _rows(loader, "person-characters.jsonlines"):
+        actors[pc["subject_id"], pc["character_id"]].append(
+            {"person_id": pc["person_id"], "name": persons.get(pc["person_id"]), "summary": pc["summary"]}
+        )
+    for sc in _rows(loader, "subject-characters.jsonlines"):
+        lists[sc["subject_id"]]["cast"].append(
+            {
+                "character_id": sc["character_id"],
+                "name": characters.get(sc["character_id"]),
+                "type": sc["type"],
+                "order": sc["order"],
+                "actors": actors[sc["subject_id"], sc["character_id"]],
+            }
+        )
+    for r in _rows(loader, "subject-relations.jsonlines"):
+        related = subjects.get(r["related_subject_id"])
+        lists[r["subject_id"]]["relations"].append(
+            {
+                "related_subject_id": r["related_subject_id"],
+                "name": related["name"] if related else None,
+                "name_cn": related["name_cn"] if related else None,
+                "relation_type": r["relation_type"],
+                "order": r["order"],
+            }
+        )
+
+    documents = {}
+    for subject_id, subject in subjects.items():
+        subject_lists = lists[subject_id]
+        documents[subject_id] = {
+            **subject,
+            "episodes": sorted(subject_lists["episodes"], key=lambda e: (e["type"], e["sort"], e["id"])),
+            "staff": sorted(subject_lists["staff"], key=lambda s: (s["person_id"], s["position"])),
+            "cast": sorted(subject_lists["cast"], key=lambda c: (c["type"], c["order"], c["character_id"])),
+            "relations": sorted(subject_lists["relations"], key=lambda r: (r["order"], r["related_subject_id"])),
+        }
+    return documents
+
+
+def test_matches_in_memory_join(synthetic_archive, tmp_path):
+    expected = _in_memory_documents(synthetic_archive)
+    # a budget of a few records per sorter forces many runs and multi-pass merges
+    builder = SubjectDocumentBuilder(
+        RawWikiArchiveLoader(str(synthetic_archive)),
+        memory_budget=20_000,
+        tmp_dir=str(tmp_path),
+        fan_in=3,
+    )
+    with builder:
+        documents = list(builder.documents())
+
+    assert [d["id"] for d in documents] == sorted(expected)
+    for document in documents:
+        assert document == expected[document["id"]]
+    assert sum(len(d["cast"]) for d in documents) > 0
+    assert any(actor["name"] for d in documents for c in d["cast"] for actor in c["actors"])
+    assert any(r["name"] for d in documents for r in d["relations"])
+    assert builder.stats["documents"] == len(expected)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_write_gzip(wiki_archive_path, tmp_path):
+    out = tmp_path / "documents.jsonlines.gz"
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+    stats = write_subject_documents(loader, str(out), memory_budget=50_000)
+
+    with gzip.open(out, "rt", encoding="utf-8") as file:
+        documents = [json.loads(line) for line in file]
+    assert stats["documents"] == len(documents) == 20
+    subject = next(d for d in documents if d["id"] == 8)
+    # validated models are dumped by alias, like the archive
+    assert subject["score_details"]["10"] > 0
+    assert len(subject["relations"]) == 14
+    assert {s["person_id"] for s in subject["staff"]} >= {39, 56, 162, 185}
+
+
+def test_slots_engine_matches_pydantic(wiki_archive_path):
+    documents = {}
+    for engine in ("pydantic", "slots"):
+        loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, engine=engine)
+        with loader, SubjectDocumentBuilder(loader, memory_budget=50_000) as builder:
+            documents[engine] = list(builder.documents())
+
+    assert documents["slots"] == documents["pydantic"]
+    assert len(documents["slots"]) == 20
+
+
+def test_merge_join():
+    left = [(1, "a"), (3, "c"), (4, "d")]
+    right = [(1, "x"), (2, "y"), (3, "z"), (3, "w"), (5, "v")]
+    assert list(merge_join(iter(left), iter(right))) == [
+        ((1, "x"), "a"),
+        ((2, "y"), None),
+        ((3, "z"), "c"),
+        ((3, "w"), "c"),
+        ((5, "v"), None),
+    ]
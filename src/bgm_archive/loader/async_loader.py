@@ -0,0 +1,196 @@
+"""
+asyncio front end of WikiArchiveLoader.
+
+Each member being consumed gets a producer in a worker thread, which inflates, parses and
+validates batches with WikiArchiveLoader.iter_batches() and puts them on a bounded
+asyncio.Queue. A full queue blocks the producer, so a slow consumer applies backpressure
+instead of letting validated entries pile up in memory. Zip inflation releases the GIL;
+validation does not, so threads keep the event loop responsive rather than adding CPU
+parallelism.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Type, TypeVar, Union
+
+from pydantic import BaseModel, ValidationError
+
+from .errors import ErrorSink
+from .model import (
+    Character,
+    Episode,
+    Person,
+    PersonCharacter,
+    Subject,
+    SubjectCharacter,
+    SubjectPerson,
+    SubjectRelation,
+)
+from .sources import ArchiveSource
+from .stats import MemberStats
+from .wiki_archive_loader import WikiArchiveLoader
+
+T = TypeVar("T", bound=BaseModel)
+
+# Queue item marking the end of a member.
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class AsyncWikiArchiveLoader:
+    """
+    Async iterators over the entries of an archive, e.g.
+
+        async with AsyncWikiArchiveLoader(path) as loader:
+            async for subject in loader.subjects():
+                ...
+
+    Several members can be consumed concurrently, e.g. with asyncio.gather(); they share
+    the archive handle of one WikiArchiveLoader, whose errors and stats are exposed here.
+    """
+
+    def __init__(
+        self,
+        archive_path: Union[str, ArchiveSource],
+        stop_on_error=True,
+        batch_size: int = 1000,
+        max_batches: int = 4,
+        **loader_kwargs,
+    ):
+        """
+        Args:
+            archive_path: Path to the zip archive, a directory of members, or an ArchiveSource
+            stop_on_error: Raise the first ValidationError in the consumer instead of
+                recording it
+            batch_size: Entries validated per batch in the producer thread
+            max_batches: Batches queued per member before the producer blocks
+            **loader_kwargs: Passed to WikiArchiveLoader, e.g. engine or error_sink
+        """
+        if max_batches < 1:
+            raise ValueError(f"max_batches must be positive, got {max_batches}")
+        self.__loader = WikiArchiveLoader(
+            archive_path, stop_on_error=stop_on_error, **loader_kwargs
+        )
+        self.__batch_size = batch_size
+        self.__max_batches = max_batches
+        # one thread per member, so gather() over all members never waits for a thread
+        self.__executor = ThreadPoolExecutor(
+            max_workers=len(WikiArchiveLoader.FILE_MODEL_MAP),
+            thread_name_prefix="archive-producer",
+        )
+
+    @property
+    def loader(self) -> WikiArchiveLoader:
+        """
+        The synchronous loader doing the work.
+        """
+        return self.__loader
+
+    async def iter_batches(
+        self, model_class: Type[T], batch_size: Optional[int] = None
+    ) -> AsyncIterator[List[T]]:
+        """
+        Validated entries of model_class in batches, produced by a worker thread.
+
+        Closing the iterator early (e.g. breaking out of async for) stops the producer and
+        closes its member before returning.
+
+        Args:
+            model_class: Pydantic model class, one of the values in FILE_MODEL_MAP
+            batch_size: Entries per batch, defaults to the loader's batch_size
+
+        Yields:
+            Non-empty lists of validated entries, in file order
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(self.__max_batches)
+        stop = threading.Event()
+        batches = self.__loader.iter_batches(model_class, batch_size or self.__batch_size)
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def produce():
+            try:
+                for batch in batches:
+                    put(batch)
+                    if stop.is_set():
+                        return
+                put(_DONE)
+            except BaseException as e:
+                if not stop.is_set():
+                    put(_Failure(e))
+            finally:
+                batches.close()
+
+        producer = loop.run_in_executor(self.__executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            stop.set()
+            # unblock a producer waiting on the full queue; it stops after that put
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+
+    async def _load(self, model_class: Type[T]) -> AsyncIterator[T]:
+        async for batch in self.iter_batches(model_class):
+            for entry in batch:
+                yield entry
+
+    def subjects(self) -> AsyncIterator[Subject]:
+        return self._load(Subject)
+
+    def persons(self) -> AsyncIterator[Person]:
+        return self._load(Person)
+
+    def characters(self) -> AsyncIterator[Character]:
+        return self._load(Character)
+
+    def episodes(self) -> AsyncIterator[Episode]:
+        return self._load(Episode)
+
+    def subject_relations(self) -> AsyncIterator[SubjectRelation]:
+        return self._load(SubjectRelation)
+
+    def subject_persons(self) -> AsyncIterator[SubjectPerson]:
+        return self._load(SubjectPerson)
+
+    def subject_characters(self) -> AsyncIterator[SubjectCharacter]:
+        return self._load(SubjectCharacter)
+
+    def person_characters(self) -> AsyncIterator[PersonCharacter]:
+        return self._load(PersonCharacter)
+
+    def get_validation_errors(self) -> Dict[type, List[ValidationError]]:
+        return self.__loader.get_validation_errors()
+
+    def get_error_sink(self) -> ErrorSink:
+        return self.__loader.get_error_sink()
+
+    def stats(self) -> Dict[str, MemberStats]:
+        return self.__loader.stats()
+
+    async def aclose(self):
+        """
+        Wait for the producer threads to finish, then close the archive.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, self.__executor.shutdown)
+        self.__loader.close()
+
+    async def __aenter__(self) -> "AsyncWikiArchiveLoader":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
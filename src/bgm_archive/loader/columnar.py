@@ -0,0 +1,292 @@
+"""
+Columnar on-disk cache of the numeric fields of subjects, persons and characters.
+
+Each entity is stored as one .npy file per column plus a string heap (UTF-8 bytes and
+int64 offsets) per text column, so analytics can memory-map a whole dump instead of
+re-parsing the archive. A manifest records the archive fingerprint for staleness checks.
+
+Layout:
+    CACHE_DIR/manifest.json
+    CACHE_DIR/subjects/id.npy, CACHE_DIR/subjects/score.npy, ...
+    CACHE_DIR/subjects/name.heap.npy, CACHE_DIR/subjects/name.offsets.npy, ...
+"""
+
+from array import array
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .fingerprint import archive_fingerprint, fingerprint_matches
+from .raw_loader import RawWikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# (column name, array module typecode used while streaming, numpy dtype on disk)
+ColumnSpec = Tuple[str, str, str]
+
+_SCORE_BUCKETS = [str(bucket) for bucket in range(1, 11)]
+_FAVORITE_KEYS = ["wish", "done", "doing", "on_hold", "dropped"]
+
+SUBJECT_COLUMNS: List[ColumnSpec] = [
+    ("id", "i", "i4"),
+    ("type", "b", "i1"),
+    ("platform", "h", "i2"),
+    ("score", "f", "f4"),
+    ("rank", "i", "i4"),
+    ("nsfw", "B", "?"),
+    ("series", "B", "?"),
+    *[(f"score_{bucket}", "i", "i4") for bucket in _SCORE_BUCKETS],
+    *[(f"favorite_{key}", "i", "i4") for key in _FAVORITE_KEYS],
+]
+
+PERSON_COLUMNS: List[ColumnSpec] = [
+    ("id", "i", "i4"),
+    ("type", "b", "i1"),
+    ("comments", "i", "i4"),
+    ("collects", "i", "i4"),
+]
+
+CHARACTER_COLUMNS: List[ColumnSpec] = [
+    ("id", "i", "i4"),
+    ("role", "b", "i1"),
+    ("comments", "i", "i4"),
+    ("collects", "i", "i4"),
+]
+
+
+def _subject_row(record: dict) -> tuple:
+    score_details = record.get("score_details") or {}
+    favorite = record["favorite"]
+    return (
+        record["id"],
+        record["type"],
+        record["platform"],
+        record["score"],
+        record["rank"],
+        record["nsfw"],
+        record["series"],
+        *[score_details.get(bucket, 0) for bucket in _SCORE_BUCKETS],
+        *[favorite[key] for key in _FAVORITE_KEYS],
+    )
+
+
+def _person_row(record: dict) -> tuple:
+    return record["id"], record["type"], record["comments"], record["collects"]
+
+
+def _character_row(record: dict) -> tuple:
+    return record["id"], record["role"], record["comments"], record["collects"]
+
+
+# entity -> (archive member, numeric columns, row extractor, string columns)
+ENTITIES: Dict[str, Tuple[str, List[ColumnSpec], Callable[[dict], tuple], List[str]]] = {
+    "subjects": ("subject.jsonlines", SUBJECT_COLUMNS, _subject_row, ["name", "name_cn"]),
+    "persons": ("person.jsonlines", PERSON_COLUMNS, _person_row, ["name"]),
+    "characters": ("character.jsonlines", CHARACTER_COLUMNS, _character_row, ["name"]),
+}
+
+
+class StringHeap:
+    """
+    Variable-length strings stored as one UTF-8 byte heap plus n+1 offsets.
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class EntityColumns:
+    """
+    Memory-mapped columns of one entity type. Columns share row order with the archive member.
+    """
+
+    def __init__(self, directory: Path, rows: int, columns: List[str], strings: List[str]):
+        self.rows = rows
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.load(directory / f"{name}.npy", mmap_mode="r") for name in columns
+        }
+        self.strings: Dict[str, StringHeap] = {
+            name: StringHeap(
+                np.load(directory / f"{name}.heap.npy", mmap_mode="r"),
+                np.load(directory / f"{name}.offsets.npy", mmap_mode="r"),
+            )
+            for name in strings
+        }
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def __getitem__(self, name: str):
+        if name in self.columns:
+            return self.columns[name]
+        return self.strings[name]
+
+
+class ColumnarCache:
+    """
+    Reader for a columnar cache directory written by ColumnarCache.build().
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        with open(self.cache_dir / MANIFEST_NAME, encoding="utf-8") as file:
+            self.manifest = json.load(file)
+        self.__entities: Dict[str, EntityColumns] = {}
+
+    def entity(self, name: str) -> EntityColumns:
+        """
+        Columns of one entity type ("subjects", "persons" or "characters"), mapped on first use.
+        """
+        if name not in self.__entities:
+            meta = self.manifest["entities"][name]
+            self.__entities[name] = EntityColumns(
+                self.cache_dir / name, meta["rows"], meta["columns"], meta["strings"]
+            )
+        return self.__entities[name]
+
+    @property
+    def subjects(self) -> EntityColumns:
+        return self.entity("subjects")
+
+    @property
+    def persons(self) -> EntityColumns:
+        return self.entity("persons")
+
+    @property
+    def characters(self) -> EntityColumns:
+        return self.entity("characters")
+
+    @staticmethod
+    def is_stale(cache_dir: str, archive_path: str) -> bool:
+        """
+        Check whether the cache is missing, outdated, or built from a different archive.
+
+        See fingerprint_matches: a touched but unchanged archive keeps its cache when it
+        was built with_hash.
+        """
+        try:
+            with open(Path(cache_dir) / MANIFEST_NAME, encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return True
+        if manifest.get("version") != CACHE_VERSION:
+            return True
+
+        return not fingerprint_matches(manifest["archive"], archive_path)
+
+    @classmethod
+    def build(
+        cls,
+        archive_path: str,
+        cache_dir: str,
+        with_hash: bool = False,
+        validate_sample_rate: Optional[int] = None,
+    ) -> "ColumnarCache":
+        """
+        (Re)build the cache from an archive, streaming each member once.
+
+        Args:
+            archive_path: Path to the zip archive
+            cache_dir: Output directory, existing entity columns are replaced
+            with_hash: Record the archive's sha256 for staleness checks
+            validate_sample_rate: Passed to RawWikiArchiveLoader
+
+        Returns:
+            A reader for the new cache
+        """
+        cache_path = Path(cache_dir)
+        cache_path.mkdir(parents=True, exist_ok=True)
+        # the manifest is written last: a cache without one is never considered fresh
+        (cache_path / MANIFEST_NAME).unlink(missing_ok=True)
+
+        fingerprint = archive_fingerprint(archive_path, with_hash=with_hash)
+        loader = RawWikiArchiveLoader(archive_path, validate_sample_rate=validate_sample_rate)
+        entities = {}
+        with loader:
+            for name, (filename, columns, row, strings) in ENTITIES.items():
+                entities[name] = _write_entity(
+                    cache_path / name,
+                    loader.iter_member(filename),
+                    columns,
+                    row,
+                    strings,
+                )
+                logger.info(f"Cached {entities[name]['rows']} {name}")
+
+        manifest = {
+            "version": CACHE_VERSION,
+            "archive": {"path": os.path.abspath(archive_path), **fingerprint},
+            "entities": entities,
+        }
+        with open(cache_path / MANIFEST_NAME, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        return cls(cache_dir)
+
+    @classmethod
+    def open_or_build(cls, archive_path: str, cache_dir: str, **build_kwargs) -> "ColumnarCache":
+        """
+        Open the cache, rebuilding it first when it is stale for archive_path.
+        """
+        if cls.is_stale(cache_dir, archive_path):
+            logger.info(f"Columnar cache at {cache_dir} is stale, rebuilding")
+            return cls.build(archive_path, cache_dir, **build_kwargs)
+        return cls(cache_dir)
+
+
+def _write_entity(
+    directory: Path,
+    records: Iterator[dict],
+    columns: List[ColumnSpec],
+    row: Callable[[dict], tuple],
+    strings: List[str],
+) -> dict:
+    """
+    Stream records into typed buffers, then save each buffer as a .npy file.
+    """
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+
+    buffers = [array(typecode) for _, typecode, _ in columns]
+    appenders = [buffer.append for buffer in buffers]
+    heaps = {name: bytearray() for name in strings}
+    offsets = {name: array("q", [0]) for name in strings}
+    rows = 0
+
+    for record in records:
+        for append, value in zip(appenders, row(record)):
+            append(value)
+        for name in strings:
+            heaps[name] += record[name].encode("utf-8")
+            offsets[name].append(len(heaps[name]))
+        rows += 1
+
+    for (name, typecode, dtype), buffer in zip(columns, buffers):
+        np.save(directory / f"{name}.npy", np.frombuffer(buffer, dtype=typecode).astype(dtype))
+    for name in strings:
+        np.save(directory / f"{name}.heap.npy", np.frombuffer(heaps[name], dtype=np.uint8))
+        np.save(directory / f"{name}.offsets.npy", np.frombuffer(offsets[name], dtype=np.int64))
+
+    return {"rows": rows, "columns": [name for name, _, _ in columns], "strings": strings}
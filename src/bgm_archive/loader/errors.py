@@ -0,0 +1,213 @@
+"""
+Bounded sink for the validation errors of a loader run with stop_on_error=False.
+
+Instead of keeping every ValidationError, the sink counts errors per model, per field and
+per offending value, keeps a capped reservoir sample of full errors per model, and can
+stream one compact jsonlines record per invalid line to a file.
+"""
+
+import json
+import random
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Dict, Hashable, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+
+# Placeholder values in the value histograms.
+MISSING = "<missing>"
+OTHER_VALUES = "<other>"
+
+
+def field_key(loc: Tuple) -> str:
+    """
+    Dotted field path of an error location, with list indexes folded into "*",
+    e.g. ("tags", 3, "name") -> "tags.*.name".
+    """
+    return ".".join("*" if isinstance(part, int) else str(part) for part in loc) or "<root>"
+
+
+def value_key(detail: Dict[str, Any]) -> Hashable:
+    """
+    Histogram key of an error's input: scalars as they are (long strings truncated),
+    containers by type name, since they are the whole record or a nested object.
+    """
+    if detail["type"] == "missing":
+        return MISSING
+    value = detail["input"]
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= 80 else value[:77] + "..."
+    return f"<{type(value).__name__}>"
+
+
+class ErrorSink:
+    """
+    Histograms, a reservoir sample and an optional jsonlines stream of validation errors.
+
+    Memory is bounded by sample_size errors per model plus max_values distinct values per
+    field; values beyond max_values are counted under OTHER_VALUES. add() and merge() may be
+    called from several threads, e.g. by AsyncWikiArchiveLoader.
+    """
+
+    def __init__(
+        self,
+        sample_size: int = 100,
+        max_values: int = 1000,
+        stream: Optional[TextIO] = None,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            sample_size: Full ValidationErrors kept per model (reservoir sampling)
+            max_values: Distinct offending values counted per field
+            stream: Text stream receiving one JSON record per invalid line
+            seed: Seed of the reservoir sampling
+        """
+        if sample_size < 0:
+            raise ValueError(f"sample_size must not be negative, got {sample_size}")
+        self.sample_size = sample_size
+        self.max_values = max_values
+        self.stream = stream
+        self.model_counts: Counter = Counter()
+        self.field_counts: Dict[type, Counter] = defaultdict(Counter)
+        self.value_counts: Dict[Tuple[type, str], Counter] = defaultdict(Counter)
+        self.__samples: Dict[type, List[ValidationError]] = defaultdict(list)
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+
+    def add(
+        self,
+        model_class: type,
+        error: ValidationError,
+        member: Optional[str] = None,
+        line_number: Optional[int] = None,
+    ):
+        """
+        Record one invalid line.
+
+        Args:
+            model_class: Model the line failed to validate against
+            error: The ValidationError
+            member: Archive member of the line, if known
+            line_number: 0-based line index within the member, as in the loader's logs
+        """
+        with self.__lock:
+            self._add(model_class, error, member, line_number)
+
+    def _add(
+        self,
+        model_class: type,
+        error: ValidationError,
+        member: Optional[str],
+        line_number: Optional[int],
+    ):
+        self.model_counts[model_class] += 1
+        self._sample(model_class, error, self.model_counts[model_class])
+
+        details = error.errors(include_url=False)
+        for detail in details:
+            field = field_key(detail["loc"])
+            self.field_counts[model_class][field] += 1
+            values = self.value_counts[model_class, field]
+            value = value_key(detail)
+            if value in values or len(values) < self.max_values:
+                values[value] += 1
+            else:
+                values[OTHER_VALUES] += 1
+
+        if self.stream is not None:
+            record = {
+                "member": member,
+                "line": line_number,
+                "model": model_class.__name__,
+                "errors": [
+                    {
+                        "loc": list(detail["loc"]),
+                        "type": detail["type"],
+                        "input": value_key(detail),
+                    }
+                    for detail in details
+                ],
+            }
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+    def _sample(self, model_class: type, error: ValidationError, seen: int):
+        samples = self.__samples[model_class]
+        if len(samples) < self.sample_size:
+            samples.append(error)
+        elif self.sample_size:
+            index = self.__random.randrange(seen)
+            if index < self.sample_size:
+                samples[index] = error
+
+    def samples(self) -> Dict[type, List[ValidationError]]:
+        """
+        The sampled ValidationErrors per model class; complete while fewer than
+        sample_size errors were seen.
+        """
+        return {model_class: list(errors) for model_class, errors in self.__samples.items()}
+
+    def total(self) -> int:
+        return sum(self.model_counts.values())
+
+    def merge(self, other: "ErrorSink"):
+        """
+        Add the counts and samples of other, e.g. a sink filled by a worker process.
+        Merged samples stay capped, drawn uniformly from the union of both samples.
+        """
+        with self.__lock:
+            self._merge(other)
+
+    def _merge(self, other: "ErrorSink"):
+        self.model_counts.update(other.model_counts)
+        for model_class, counts in other.field_counts.items():
+            self.field_counts[model_class].update(counts)
+        for key, counts in other.value_counts.items():
+            values = self.value_counts[key]
+            for value, count in counts.items():
+                if value in values or len(values) < self.max_values:
+                    values[value] += count
+                else:
+                    values[OTHER_VALUES] += count
+        for model_class, errors in other.samples().items():
+            samples = self.__samples[model_class] + errors
+            if len(samples) > self.sample_size:
+                samples = self.__random.sample(samples, self.sample_size)
+            self.__samples[model_class] = samples
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """
+        JSON-friendly histograms: per model, the error count and, per field, the error
+        count and the most common offending values as [value, count] pairs.
+        """
+        return {
+            model_class.__name__: {
+                "errors": count,
+                "fields": {
+                    field: {
+                        "errors": field_count,
+                        "values": [
+                            [value, value_count]
+                            for value, value_count in self.value_counts[
+                                model_class, field
+                            ].most_common(top)
+                        ],
+                    }
+                    for field, field_count in self.field_counts[model_class].most_common()
+                },
+            }
+            for model_class, count in self.model_counts.items()
+        }
+
+    def __getstate__(self):
+        # streams cannot cross process boundaries; a worker's sink is merged without it
+        state = self.__dict__.copy()
+        state["stream"] = None
+        del state["_ErrorSink__lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.__lock = threading.Lock()
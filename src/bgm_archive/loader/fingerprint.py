@@ -0,0 +1,38 @@
+import hashlib
+import os
+
+
+def archive_fingerprint(archive_path: str, with_hash: bool = False) -> dict:
+    """
+    Fingerprint of an archive file: size and mtime, plus sha256 when with_hash is set.
+    """
+    stat = os.stat(archive_path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        fingerprint["sha256"] = sha256_file(archive_path)
+    return fingerprint
+
+
+def fingerprint_matches(recorded: dict, archive_path: str) -> bool:
+    """
+    Check whether archive_path is still the file a recorded fingerprint was taken from.
+
+    Size and mtime are compared first. When only the mtime differs and the fingerprint
+    includes a sha256, the archive is re-hashed, so a touched but unchanged archive matches.
+    """
+    current = archive_fingerprint(archive_path)
+    if current["size"] != recorded["size"]:
+        return False
+    if current["mtime_ns"] == recorded["mtime_ns"]:
+        return True
+    if "sha256" in recorded:
+        return sha256_file(archive_path) == recorded["sha256"]
+    return False
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
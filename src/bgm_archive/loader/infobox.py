@@ -0,0 +1,168 @@
+"""
+Parser for the wiki template syntax of Subject/Person/Character.infobox.
+
+    {{Infobox animanga/Novel
+    |中文名= 第一次的亲密接触
+    |别名={
+    [L.L.]
+    [英文名|Lelouch Lamperouge]
+    }
+    |ISBN= 9789577086709
+    }}
+
+Scalar fields map to strings, list fields ("={" ... "}") to lists of InfoboxItem.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Union
+
+# Keys holding release / air / birth dates, across the templates used by the archive.
+DATE_KEYS = (
+    "发售日",
+    "发售日期",
+    "发行日期",
+    "放送开始",
+    "上映日",
+    "上映年度",
+    "开始",
+    "生日",
+)
+ISBN_KEYS = ("ISBN", "ISBN-13", "ISBN-10")
+ALIAS_KEY = "别名"
+
+
+@dataclass(frozen=True)
+class InfoboxItem:
+    """
+    One "[key|value]" or "[value]" entry of a list field; key is "" when absent.
+    """
+
+    key: str
+    value: str
+
+
+InfoboxValue = Union[str, List[InfoboxItem]]
+
+
+@dataclass
+class Infobox:
+    """
+    Parsed infobox: the template name (e.g. "animanga/Novel") and fields in source order.
+    """
+
+    template: str = ""
+    fields: Dict[str, InfoboxValue] = field(default_factory=dict)
+
+    def __getitem__(self, key: str) -> InfoboxValue:
+        return self.fields[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.fields
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fields)
+
+    def get(self, key: str, default=None) -> Optional[InfoboxValue]:
+        return self.fields.get(key, default)
+
+    def text(self, key: str) -> Optional[str]:
+        """
+        A field as a non-empty string: scalars as is, lists joined by ", ".
+        """
+        value = self.fields.get(key)
+        if isinstance(value, list):
+            value = ", ".join(item.value for item in value if item.value)
+        return value or None
+
+    @property
+    def aliases(self) -> List[str]:
+        """
+        Non-empty values of the 别名 list (a scalar 别名 counts as one alias).
+        """
+        value = self.fields.get(ALIAS_KEY)
+        if isinstance(value, list):
+            return [item.value for item in value if item.value]
+        return [value] if value else []
+
+    @property
+    def isbn(self) -> Optional[str]:
+        for key in ISBN_KEYS:
+            value = self.text(key)
+            if value:
+                return value
+        return None
+
+    @property
+    def release_date(self) -> Optional[str]:
+        """
+        The first non-empty date field, as written in the wiki (formats vary).
+        """
+        for key in DATE_KEYS:
+            value = self.text(key)
+            if value:
+                return value
+        return None
+
+
+def _parse_item(content: str) -> InfoboxItem:
+    key, sep, value = content.partition("|")
+    if not sep:
+        return InfoboxItem("", key.strip())
+    return InfoboxItem(key.strip(), value.strip())
+
+
+def _parse_inline_list(value: str) -> List[InfoboxItem]:
+    """
+    Items of a list written on one line, e.g. "{[a][英文名|b]}".
+    """
+    items = []
+    for chunk in value[1:-1].split("]"):
+        start = chunk.find("[")
+        if start >= 0:
+            items.append(_parse_item(chunk[start + 1 :]))
+    return items
+
+
+def parse_infobox(text: str) -> Infobox:
+    """
+    Parse an infobox in a single pass over its lines. \\r\\n and \\n line endings are both
+    accepted; malformed lines are attached to the previous scalar field instead of failing.
+    """
+    infobox = Infobox()
+    fields = infobox.fields
+    current_key: Optional[str] = None
+    current_list: Optional[List[InfoboxItem]] = None
+
+    for raw_line in text.split("\n"):
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        if current_list is not None:
+            if line.startswith("["):
+                current_list.append(_parse_item(line[1:-1] if line.endswith("]") else line[1:]))
+                continue
+            current_list = None
+            if line == "}":
+                continue
+
+        if line.startswith("{{Infobox"):
+            infobox.template = line[len("{{Infobox") :].strip()
+        elif line == "}}":
+            current_key = None
+        elif line.startswith("|"):
+            key, _, value = line[1:].partition("=")
+            current_key = key.strip()
+            value = value.strip()
+            if value == "{":
+                current_list = []
+                fields[current_key] = current_list
+            elif value.startswith("{") and value.endswith("}"):
+                fields[current_key] = _parse_inline_list(value)
+            else:
+                fields[current_key] = value
+        elif current_key is not None and isinstance(fields.get(current_key), str):
+            # continuation of a multi-line scalar value
+            fields[current_key] = f"{fields[current_key]}\n{line}".strip()
+
+    return infobox
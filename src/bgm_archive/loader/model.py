@@ -1,6 +1,11 @@
+from dataclasses import dataclass
 from enum import Enum, IntEnum
-from typing import Dict, List, Optional, Union
-from pydantic import BaseModel, Field, ConfigDict
+from functools import cached_property
+from typing import Annotated, Dict, List, Optional, Type, Union
+from pydantic import AfterValidator, BaseModel, Field, ConfigDict
+from pydantic_core import PydanticCustomError
+
+from .infobox import Infobox, parse_infobox
 
 _config = ConfigDict(use_enum_values=True, extra="forbid")
 
@@ -342,6 +347,75 @@ class SubjectPersonType:
         PRESENT = 4019  # 配給 / Present / 出品
 
 
+# Staff position enum of each subject type; the codes of different enums don't overlap.
+STAFF_POSITIONS: Dict[SubjectType, Type[IntEnum]] = {
+    SubjectType.ANIME: SubjectPersonType.AnimeStuff,
+    SubjectType.GAME: SubjectPersonType.GameStaff,
+    SubjectType.BOOK: SubjectPersonType.BookStaff,
+    SubjectType.MUSIC: SubjectPersonType.MusicStaff,
+    SubjectType.REAL: SubjectPersonType.RealStaff,
+}
+
+
+@dataclass(frozen=True)
+class StaffPosition:
+    """
+    A SubjectPerson.position code resolved to its subject type and role.
+    """
+
+    category: SubjectType
+    role: IntEnum
+
+
+# code -> (category, role) of every position, and the same split by category
+POSITIONS: Dict[int, StaffPosition] = {}
+_POSITIONS_BY_CATEGORY: Dict[SubjectType, Dict[int, StaffPosition]] = {}
+for _category, _enum in STAFF_POSITIONS.items():
+    _POSITIONS_BY_CATEGORY[_category] = {}
+    for _role in _enum:
+        if _role.value in POSITIONS:
+            raise ValueError(f"Position code {_role.value} is in several staff enums")
+        POSITIONS[_role.value] = _POSITIONS_BY_CATEGORY[_category][_role.value] = StaffPosition(
+            _category, _role
+        )
+del _category, _enum, _role
+
+_POSITION_CODES = frozenset(POSITIONS)
+_EXPECTED_POSITIONS = ", ".join(map(str, sorted(POSITIONS)[:-1])) + f" or {max(POSITIONS)}"
+
+
+def resolve_position(code: int, subject_type: Optional[int] = None) -> StaffPosition:
+    """
+    Category and role of a staff position code.
+
+    Args:
+        code: SubjectPerson.position
+        subject_type: Type of the owning subject; when given, the code must be one of its
+            positions
+
+    Raises:
+        ValueError: if the code is not a position (of subject_type)
+    """
+    positions = POSITIONS if subject_type is None else _POSITIONS_BY_CATEGORY.get(subject_type, {})
+    try:
+        return positions[code]
+    except KeyError:
+        suffix = "" if subject_type is None else f" of {SubjectType(subject_type).name} subjects"
+        raise ValueError(f"{code!r} is not a staff position{suffix}") from None
+
+
+def _check_position(code: int) -> int:
+    if code not in _POSITION_CODES:
+        raise PydanticCustomError(
+            "enum", "Input should be {expected}", {"expected": _EXPECTED_POSITIONS}
+        )
+    return code
+
+
+# A single set lookup instead of trying the five enums of a union in turn
+Position = Annotated[int, AfterValidator(_check_position)]
+
+
 class Tag(BaseModel):
     """Tag model for subjects."""
 
@@ -396,6 +470,11 @@ class Subject(BaseModel):
     series: bool
     meta_tags: Optional[str] = None
 
+    @cached_property
+    def parsed_infobox(self) -> Infobox:
+        """Infobox parsed on first access."""
+        return parse_infobox(self.infobox)
+
 
 class Person(BaseModel):
     """Person model (individual, company, association)."""
@@ -411,6 +490,11 @@ class Person(BaseModel):
     comments: int
     collects: int
 
+    @cached_property
+    def parsed_infobox(self) -> Infobox:
+        """Infobox parsed on first access."""
+        return parse_infobox(self.infobox)
+
 
 class Character(BaseModel):
     """Character model."""
@@ -425,6 +509,11 @@ class Character(BaseModel):
     comments: int
     collects: int
 
+    @cached_property
+    def parsed_infobox(self) -> Infobox:
+        """Infobox parsed on first access."""
+        return parse_infobox(self.infobox)
+
 
 class Episode(BaseModel):
     """Episode model."""
@@ -472,13 +561,13 @@ class SubjectPerson(BaseModel):
 
     person_id: int
     subject_id: int
-    position: (
-        SubjectPersonType.AnimeStuff
-        | SubjectPersonType.GameStaff
-        | SubjectPersonType.BookStaff
-        | SubjectPersonType.MusicStaff
-        | SubjectPersonType.RealStaff
-    )
+    position: Position
+
+    def staff_position(self, subject_type: Optional[int] = None) -> StaffPosition:
+        """
+        Category and role of the position, see resolve_position().
+        """
+        return resolve_position(self.position, subject_type)
 
 
 class PersonCharacter(BaseModel):
@@ -0,0 +1,187 @@
+"""
+Persistent id -> (offset, length) index over decompressed archive members.
+
+Building a member index is one pass over its decompressed bytes: every line is written to
+a plain cache file, and the line's id, offset and length are recorded. The records are
+sorted by id and saved as a compact structured array, so a point read is a binary search
+plus one slice of the memory-mapped cache file.
+
+Layout:
+    INDEX_DIR/manifest.json
+    INDEX_DIR/subject.jsonlines          decompressed member
+    INDEX_DIR/subject.jsonlines.idx.npy  sorted (id, offset, length) records
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import numpy as np
+from pydantic_core import from_json
+
+from .fingerprint import archive_fingerprint, fingerprint_matches
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+
+# Members whose entries carry a unique "id"; relation members have composite keys.
+ID_MEMBERS = [
+    "subject.jsonlines",
+    "person.jsonlines",
+    "character.jsonlines",
+    "episode.jsonlines",
+]
+
+INDEX_DTYPE = np.dtype([("id", "<i8"), ("offset", "<i8"), ("length", "<u4")])
+
+_ID_PATTERN = re.compile(rb'"id":\s*(-?\d+)')
+
+
+def extract_id(line: bytes) -> int:
+    """
+    Read the top-level "id" of a JSON line without parsing the whole line.
+
+    '"id":' cannot occur inside a JSON string value, since quotes there are escaped, and
+    no nested object in the archive has an "id" key, so the first match is the entry's.
+    """
+    match = _ID_PATTERN.search(line)
+    if match is None:
+        return from_json(line)["id"]
+    return int(match.group(1))
+
+
+class _MemberIndex:
+    def __init__(self, data_path: Path, index_path: Path):
+        self.records = np.load(index_path)
+        self.ids = np.ascontiguousarray(self.records["id"])
+        self.__file = open(data_path, "rb")
+        self.data = (
+            mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+            if os.path.getsize(data_path)
+            else b""
+        )
+
+    def get(self, entry_id: int) -> Optional[bytes]:
+        position = int(np.searchsorted(self.ids, entry_id))
+        if position >= len(self.ids) or self.ids[position] != entry_id:
+            return None
+        _, offset, length = self.records[position].tolist()
+        return self.data[offset : offset + length]
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.__file.close()
+
+
+class OffsetIndex:
+    """
+    Random access by id to the entity members of one archive.
+
+    Member indexes are built on first access and rebuilt when the archive changes.
+    """
+
+    def __init__(
+        self,
+        archive_path: str,
+        index_dir: str,
+        open_archive,
+        fingerprint_path: Optional[Callable[[str], str]] = None,
+    ):
+        """
+        Args:
+            archive_path: Path to the zip archive, used for staleness checks
+            index_dir: Directory holding decompressed members and their indexes
+            open_archive: Context manager factory yielding the opened archive
+            fingerprint_path: Maps a member to the file used for its staleness checks,
+                defaults to archive_path for every member
+        """
+        self.__archive_path = archive_path
+        self.__fingerprint_path = fingerprint_path or (lambda filename: archive_path)
+        self.__index_dir = Path(index_dir)
+        self.__open_archive = open_archive
+        self.__members: Dict[str, _MemberIndex] = {}
+
+    def get_line(self, filename: str, entry_id: int) -> Optional[bytes]:
+        """
+        Raw JSON line of the entry with entry_id in an archive member, or None.
+        """
+        if filename not in self.__members:
+            if self.is_stale(filename):
+                self.build(filename)
+            self.__members[filename] = _MemberIndex(
+                self.__index_dir / filename, self.__index_dir / f"{filename}.idx.npy"
+            )
+        return self.__members[filename].get(entry_id)
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.__index_dir / MANIFEST_NAME, encoding="utf-8") as file:
+                manifest = json.load(file)
+        except (OSError, ValueError):
+            return {"version": INDEX_VERSION, "members": {}}
+        if manifest.get("version") != INDEX_VERSION:
+            return {"version": INDEX_VERSION, "members": {}}
+        return manifest
+
+    def is_stale(self, filename: str) -> bool:
+        member = self._read_manifest()["members"].get(filename)
+        return member is None or not fingerprint_matches(
+            member["archive"], self.__fingerprint_path(filename)
+        )
+
+    def build(self, filename: str) -> int:
+        """
+        Decompress one member into the index directory and index its lines by id.
+
+        Returns:
+            Number of indexed entries
+        """
+        if filename not in ID_MEMBERS:
+            raise ValueError(f"{filename} has no id to index by")
+        # resolved first: a source without a file to fingerprint must not leave a directory
+        fingerprint = archive_fingerprint(self.__fingerprint_path(filename))
+        self.__index_dir.mkdir(parents=True, exist_ok=True)
+        if filename in self.__members:
+            self.__members.pop(filename).close()
+
+        ids, offsets, lengths = [], [], []
+        data_path = self.__index_dir / filename
+        with self.__open_archive() as archive:
+            with archive.open(filename) as file, open(f"{data_path}.tmp", "wb") as out:
+                offset = 0
+                for line in file:
+                    out.write(line)
+                    content = line.rstrip()
+                    if content:
+                        ids.append(extract_id(content))
+                        offsets.append(offset)
+                        lengths.append(len(content))
+                    offset += len(line)
+
+        records = np.empty(len(ids), dtype=INDEX_DTYPE)
+        records["id"] = ids
+        records["offset"] = offsets
+        records["length"] = lengths
+        # stable sort: the first line wins for duplicate ids, as in a linear scan
+        records = records[np.argsort(records["id"], kind="stable")]
+        np.save(self.__index_dir / f"{filename}.idx.npy", records)
+        os.replace(f"{data_path}.tmp", data_path)
+
+        manifest = self._read_manifest()
+        manifest["members"][filename] = {"archive": fingerprint, "rows": len(records)}
+        with open(self.__index_dir / MANIFEST_NAME, "w", encoding="utf-8") as file:
+            json.dump(manifest, file, indent=2)
+        logger.info(f"Indexed {len(records)} entries of {filename}")
+        return len(records)
+
+    def close(self):
+        for member in self.__members.values():
+            member.close()
+        self.__members.clear()
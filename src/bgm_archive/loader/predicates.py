@@ -0,0 +1,189 @@
+"""
+Predicate pushdown: skip archive lines that cannot match a filter before validating them.
+
+    loader.subjects(where={"type": SubjectType.ANIME, "nsfw": False})
+    loader.episodes(where={"subject_id": {8, 12, 51}})
+
+A filter maps field names to a value (equality) or to a set, frozenset, list or tuple of
+values (membership); all conditions must hold. Values are validated with the field's type
+first, so SubjectType.ANIME and 2 are the same condition.
+
+LineFilter.prefilter() looks at the raw bytes of a line: a regex finds the `"key": value`
+tokens of each filtered field and the value token alone is validated and compared, with
+the decision memoized per token. Only lines it cannot rule out are fully validated, and
+LineFilter.matches() then checks the validated entry, so the prefilter never changes the
+result, only what it costs. The prefilter keeps a line whenever it is unsure: when a key
+is missing, when its value is not a plain JSON scalar, or when it does not validate (the
+full validation reports the error). Lines it rules out are neither validated nor reported
+as errors.
+"""
+
+import functools
+import re
+from typing import Any, Annotated, Callable, Dict, Hashable, Iterable, List, Mapping, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+# `"key"` followed by a JSON number, true, false, null or string, for unusual spacing
+_VALUE_PATTERN = rb'"%s"\s*:\s*(-?[0-9][0-9.eE+-]*|true|false|null|"(?:[^"\\]|\\.)*")'
+
+# Memoized decisions per condition; value tokens of ids are unbounded.
+MAX_DECISIONS = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def _nested_keys(model_class: Type[BaseModel]) -> frozenset:
+    """
+    JSON keys of the models nested in model_class, e.g. name and count of Subject's tags.
+    """
+    definitions = model_class.model_json_schema().get("$defs", {}).values()
+    return frozenset(key for definition in definitions for key in definition.get("properties", {}))
+
+
+class _Condition:
+    def __init__(self, model_class: Type[BaseModel], name: str, expected: Any):
+        info = model_class.model_fields[name]
+        if info.metadata:
+            adapter = TypeAdapter(Annotated[(info.annotation, *info.metadata)])
+        else:
+            adapter = TypeAdapter(info.annotation)
+        if isinstance(expected, (set, frozenset, list, tuple)):
+            values = list(expected)
+        else:
+            values = [expected]
+        try:
+            self.accepted = frozenset(adapter.validate_python(value) for value in values)
+        except ValidationError as e:
+            raise ValueError(f"Invalid value for {model_class.__name__}.{name}: {e}") from e
+        self.name = name
+        self.validate_token = adapter.validate_json
+        json_key = info.alias or name
+        self.key = b'"%s"' % json_key.encode()
+        self.pattern = re.compile(_VALUE_PATTERN % re.escape(json_key).encode())
+        # without nested models using the key, its first occurrence is the line's own value
+        self.repeated = json_key in _nested_keys(model_class)
+        self.decisions: Dict[bytes, bool] = {}
+        # a missing key takes the default, which the raw bytes cannot rule out
+        default = info.get_default(call_default_factory=True)
+        self.usable = info.is_required() or (
+            isinstance(default, Hashable) and default not in self.accepted
+        )
+
+    def may_match(self, token: bytes) -> bool:
+        """
+        False if the value token cannot be accepted, True if it may (or does not validate).
+        """
+        decision = self.decisions.get(token)
+        if decision is None:
+            try:
+                decision = self.validate_token(token) in self.accepted
+            except ValidationError:
+                decision = True
+            if len(self.decisions) >= MAX_DECISIONS:
+                self.decisions.clear()
+            self.decisions[token] = decision
+        return decision
+
+    def rules_out(self, line: bytes) -> bool:
+        """
+        True if the raw line cannot match the condition.
+        """
+        key, decisions = self.key, self.decisions
+        # bytes.find() reaches the key much faster than a regex search
+        start = line.find(key)
+        found = False
+        while start >= 0:
+            value_start = start + len(key)
+            if line.startswith(b":", value_start):
+                # compact JSON: the token ends at the next comma; a cut string or a token
+                # running into the next object does not validate, which keeps the line
+                end = line.find(b",", value_start)
+                token = line[value_start + 1 : end] if end >= 0 else line[value_start + 1 :]
+                if end < 0:
+                    token = token.rstrip(b"} \t\r\n")
+                next_start = value_start
+            else:
+                value = self.pattern.match(line, start)
+                if value is None:
+                    # the key's name as a string value, or a key with a non-scalar value
+                    start = line.find(key, start + 1)
+                    continue
+                token, next_start = value.group(1), value.end()
+            decision = decisions.get(token)
+            if decision is None:
+                decision = self.may_match(token)
+            if decision:
+                return False
+            found = True
+            if not self.repeated:
+                break
+            start = line.find(key, next_start)
+        return found
+
+
+class LineFilter:
+    """
+    Compiled filter of one model, see the module docstring.
+
+    Raises:
+        ValueError: if where is empty, names fields model_class does not have or holds
+            values the fields do not accept
+    """
+
+    def __init__(self, model_class: Type[BaseModel], where: Mapping[str, Any]):
+        unknown = set(where) - set(model_class.model_fields)
+        if unknown:
+            raise ValueError(f"{model_class.__name__} has no fields {sorted(unknown)}")
+        if not where:
+            raise ValueError("At least one condition must be given")
+        self.model_class = model_class
+        self.__conditions = [
+            _Condition(model_class, name, expected) for name, expected in where.items()
+        ]
+        self.__prefilters: List[Callable[[bytes], bool]] = [
+            condition.rules_out for condition in self.__conditions if condition.usable
+        ]
+        self.__checks = [(condition.name, condition.accepted) for condition in self.__conditions]
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """
+        Names of the filtered fields.
+        """
+        return tuple(name for name, _ in self.__checks)
+
+    def prefilter(self, line: bytes) -> bool:
+        """
+        False if the raw line cannot match, True if it may.
+        """
+        for rules_out in self.__prefilters:
+            if rules_out(line):
+                return False
+        return True
+
+    def matches(self, entry: Any) -> bool:
+        """
+        Whether a validated entry (model or slots record) matches.
+        """
+        for name, accepted in self.__checks:
+            if getattr(entry, name) not in accepted:
+                return False
+        return True
+
+    def matches_values(self, values: Mapping[str, Any]) -> bool:
+        """
+        Whether the field values of an entry, e.g. a model_dump() or a raw JSON object,
+        match; missing fields do not.
+        """
+        for name, accepted in self.__checks:
+            if name not in values or values[name] not in accepted:
+                return False
+        return True
+
+
+def filter_fields(fields: Iterable[str], line_filter: LineFilter) -> List[str]:
+    """
+    Projected fields plus the filtered ones, which matches() needs.
+    """
+    fields = list(fields)
+    return fields + [name for name in line_filter.fields if name not in fields]
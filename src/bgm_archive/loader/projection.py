@@ -0,0 +1,61 @@
+"""
+Partial models for field projection: validate only some fields of an archive model.
+
+    SubjectFields = partial_model(Subject, ["id", "name", "type"])
+    SubjectFields.model_validate_json(line)  # SubjectFields(id=1, name="...", type=1)
+
+A partial model keeps the requested fields exactly as declared on the model (type,
+alias, default, validators such as model.Position), in the model's field order, and
+ignores every other key of a line. Pydantic's JSON parser skips ignored values without
+building Python objects for them, so unrequested infoboxes, summaries and tag lists cost
+only a scan of their bytes. Partial models are plain BaseModels without the model's
+methods and properties (e.g. Subject.parsed_infobox), and do not reject unknown keys.
+"""
+
+import functools
+from typing import Iterable, Tuple, Type
+
+from pydantic import BaseModel, create_model
+
+
+@functools.lru_cache(maxsize=None)
+def _partial_model(model_class: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    definitions = {
+        name: (model_class.model_fields[name].annotation, model_class.model_fields[name])
+        for name in fields
+    }
+    partial = create_model(
+        f"{model_class.__name__}Fields",
+        __config__={**model_class.model_config, "extra": "ignore"},
+        __module__=model_class.__module__,
+        **definitions,
+    )
+    partial.__projected_from__ = model_class
+    return partial
+
+
+def partial_model(model_class: Type[BaseModel], fields: Iterable[str]) -> Type[BaseModel]:
+    """
+    The partial model of model_class with only fields; the same class for the same set of
+    fields, in any order.
+
+    Raises:
+        ValueError: if fields is empty or names fields model_class does not have
+    """
+    requested = set(fields)
+    unknown = requested - set(model_class.model_fields)
+    if unknown:
+        raise ValueError(f"{model_class.__name__} has no fields {sorted(unknown)}")
+    if not requested:
+        raise ValueError("At least one field must be requested")
+    ordered = tuple(name for name in model_class.model_fields if name in requested)
+    if len(ordered) == len(model_class.model_fields):
+        return model_class
+    return _partial_model(model_class, ordered)
+
+
+def source_model(model_class: Type[BaseModel]) -> Type[BaseModel]:
+    """
+    The model a partial model was generated from, or model_class itself.
+    """
+    return getattr(model_class, "__projected_from__", model_class)
@@ -0,0 +1,145 @@
+from collections import namedtuple
+import functools
+import logging
+from typing import Any, Iterable, Iterator, List, Literal, Mapping, Optional, Type
+
+from pydantic import BaseModel, ValidationError
+from pydantic_core import from_json
+
+from .predicates import LineFilter
+from .wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+RecordType = Literal["dict", "tuple"]
+
+
+@functools.lru_cache(maxsize=None)
+def record_tuple(model_class: Type[BaseModel]) -> type:
+    """
+    Named tuple type with the same field names, in the same order, as model_class.
+
+    Fields missing from a record (e.g. optional score_details) are None.
+    """
+    return namedtuple(
+        model_class.__name__ + "Record",
+        list(model_class.model_fields),
+        defaults=[None] * len(model_class.model_fields),
+    )
+
+
+class RawWikiArchiveLoader(WikiArchiveLoader):
+    """
+    A trusted variant of WikiArchiveLoader for archives that have already been validated.
+
+    Lines are only parsed as JSON, and iterators yield plain dicts (or named tuples from
+    record_tuple) instead of Pydantic models. Values keep their raw JSON form, which matches
+    the validated models since they use use_enum_values; nested objects like tags or
+    score_details stay dicts/lists.
+
+    To catch schema drift cheaply, validate_sample_rate=N fully validates every Nth record
+    (starting with the first) against its model. Failures of sampled records are handled
+    like in WikiArchiveLoader: raised with stop_on_error, recorded and skipped otherwise.
+    """
+
+    def __init__(
+        self,
+        archive_path: str,
+        stop_on_error=True,
+        record_type: RecordType = "dict",
+        validate_sample_rate: Optional[int] = None,
+        **kwargs,
+    ):
+        """
+        Args:
+            archive_path: Path to the zip archive containing JSONL files
+            record_type: "dict" for parsed JSON objects, "tuple" for named tuples
+            validate_sample_rate: Validate 1 in N records with the Pydantic model, None to skip
+            kwargs: Other WikiArchiveLoader options, e.g. observer, timings or error_sink
+        """
+        super().__init__(archive_path, stop_on_error=stop_on_error, **kwargs)
+        if record_type not in ("dict", "tuple"):
+            raise ValueError(f"Unknown record_type: {record_type}")
+        if validate_sample_rate is not None and validate_sample_rate < 1:
+            raise ValueError(f"validate_sample_rate must be positive, got {validate_sample_rate}")
+        self.__record_type = record_type
+        self.__validate_sample_rate = validate_sample_rate
+
+    def _load_entries(
+        self,
+        filename: str,
+        model_class: Type[BaseModel],
+        line_filter: Optional[LineFilter] = None,
+    ) -> Iterator[Any]:
+        """
+        Parse entries from a JSONL file in the zip archive, validating only sampled ones.
+
+        Args:
+            filename: Name of the JSONL file in the zip archive
+            model_class: Pydantic model class for sampled validation and tuple field names
+            line_filter: Only yield records matching this filter, compared on raw values
+
+        Yields:
+            Parsed records, as dicts or named tuples
+        """
+        sample_rate = self.__validate_sample_rate
+        fields = list(model_class.model_fields)
+        make_tuple = record_tuple(model_class)._make if self.__record_type == "tuple" else None
+        stats = self._member_stats(filename)
+
+        for index, (line_number, line) in enumerate(self._iter_lines(filename)):
+            if line_filter is not None and not line_filter.prefilter(line):
+                stats.filtered += 1
+                stats.prefiltered += 1
+                continue
+            try:
+                if sample_rate is not None and index % sample_rate == 0:
+                    model_class.model_validate_json(line)
+                record = from_json(line)
+            except ValidationError as e:
+                self._handle_validation_error(model_class, e, line_number)
+                continue
+            except Exception as e:
+                logger.error(f"Unexpected error processing {filename}:{line_number}: {e}")
+                raise
+
+            stats.valid += 1
+            if line_filter is not None and not line_filter.matches_values(record):
+                stats.filtered += 1
+                continue
+            if make_tuple is not None:
+                yield make_tuple(map(record.get, fields))
+            else:
+                yield record
+
+    def iter_batches(
+        self,
+        model_class: Type[BaseModel],
+        batch_size: int = 1000,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[List[Any]]:
+        """
+        Parse entries of model_class in batches, validating only sampled ones.
+
+        Args:
+            model_class: Pydantic model class, one of the values in FILE_MODEL_MAP
+            batch_size: Maximum number of records per batch
+            fields: Fields of the named tuples, see projection.partial_model(); dicts
+                keep every field
+            where: Only yield records matching this filter, see predicates.LineFilter
+
+        Yields:
+            Non-empty lists of records, as dicts or named tuples, in file order
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        model_class, line_filter = self._query(model_class, fields, where)
+        batch: List[Any] = []
+        for record in self._load_entries(self._filename_for(model_class), model_class, line_filter):
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,297 @@
+"""
+Persistent cache of validated records, so repeat passes over a member skip inflation, JSON
+parsing and validation.
+
+The first pass over a member stores its valid records as marshal-encoded chunks of field
+dicts (model_dump()) in a data file, with the chunk offsets in a .npy array. Later passes
+memory-map the data file, decode a chunk at a time and rebuild the models from the
+decoded values (see model_builder()). Invalid lines are kept verbatim with their position
+among the records, so a replay reports them again, at the same point, through the
+loader's error handling.
+
+Entries are keyed by the sha256 of the member's source file (the zip archive, or the
+member file of a directory source) and by a schema version derived from the model's JSON
+schema, so a new dump or a changed model never reads old records. The sha256 of a source
+file is only recomputed when its size or mtime changes.
+
+Layout:
+    CACHE_DIR/sources.json                                   source path -> fingerprint
+    CACHE_DIR/<sha256>/subject.jsonlines.<schema>.data       marshal chunks
+    CACHE_DIR/<sha256>/subject.jsonlines.<schema>.chunks.npy n+1 chunk offsets
+    CACHE_DIR/<sha256>/subject.jsonlines.<schema>.json       rows and invalid lines
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import marshal
+import mmap
+import os
+import tempfile
+import types
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+
+import numpy as np
+from pydantic import BaseModel
+
+from .fingerprint import archive_fingerprint, fingerprint_matches
+
+# Bump when the file format, or a validator that the JSON schema does not show, changes.
+RECORD_CACHE_VERSION = 1
+SOURCES_NAME = "sources.json"
+
+# Records per marshal chunk: large enough to amortize the call, small enough to stream.
+CHUNK_ROWS = 1024
+
+_object_new = object.__new__
+_object_setattr = object.__setattr__
+
+
+@functools.lru_cache(maxsize=None)
+def schema_version(model_class: Type[BaseModel]) -> str:
+    """
+    Short hash of the model's JSON schema and the cache format version.
+    """
+    schema = json.dumps(model_class.model_json_schema(), sort_keys=True)
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(f"{RECORD_CACHE_VERSION}:{model_class.__qualname__}:{schema}".encode())
+    return digest.hexdigest()
+
+
+def _nested_fields(model_class: Type[BaseModel]) -> List[Tuple[str, Type[BaseModel], bool]]:
+    """
+    (field name, model class, is list) of the fields holding nested models.
+    """
+    nested = []
+    for name, info in model_class.model_fields.items():
+        annotation, is_list = info.annotation, False
+        if get_origin(annotation) in (Union, types.UnionType):
+            # Optional[Model]: None stays None
+            annotation = next(arg for arg in get_args(annotation) if arg is not type(None))
+        if get_origin(annotation) in (list, List):
+            annotation, is_list = get_args(annotation)[0], True
+        if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+            nested.append((name, annotation, is_list))
+    return nested
+
+
+@functools.lru_cache(maxsize=None)
+def model_builder(model_class: Type[BaseModel]) -> Callable[[Dict[str, Any]], BaseModel]:
+    """
+    Function turning a model_dump() of a valid model_class instance back into the model.
+
+    Flat models are assembled directly, without validation, which is about twice as fast
+    as pydantic-core. Models with nested models (Subject's tags) are passed to pydantic-core
+    instead: creating a dozen nested instances in Python costs more than validating
+    already-decoded values in Rust.
+    """
+    if _nested_fields(model_class):
+        return functools.partial(model_class.model_validate, by_alias=False, by_name=True)
+
+    def build(values: Dict[str, Any]) -> BaseModel:
+        model = _object_new(model_class)
+        _object_setattr(model, "__dict__", values)
+        _object_setattr(model, "__pydantic_fields_set__", set(values))
+        _object_setattr(model, "__pydantic_extra__", None)
+        _object_setattr(model, "__pydantic_private__", None)
+        return model
+
+    return build
+
+
+@functools.lru_cache(maxsize=None)
+def record_builder(model_class: Type[BaseModel]) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Like model_builder(), for the __slots__ records of the slots engine, which are always
+    assembled directly.
+    """
+    from .records import record_type
+
+    cls = record_type(model_class)
+    slots = cls.__slots__
+    nested = [
+        (name, record_builder(nested_class), is_list)
+        for name, nested_class, is_list in _nested_fields(model_class)
+    ]
+
+    def build(values: Dict[str, Any]):
+        for name, build_nested, is_list in nested:
+            value = values[name]
+            if value is None:
+                continue
+            if is_list:
+                values[name] = [build_nested(item) for item in value]
+            else:
+                values[name] = build_nested(value)
+        record = _object_new(cls)
+        for name in slots:
+            _object_setattr(record, name, values[name])
+        return record
+
+    return build
+
+
+class CachedMember:
+    """
+    A committed cache entry of one member, read through a memory map.
+    """
+
+    def __init__(self, prefix: Path, meta: dict):
+        self.rows: int = meta["rows"]
+        # (position among the valid records, line number, raw line)
+        self.invalid: List[Tuple[int, int, bytes]] = [
+            (position, line_number, line.encode("latin-1"))
+            for position, line_number, line in meta["invalid"]
+        ]
+        self.__data_path = f"{prefix}.data"
+        self.__chunks = np.load(f"{prefix}.chunks.npy")
+
+    def dumps(self) -> Iterator[Dict[str, Any]]:
+        """
+        The stored model_dump() dicts, in file order.
+        """
+        if self.rows == 0:
+            return
+        with open(self.__data_path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                view = memoryview(data)
+                try:
+                    offsets = self.__chunks.tolist()
+                    for start, end in zip(offsets, offsets[1:]):
+                        yield from marshal.loads(view[start:end])
+                finally:
+                    view.release()
+
+
+class MemberWriter:
+    """
+    Collects the outcome of one full pass over a member; commit() makes it visible.
+    """
+
+    def __init__(self, prefix: Path):
+        self.__prefix = prefix
+        prefix.parent.mkdir(parents=True, exist_ok=True)
+        fd, self.__tmp_path = tempfile.mkstemp(
+            prefix=f"{prefix.name}.", suffix=".tmp", dir=prefix.parent
+        )
+        self.__file = os.fdopen(fd, "wb")
+        self.__chunk: List[Dict[str, Any]] = []
+        self.__offsets = [0]
+        self.__invalid: List[Tuple[int, int, str]] = []
+        self.rows = 0
+
+    def add(self, values: Dict[str, Any]):
+        self.__chunk.append(values)
+        self.rows += 1
+        if len(self.__chunk) >= CHUNK_ROWS:
+            self._flush()
+
+    def add_invalid(self, line_number: int, line: bytes):
+        # latin-1 maps bytes 1:1, so any line round-trips through the JSON metadata
+        self.__invalid.append((self.rows, line_number, line.decode("latin-1")))
+
+    def _flush(self):
+        if self.__chunk:
+            size = self.__file.write(marshal.dumps(self.__chunk))
+            self.__offsets.append(self.__offsets[-1] + size)
+            self.__chunk = []
+
+    def commit(self):
+        self._flush()
+        self.__file.close()
+        prefix = str(self.__prefix)
+        np.save(f"{prefix}.chunks.npy", np.array(self.__offsets, dtype=np.int64))
+        os.replace(self.__tmp_path, f"{prefix}.data")
+        # the metadata is written last: an entry without it is never read
+        meta_tmp = f"{self.__tmp_path}.json"
+        with open(meta_tmp, "w", encoding="utf-8") as file:
+            json.dump({"rows": self.rows, "invalid": self.__invalid}, file)
+        os.replace(meta_tmp, f"{prefix}.json")
+
+    def abort(self):
+        if not self.__file.closed:
+            self.__file.close()
+        if os.path.exists(self.__tmp_path):
+            os.remove(self.__tmp_path)
+
+
+class RecordCache:
+    """
+    Directory of validated-record cache entries, see the module docstring.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.__hashes: Dict[str, str] = {}
+
+    def source_hash(self, source_path: str) -> str:
+        """
+        sha256 of a source file, reusing the recorded one while size and mtime match.
+        """
+        path = os.path.abspath(source_path)
+        if path in self.__hashes:
+            return self.__hashes[path]
+        try:
+            with open(self.cache_dir / SOURCES_NAME, encoding="utf-8") as file:
+                sources = json.load(file)
+        except (OSError, ValueError):
+            sources = {}
+        recorded = sources.get(path)
+        if recorded is not None and fingerprint_matches(recorded, path):
+            sha256 = recorded["sha256"]
+        else:
+            fingerprint = archive_fingerprint(path, with_hash=True)
+            sha256 = fingerprint["sha256"]
+            sources[path] = fingerprint
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(sources, file, indent=2)
+            os.replace(tmp_path, self.cache_dir / SOURCES_NAME)
+        self.__hashes[path] = sha256
+        return sha256
+
+    def _prefix(self, source_path: str, filename: str, model_class: Type[BaseModel]) -> Path:
+        directory = self.cache_dir / self.source_hash(source_path)
+        return directory / f"{filename}.{schema_version(model_class)}"
+
+    def get(
+        self, source_path: str, filename: str, model_class: Type[BaseModel]
+    ) -> Optional[CachedMember]:
+        """
+        The committed entry of a member, or None when it has not been cached yet.
+        """
+        prefix = self._prefix(source_path, filename, model_class)
+        try:
+            with open(f"{prefix}.json", encoding="utf-8") as file:
+                meta = json.load(file)
+        except (OSError, ValueError):
+            return None
+        return CachedMember(prefix, meta)
+
+    def writer(
+        self, source_path: str, filename: str, model_class: Type[BaseModel]
+    ) -> MemberWriter:
+        """
+        Writer of a new entry, replacing the entry of the same member and schema if any.
+        """
+        prefix = self._prefix(source_path, filename, model_class)
+        # entries of older schema versions of the member are unreachable now
+        for path in prefix.parent.glob(f"{filename}.*"):
+            if not path.name.startswith(prefix.name) and not path.name.endswith(".tmp"):
+                path.unlink(missing_ok=True)
+        return MemberWriter(prefix)
@@ -0,0 +1,306 @@
+"""
+Compact __slots__ record engine, an alternative to materializing Pydantic models.
+
+Record types are generated from the models in model.py, so they keep the same field
+names, defaults, enum value sets and extra="forbid" strictness. Lines are parsed with
+pydantic_core.from_json and checked field by field; failures raise the same
+pydantic_core.ValidationError type (and error types) as the Pydantic path, so loader
+error bookkeeping is shared.
+
+Numbers are not coerced from strings: JSON values must already have the field's type,
+which is what the archive contains.
+"""
+
+from enum import IntEnum
+import functools
+import inspect
+import types
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import AfterValidator, BaseModel
+from pydantic_core import PydanticCustomError, PydanticUndefined, ValidationError, from_json
+
+
+class Record:
+    """
+    Base of the generated record types. Fields are in __slots__, values are plain
+    Python objects (ints for enums, lists of records for nested lists).
+    """
+
+    __slots__ = ()
+    model_class: Type[BaseModel]
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            setattr(self, name, values[name])
+
+    def __eq__(self, other) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Field values as a dict, like model_dump() of the mirrored model.
+        """
+        return {name: _dump(getattr(self, name)) for name in self.__slots__}
+
+    def to_model(self) -> BaseModel:
+        """
+        The equivalent Pydantic model instance.
+        """
+        return self.model_class.model_validate(self.to_dict(), by_alias=False, by_name=True)
+
+
+def _dump(value):
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_dump(item) for item in value]
+    return value
+
+
+class _Invalid(Exception):
+    def __init__(self, error_type: str, value: Any, ctx: Optional[dict] = None, loc=()):
+        self.error_type = error_type
+        self.value = value
+        self.ctx = ctx
+        self.loc = loc
+
+
+# A check takes the decoded JSON value and returns the value to store, or raises _Invalid.
+Check = Callable[[Any], Any]
+
+
+def _check_int(value):
+    if type(value) is not int:
+        raise _Invalid("int_type", value)
+    return value
+
+
+def _check_float(value):
+    if type(value) is float:
+        return value
+    if type(value) is not int:
+        raise _Invalid("float_type", value)
+    return float(value)
+
+
+def _check_number(value):
+    if type(value) is not int and type(value) is not float:
+        raise _Invalid("float_type", value)
+    return value
+
+
+def _check_str(value):
+    if type(value) is not str:
+        raise _Invalid("string_type", value)
+    return value
+
+
+def _check_bool(value):
+    if type(value) is not bool:
+        raise _Invalid("bool_type", value)
+    return value
+
+
+def _enum_check(enums: Tuple[Type[IntEnum], ...]) -> Check:
+    values = [str(member.value) for enum in enums for member in enum]
+    allowed = frozenset(member.value for enum in enums for member in enum)
+    expected = " or ".join([", ".join(values[:-1]), values[-1]]) if len(values) > 1 else values[0]
+
+    def check(value):
+        if type(value) is not int or value not in allowed:
+            raise _Invalid("enum", value, {"expected": expected})
+        return value
+
+    return check
+
+
+def _optional_check(inner: Check) -> Check:
+    def check(value):
+        return None if value is None else inner(value)
+
+    return check
+
+
+def _list_check(inner: Check) -> Check:
+    def check(value):
+        if type(value) is not list:
+            raise _Invalid("list_type", value)
+        result = []
+        for index, item in enumerate(value):
+            try:
+                result.append(inner(item))
+            except _Invalid as e:
+                e.loc = (index, *e.loc)
+                raise
+        return result
+
+    return check
+
+
+def _nested_check(model_class: Type[BaseModel]) -> Check:
+    build = record_builder(model_class)
+
+    def check(value):
+        if type(value) is not dict:
+            raise _Invalid("model_type", value, {"class_name": model_class.__name__})
+        record, errors = build(value)
+        if errors:
+            # nested models report their first error, prefixed by the field location
+            error_type, loc, error_value, ctx = errors[0]
+            raise _Invalid(error_type, error_value, ctx, loc)
+        return record
+
+    return check
+
+
+def _after_check(inner: Check, function: Callable[[Any], Any]) -> Check:
+    # AfterValidator of an Annotated field, e.g. model.Position
+    def check(value):
+        try:
+            return function(inner(value))
+        except PydanticCustomError as e:
+            raise _Invalid(e.type, value, e.context) from None
+
+    return check
+
+
+_SCALAR_CHECKS: Dict[Any, Check] = {
+    int: _check_int,
+    float: _check_float,
+    str: _check_str,
+    bool: _check_bool,
+}
+
+
+def _check_for(annotation) -> Check:
+    if annotation in _SCALAR_CHECKS:
+        return _SCALAR_CHECKS[annotation]
+    if inspect.isclass(annotation) and issubclass(annotation, IntEnum):
+        return _enum_check((annotation,))
+    if inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+        return _nested_check(annotation)
+
+    origin, args = get_origin(annotation), get_args(annotation)
+    if origin in (list, List):
+        return _list_check(_check_for(args[0]))
+    if origin in (Union, types.UnionType):
+        if set(args) == {int, float}:
+            return _check_number
+        non_null = tuple(arg for arg in args if arg is not type(None))
+        if len(non_null) < len(args):
+            inner = non_null[0] if len(non_null) == 1 else Union[non_null]
+            return _optional_check(_check_for(inner))
+        if all(inspect.isclass(arg) and issubclass(arg, IntEnum) for arg in args):
+            return _enum_check(args)
+    raise TypeError(f"Unsupported annotation for the slots engine: {annotation!r}")
+
+
+@functools.lru_cache(maxsize=None)
+def record_type(model_class: Type[BaseModel]) -> Type[Record]:
+    """
+    The __slots__ record type mirroring model_class, e.g. SubjectRecord for Subject.
+    """
+    return type(
+        f"{model_class.__name__}Record",
+        (Record,),
+        {
+            "__slots__": tuple(model_class.model_fields),
+            "__module__": __name__,
+            "model_class": model_class,
+        },
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def record_builder(model_class: Type[BaseModel]):
+    """
+    Function turning a decoded JSON object into (record, errors) for model_class.
+
+    errors is a list of (error type, loc, input value, ctx); record is None when it is
+    not empty.
+    """
+    cls = record_type(model_class)
+    forbid_extra = model_class.model_config.get("extra") == "forbid"
+    # (JSON key, attribute name, check, default factory or None when required)
+    fields: List[Tuple[str, str, Check, Optional[Callable[[], Any]]]] = []
+    for name, info in model_class.model_fields.items():
+        if info.default_factory is not None:
+            default = info.default_factory
+        elif info.default is not PydanticUndefined:
+            default = functools.partial(lambda value: value, info.default)
+        else:
+            default = None
+        check = _check_for(info.annotation)
+        for validator in info.metadata:
+            if isinstance(validator, AfterValidator):
+                check = _after_check(check, validator.func)
+        fields.append((info.alias or name, name, check, default))
+    keys = frozenset(key for key, _, _, _ in fields)
+
+    def build(data: dict):
+        errors = []
+        record = object.__new__(cls)
+        for key, name, check, default in fields:
+            if key in data:
+                try:
+                    object.__setattr__(record, name, check(data[key]))
+                except _Invalid as e:
+                    errors.append((e.error_type, (key, *e.loc), e.value, e.ctx))
+            elif default is not None:
+                object.__setattr__(record, name, default())
+            else:
+                errors.append(("missing", (key,), data, None))
+        if forbid_extra and not keys.issuperset(data):
+            for key in data:
+                if key not in keys:
+                    errors.append(("extra_forbidden", (key,), data[key], None))
+        return (None, errors) if errors else (record, errors)
+
+    return build
+
+
+def _validation_error(model_class: Type[BaseModel], errors) -> ValidationError:
+    line_errors = []
+    for error_type, loc, value, ctx in errors:
+        line_error = {"type": error_type, "loc": loc, "input": value}
+        if ctx is not None:
+            line_error["ctx"] = ctx
+        line_errors.append(line_error)
+    return ValidationError.from_exception_data(model_class.__name__, line_errors)
+
+
+@functools.lru_cache(maxsize=None)
+def record_validator(model_class: Type[BaseModel]) -> Callable[[bytes], Record]:
+    """
+    Counterpart of model_class.model_validate_json for the slots engine.
+
+    Raises:
+        pydantic_core.ValidationError: with the same error types as the Pydantic path
+    """
+    build = record_builder(model_class)
+
+    def validate_json(line):
+        try:
+            data = from_json(line)
+        except ValueError as e:
+            raise _validation_error(
+                model_class, [("json_invalid", (), line, {"error": str(e)})]
+            ) from None
+        if type(data) is not dict:
+            raise _validation_error(
+                model_class,
+                [("model_type", (), data, {"class_name": model_class.__name__})],
+            )
+        record, errors = build(data)
+        if errors:
+            raise _validation_error(model_class, errors)
+        return record
+
+    return validate_json
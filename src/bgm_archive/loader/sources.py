@@ -0,0 +1,297 @@
+"""
+Archive sources: where WikiArchiveLoader reads its jsonlines members from.
+
+- ZipSource: the released zip archive, through one shared ZipFile handle
+- DirectorySource: extracted members in a directory, either plain (read through mmap),
+  gzip ("subject.jsonlines.gz") or zstd ("subject.jsonlines.zst", needs zstandard)
+- StreamSource: a single member streamed through a non-seekable file, e.g. stdin
+
+A source opens its underlying handle on first use and keeps it until close(); members
+opened from it are independent MemberFile readers, which may be consumed concurrently.
+"""
+
+import gzip
+import io
+import mmap
+import os
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterator, List, Optional, Sequence, Union
+
+# Per-member compressed file suffixes understood by DirectorySource, in lookup order.
+COMPRESSED_SUFFIXES = (".zst", ".gz")
+
+
+class MemberFile:
+    """
+    Binary reader over one archive member, closing every layer it was built from.
+    """
+
+    def __init__(
+        self,
+        reader,
+        closing: Sequence = (),
+        bytes_read: Optional[Callable[[], int]] = None,
+    ):
+        """
+        Args:
+            reader: Object with read() and readline() returning decompressed bytes
+            closing: Objects closed after reader, e.g. the compressed file under it
+            bytes_read: Function returning the bytes consumed from the underlying storage
+        """
+        self.__reader = reader
+        self.__closing = closing
+        self.__bytes_read = bytes_read
+        self.closed = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.__reader.readline, b"")
+
+    def read(self, size: int = -1) -> bytes:
+        return self.__reader.read(size)
+
+    def readline(self) -> bytes:
+        return self.__reader.readline()
+
+    def compressed_bytes_read(self) -> int:
+        """
+        Bytes consumed from the underlying storage so far (including read-ahead; zip
+        members report their share of the compressed size), 0 when it cannot be known,
+        e.g. for pipes.
+        """
+        return self.__bytes_read() if self.__bytes_read is not None else 0
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for layer in (self.__reader, *self.__closing):
+            layer.close()
+
+    def __enter__(self) -> "MemberFile":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ArchiveSource(ABC):
+    """
+    Base class of archive sources; subclasses implement open() and members().
+    """
+
+    path: str
+
+    @abstractmethod
+    def open(self, member: str) -> MemberFile:
+        """
+        Open a member for reading.
+
+        Raises:
+            KeyError: if the source has no such member
+        """
+
+    @abstractmethod
+    def members(self) -> List[str]:
+        """
+        Names of the members the source holds.
+        """
+
+    def size(self, member: str) -> Optional[int]:
+        """
+        Decompressed size of a member in bytes, None when unknown.
+        """
+        return None
+
+    def member_path(self, member: str) -> str:
+        """
+        Path of the file whose fingerprint changes when the member changes, used by
+        caches derived from the member.
+        """
+        return self.path
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "ArchiveSource":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _zip_bytes_read(file, info: zipfile.ZipInfo) -> int:
+    # zipfile has no public counter of compressed bytes consumed; scale the member's
+    # compress_size by the decompressed position, exact once the member is read through
+    if not info.file_size:
+        return info.compress_size
+    try:
+        position = file.tell()
+    except (OSError, ValueError):  # closed, or an unseekable archive
+        return 0
+    return min(info.compress_size * position // info.file_size, info.compress_size)
+
+
+class ZipSource(ArchiveSource):
+    """
+    Members of a zip archive, all read through a single ZipFile opened on first use.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        self.__zip: Optional[zipfile.ZipFile] = None
+
+    def _zip(self) -> zipfile.ZipFile:
+        if self.__zip is None:
+            self.__zip = zipfile.ZipFile(self.path, "r")
+        return self.__zip
+
+    def open(self, member: str) -> MemberFile:
+        info = self._zip().getinfo(member)
+        file = self._zip().open(info)
+        return MemberFile(file, bytes_read=lambda: _zip_bytes_read(file, info))
+
+    def members(self) -> List[str]:
+        return self._zip().namelist()
+
+    def size(self, member: str) -> Optional[int]:
+        try:
+            return self._zip().getinfo(member).file_size
+        except KeyError:
+            return None
+
+    def close(self):
+        if self.__zip is not None:
+            self.__zip.close()
+            self.__zip = None
+
+
+class DirectorySource(ArchiveSource):
+    """
+    Members stored as separate files in a directory.
+
+    For each member, the plain "<member>" is looked up first, then "<member>.zst" and
+    "<member>.gz". Plain members are memory-mapped (use_mmap=True), so lines are sliced straight from
+    the page cache without going through a read buffer.
+    """
+
+    def __init__(self, path: Union[str, Path], use_mmap: bool = True):
+        self.path = str(path)
+        self.__use_mmap = use_mmap
+
+    def _resolve(self, member: str) -> Path:
+        directory = Path(self.path)
+        for suffix in ("", *COMPRESSED_SUFFIXES):
+            candidate = directory / f"{member}{suffix}"
+            if candidate.is_file():
+                return candidate
+        raise KeyError(member)
+
+    def open(self, member: str) -> MemberFile:
+        path = self._resolve(member)
+        raw = open(path, "rb")
+        try:
+            if path.suffix == ".gz":
+                return MemberFile(gzip.GzipFile(fileobj=raw), (raw,), raw.tell)
+            if path.suffix == ".zst":
+                return MemberFile(_zstd_reader(raw), (raw,), raw.tell)
+            if self.__use_mmap and os.fstat(raw.fileno()).st_size:
+                mapped = mmap.mmap(raw.fileno(), 0, access=mmap.ACCESS_READ)
+                return MemberFile(mapped, (raw,), mapped.tell)
+            return MemberFile(raw, bytes_read=raw.tell)
+        except BaseException:
+            raw.close()
+            raise
+
+    def members(self) -> List[str]:
+        members = set()
+        for path in Path(self.path).iterdir():
+            name = path.name
+            for suffix in COMPRESSED_SUFFIXES:
+                name = name.removesuffix(suffix)
+            if name.endswith(".jsonlines"):
+                members.add(name)
+        return sorted(members)
+
+    def size(self, member: str) -> Optional[int]:
+        try:
+            path = self._resolve(member)
+        except KeyError:
+            return None
+        return path.stat().st_size if path.suffix not in COMPRESSED_SUFFIXES else None
+
+    def member_path(self, member: str) -> str:
+        return str(self._resolve(member))
+
+
+def _zstd_reader(raw: BinaryIO):
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("Reading .zst members requires the zstandard package") from e
+    return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=False))
+
+
+class StreamSource(ArchiveSource):
+    """
+    A single member read from a non-seekable binary stream, such as sys.stdin.buffer.
+
+    The stream can only be consumed once, and random access (get_subject() and other
+    offset-index lookups) is not available.
+    """
+
+    def __init__(self, stream: BinaryIO, member: str, close_stream: bool = False):
+        """
+        Args:
+            stream: Binary stream of jsonlines
+            member: Archive member the stream holds, e.g. "episode.jsonlines"
+            close_stream: Close the stream with the source (stdin is left open by default)
+        """
+        self.path = "-"
+        self.member = member
+        self.__stream = stream
+        self.__close_stream = close_stream
+        self.__consumed = False
+
+    def open(self, member: str) -> MemberFile:
+        if member != self.member:
+            raise KeyError(member)
+        if self.__consumed:
+            raise RuntimeError(f"The stream of {member} has already been read")
+        self.__consumed = True
+        # closing the member must not close the shared stream; close() does that
+        return MemberFile(_Unclosable(self.__stream))
+
+    def members(self) -> List[str]:
+        return [self.member]
+
+    def member_path(self, member: str) -> str:
+        raise ValueError("Stream sources have no file to fingerprint")
+
+    def close(self):
+        if self.__close_stream:
+            self.__stream.close()
+
+
+class _Unclosable:
+    def __init__(self, stream: BinaryIO):
+        self.read = stream.read
+        self.readline = stream.readline
+
+    def close(self):
+        pass
+
+
+def open_source(archive: Union[str, Path, ArchiveSource]) -> ArchiveSource:
+    """
+    The source for a path: DirectorySource for directories, ZipSource otherwise.
+    ArchiveSource instances are returned as they are.
+    """
+    if isinstance(archive, ArchiveSource):
+        return archive
+    if str(archive) == "-":
+        raise ValueError("Reading stdin needs the member name, use StreamSource instead")
+    if os.path.isdir(archive):
+        return DirectorySource(archive)
+    return ZipSource(archive)
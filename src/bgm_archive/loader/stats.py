@@ -0,0 +1,57 @@
+"""
+Per-member counters collected by WikiArchiveLoader while reading an archive.
+"""
+
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Dict
+
+
+@dataclass
+class MemberStats:
+    """
+    Metrics of one archive member, accumulated over every pass that read it.
+
+    Counters are always collected. The per-stage *_seconds are only measured when the
+    loader is created with timings=True, since they cost a few clock reads per line:
+
+    - read_seconds: zip inflation and line splitting
+    - decode_seconds: UTF-8 decoding
+    - validate_seconds: JSON parsing and model validation, which Pydantic does in one call
+
+    cached_passes counts the passes served from a record cache, which read no archive bytes.
+
+    filtered counts the lines a where filter dropped; prefiltered the part of them that was
+    ruled out from the raw bytes, without validation.
+
+    wall_seconds is the time from opening the member until its last line was consumed,
+    including the time spent by the consumer of the loader.
+    """
+
+    member: str
+    passes: int = 0
+    cached_passes: int = 0
+    compressed_bytes: int = 0
+    decompressed_bytes: int = 0
+    lines: int = 0
+    blank_lines: int = 0
+    valid: int = 0
+    errors: int = 0
+    filtered: int = 0
+    prefiltered: int = 0
+    read_seconds: float = 0.0
+    decode_seconds: float = 0.0
+    validate_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    def merge(self, other: "MemberStats"):
+        """
+        Add the counters of other, e.g. stats of the same member from a worker process.
+        """
+        for field in fields(self):
+            if field.name != "member":
+                setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result["lines_per_sec"] = self.lines / self.wall_seconds if self.wall_seconds else None
+        return result
@@ -0,0 +1,197 @@
+"""
+Synthetic archives at real dump sizes, scaled up from the fixtures in __test_data.
+
+Every generated line is a fixture record picked at random, so field distributions (types,
+enum values, text lengths, tags, score details) follow the fixtures, with ids rewritten:
+entity members get sequential ids, and foreign keys (subject_id, person_id, ...) point to
+random ids of the generated entity members, so joins and lookups behave like on a dump.
+"""
+
+import json
+import logging
+import random
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .wiki_archive_loader import WikiArchiveLoader
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).parent / "__test_data"
+
+# Rows per member at scale=1.0, roughly the proportions of a recent Bangumi dump.
+DEFAULT_ROWS: Dict[str, int] = {
+    "subject.jsonlines": 500_000,
+    "person.jsonlines": 100_000,
+    "character.jsonlines": 150_000,
+    "episode.jsonlines": 1_500_000,
+    "subject-relations.jsonlines": 800_000,
+    "subject-persons.jsonlines": 1_500_000,
+    "subject-characters.jsonlines": 600_000,
+    "person-characters.jsonlines": 700_000,
+}
+
+# foreign key field -> entity member whose ids it refers to
+FOREIGN_KEYS: Dict[str, Dict[str, str]] = {
+    "episode.jsonlines": {"subject_id": "subject.jsonlines"},
+    "subject-relations.jsonlines": {
+        "subject_id": "subject.jsonlines",
+        "related_subject_id": "subject.jsonlines",
+    },
+    "subject-persons.jsonlines": {
+        "subject_id": "subject.jsonlines",
+        "person_id": "person.jsonlines",
+    },
+    "subject-characters.jsonlines": {
+        "subject_id": "subject.jsonlines",
+        "character_id": "character.jsonlines",
+    },
+    "person-characters.jsonlines": {
+        "person_id": "person.jsonlines",
+        "subject_id": "subject.jsonlines",
+        "character_id": "character.jsonlines",
+    },
+}
+
+ENTITY_MEMBERS = [
+    "subject.jsonlines",
+    "person.jsonlines",
+    "character.jsonlines",
+    "episode.jsonlines",
+]
+
+
+def load_templates(filename: str, templates_dir: Path = TEMPLATES_DIR) -> List[dict]:
+    """
+    The valid records of a fixture member, parsed as dicts.
+
+    Fixture files may carry a doubled ".jsonlines.jsonlines" suffix; both names are tried.
+    """
+    model_class = WikiArchiveLoader.FILE_MODEL_MAP[filename]
+    for path in (templates_dir / filename, templates_dir / f"{filename}.jsonlines"):
+        if path.exists():
+            break
+    else:
+        raise FileNotFoundError(f"No template file for {filename} in {templates_dir}")
+
+    templates = []
+    with open(path, "rb") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                model_class.model_validate_json(line)
+            except ValidationError:
+                continue
+            templates.append(json.loads(line))
+    if not templates:
+        raise ValueError(f"No valid template records in {path}")
+    return templates
+
+
+def resolve_rows(rows: Optional[Dict[str, int]] = None, scale: float = 1.0) -> Dict[str, int]:
+    """
+    Rows per member: DEFAULT_ROWS times scale, overridden by explicit counts in rows.
+
+    Raises:
+        ValueError: for unknown members, and when a member with rows refers to the ids
+            of an empty entity member
+    """
+    resolved = {filename: max(int(count * scale), 1) for filename, count in DEFAULT_ROWS.items()}
+    for filename, count in (rows or {}).items():
+        if filename not in resolved:
+            raise ValueError(f"Unknown archive member: {filename}")
+        resolved[filename] = count
+    for filename, foreign_keys in FOREIGN_KEYS.items():
+        if not resolved[filename]:
+            continue
+        for member in foreign_keys.values():
+            if resolved[member] < 1:
+                raise ValueError(f"{filename} refers to {member}, which needs at least 1 row")
+    return resolved
+
+
+def _write_member(
+    archive: zipfile.ZipFile,
+    filename: str,
+    count: int,
+    templates: List[dict],
+    id_ranges: Dict[str, int],
+    rng: random.Random,
+    invalid_rate: float,
+) -> int:
+    """
+    Write count synthetic lines of one member.
+
+    Returns:
+        Number of lines made invalid on purpose
+    """
+    foreign_keys = [
+        (field, id_ranges[member]) for field, member in FOREIGN_KEYS.get(filename, {}).items()
+    ]
+    # a non-numeric string in an int field is rejected by the loader (int_parsing)
+    invalid_field = "id" if filename in ENTITY_MEMBERS else foreign_keys[0][0]
+    invalid = 0
+    with archive.open(filename, "w", force_zip64=True) as raw:
+        buffer = []
+        for index in range(count):
+            record = dict(rng.choice(templates))
+            if filename in ENTITY_MEMBERS:
+                record["id"] = index + 1
+            for field, max_id in foreign_keys:
+                record[field] = rng.randint(1, max_id)
+            if invalid_rate and rng.random() < invalid_rate:
+                record[invalid_field] = f"invalid-{record[invalid_field]}"
+                invalid += 1
+            buffer.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            if len(buffer) >= 10_000:
+                raw.write(("\n".join(buffer) + "\n").encode("utf-8"))
+                buffer = []
+        if buffer:
+            raw.write(("\n".join(buffer) + "\n").encode("utf-8"))
+    return invalid
+
+
+def generate_archive(
+    out_path: str,
+    rows: Optional[Dict[str, int]] = None,
+    scale: float = 1.0,
+    seed: int = 0,
+    invalid_rate: float = 0.0,
+    compresslevel: int = 6,
+    templates_dir: Path = TEMPLATES_DIR,
+) -> Dict[str, int]:
+    """
+    Write a synthetic archive with the members of FILE_MODEL_MAP.
+
+    The output only depends on the arguments, so the same seed reproduces the same archive.
+
+    Args:
+        out_path: Path of the zip archive to write
+        rows: Explicit row counts per member, overriding the scaled defaults
+        scale: Multiplier applied to DEFAULT_ROWS
+        seed: Seed of the random generator
+        invalid_rate: Fraction of lines made invalid, to exercise the error path
+        compresslevel: Deflate level of the members
+        templates_dir: Directory of the fixture files records are copied from
+
+    Returns:
+        Dictionary mapping member names to row counts
+    """
+    if not 0 <= invalid_rate <= 1:
+        raise ValueError(f"invalid_rate must be between 0 and 1, got {invalid_rate}")
+    counts = resolve_rows(rows, scale)
+    rng = random.Random(seed)
+    with zipfile.ZipFile(
+        out_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=compresslevel
+    ) as archive:
+        for filename in WikiArchiveLoader.FILE_MODEL_MAP:
+            templates = load_templates(filename, templates_dir)
+            invalid = _write_member(
+                archive, filename, counts[filename], templates, counts, rng, invalid_rate
+            )
+            logger.info(f"Wrote {counts[filename]} lines of {filename} ({invalid} invalid)")
+    return counts
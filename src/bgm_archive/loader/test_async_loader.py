@@ -0,0 +1,71 @@
+import asyncio
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from bgm_archive.loader.async_loader import AsyncWikiArchiveLoader
+from bgm_archive.loader.model import Episode, SubjectRelation
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+async def _collect(entries):
+    return [entry async for entry in entries]
+
+
+def test_async_matches_sync(wiki_archive_path):
+    expected = list(WikiArchiveLoader(str(wiki_archive_path)).subjects())
+
+    async def main():
+        async with AsyncWikiArchiveLoader(str(wiki_archive_path), batch_size=3) as loader:
+            return await _collect(loader.subjects())
+
+    assert asyncio.run(main()) == expected
+
+
+def test_gather_members(wiki_archive_path):
+    async def main():
+        async with AsyncWikiArchiveLoader(
+            str(wiki_archive_path), stop_on_error=False, batch_size=2, max_batches=1
+        ) as loader:
+            results = await asyncio.gather(
+                _collect(loader.subjects()),
+                _collect(loader.episodes()),
+                _collect(loader.subject_relations()),
+                _collect(loader.person_characters()),
+            )
+            return [len(result) for result in results], loader.get_validation_errors()
+
+    counts, errors = asyncio.run(main())
+    assert counts == [20, 20, 19, 20]
+    assert len(errors[SubjectRelation]) == 1
+
+
+def test_stop_on_error_raises_in_consumer(wiki_archive_path):
+    async def main():
+        async with AsyncWikiArchiveLoader(str(wiki_archive_path)) as loader:
+            await _collect(loader.subject_relations())
+
+    with pytest.raises(ValidationError):
+        asyncio.run(main())
+
+
+def test_backpressure_and_early_close(wiki_archive_path):
+    async def main():
+        async with AsyncWikiArchiveLoader(
+            str(wiki_archive_path), batch_size=1, max_batches=1
+        ) as loader:
+            batches = loader.iter_batches(Episode)
+            first = await batches.__anext__()
+            # let the producer run ahead as far as the queue allows
+            await asyncio.sleep(0.05)
+            produced = loader.stats()["episode.jsonlines"].valid
+            await batches.aclose()
+            return first, produced, loader.stats()["episode.jsonlines"]
+
+    first, produced, stats = asyncio.run(main())
+    assert len(first) == 1
+    # one batch consumed, one queued, one validated and waiting to be queued
+    assert produced <= 3
+    assert stats.passes == 1 and stats.lines < 20
+    assert not [t for t in threading.enumerate() if t.name.startswith("archive-producer")]
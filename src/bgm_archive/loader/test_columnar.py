@@ -0,0 +1,54 @@
+import os
+import shutil
+
+import numpy as np
+
+from bgm_archive.loader.columnar import ColumnarCache
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def test_columns_match_models(wiki_archive_path, tmp_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+    cache = loader.columnar_cache(str(tmp_path / "cache"))
+    subjects = list(loader.subjects())
+
+    columns = cache.subjects
+    assert len(columns) == len(subjects) == 20
+    assert columns["id"].dtype == np.int32
+    assert isinstance(columns["id"], np.memmap)
+    assert columns["id"].tolist() == [s.id for s in subjects]
+    assert columns["type"].tolist() == [s.type for s in subjects]
+    assert columns["nsfw"].tolist() == [s.nsfw for s in subjects]
+    np.testing.assert_allclose(columns["score"], [s.score for s in subjects], rtol=1e-6)
+    assert columns["favorite_done"].tolist() == [s.favorite.done for s in subjects]
+    assert columns["score_10"].tolist() == [
+        s.score_details.score_10 if s.score_details else 0 for s in subjects
+    ]
+    assert list(columns["name_cn"]) == [s.name_cn for s in subjects]
+    assert columns["name"][-1] == subjects[-1].name
+
+    persons = list(loader.persons())
+    assert cache.persons["collects"].tolist() == [p.collects for p in persons]
+    assert list(cache.characters["name"]) == [c.name for c in loader.characters()]
+
+
+def test_staleness(wiki_archive_path, tmp_path):
+    archive = tmp_path / "archive.zip"
+    shutil.copy(wiki_archive_path, archive)
+    cache_dir = str(tmp_path / "cache")
+
+    assert ColumnarCache.is_stale(cache_dir, str(archive))
+    ColumnarCache.build(str(archive), cache_dir)
+    assert not ColumnarCache.is_stale(cache_dir, str(archive))
+
+    # touched archive: stale without a recorded hash, fresh with one
+    stat = os.stat(archive)
+    os.utime(archive, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert ColumnarCache.is_stale(cache_dir, str(archive))
+    ColumnarCache.build(str(archive), cache_dir, with_hash=True)
+    os.utime(archive, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert not ColumnarCache.is_stale(cache_dir, str(archive))
+
+    with open(archive, "ab") as file:
+        file.write(b"\0")
+    assert ColumnarCache.is_stale(cache_dir, str(archive))
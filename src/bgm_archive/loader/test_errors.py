@@ -0,0 +1,79 @@
+import io
+import json
+import pickle
+
+from pydantic import ValidationError
+
+from bgm_archive.loader.errors import MISSING, OTHER_VALUES, ErrorSink, field_key
+from bgm_archive.loader.model import Subject, SubjectRelation
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def _relation_error(relation_type) -> ValidationError:
+    line = {"subject_id": 1, "relation_type": relation_type, "related_subject_id": 2, "order": 0}
+    try:
+        SubjectRelation.model_validate_json(json.dumps(line))
+    except ValidationError as e:
+        return e
+    raise AssertionError("expected a ValidationError")
+
+
+def test_histograms_and_bounded_sample():
+    sink = ErrorSink(sample_size=5, max_values=3)
+    for index in range(1000):
+        sink.add(SubjectRelation, _relation_error(5000 + index % 4))
+
+    assert sink.model_counts[SubjectRelation] == 1000
+    assert sink.field_counts[SubjectRelation] == {"relation_type": 1000}
+    assert sink.value_counts[SubjectRelation, "relation_type"] == {
+        5000: 250,
+        5001: 250,
+        5002: 250,
+        OTHER_VALUES: 250,
+    }
+    assert len(sink.samples()[SubjectRelation]) == 5
+
+
+def test_field_and_value_keys():
+    sink = ErrorSink()
+    try:
+        Subject.model_validate({"id": 1, "tags": [{"name": "a", "count": "x"}]})
+    except ValidationError as e:
+        sink.add(Subject, e)
+
+    fields = sink.field_counts[Subject]
+    assert fields["tags.*.count"] == 1
+    assert sink.value_counts[Subject, "name"] == {MISSING: 1}
+    assert field_key(("tags", 3, "name")) == "tags.*.name"
+
+
+def test_stream_and_merge():
+    stream = io.StringIO()
+    first = ErrorSink(stream=stream)
+    first.add(SubjectRelation, _relation_error(4018), "subject-relations.jsonlines", 3)
+    second = pickle.loads(pickle.dumps(first))
+    assert second.stream is None
+
+    first.merge(second)
+
+    assert json.loads(stream.getvalue()) == {
+        "member": "subject-relations.jsonlines",
+        "line": 3,
+        "model": "SubjectRelation",
+        "errors": [{"loc": ["relation_type"], "type": "enum", "input": 4018}],
+    }
+    assert first.summary()["SubjectRelation"] == {
+        "errors": 2,
+        "fields": {"relation_type": {"errors": 2, "values": [[4018, 2]]}},
+    }
+    assert len(first.samples()[SubjectRelation]) == 2
+
+
+def test_loader_uses_sink(wiki_archive_path):
+    sink = ErrorSink(sample_size=0)
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, error_sink=sink)
+    list(loader.subject_relations())
+
+    assert loader.get_error_sink() is sink
+    assert sink.total() == 1
+    assert loader.get_validation_errors() == {SubjectRelation: []}
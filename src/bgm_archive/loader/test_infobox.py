@@ -0,0 +1,55 @@
+from bgm_archive.loader.infobox import InfoboxItem, parse_infobox
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+SAMPLE = (
+    "{{Infobox animanga/Novel\r\n"
+    "|中文名= 第一次的亲密接触\r\n"
+    "|别名={\r\n[L.L.]\r\n[英文名|Lelouch Lamperouge]\r\n[纯假名|]\r\n}\r\n"
+    "|简介= first line\r\nsecond line\r\n"
+    "|平台={[PC][PS4|2019]}\r\n"
+    "|发售日= 1998-09-25\r\n"
+    "|ISBN= \r\n"
+    "|ISBN-10= 9577086705\r\n"
+    "}}"
+)
+
+
+def test_parse_infobox():
+    infobox = parse_infobox(SAMPLE)
+
+    assert infobox.template == "animanga/Novel"
+    assert list(infobox) == ["中文名", "别名", "简介", "平台", "发售日", "ISBN", "ISBN-10"]
+    assert infobox["中文名"] == "第一次的亲密接触"
+    assert infobox["别名"] == [
+        InfoboxItem("", "L.L."),
+        InfoboxItem("英文名", "Lelouch Lamperouge"),
+        InfoboxItem("纯假名", ""),
+    ]
+    assert infobox["简介"] == "first line\nsecond line"
+    assert infobox["平台"] == [InfoboxItem("", "PC"), InfoboxItem("PS4", "2019")]
+    assert infobox.text("平台") == "PC, 2019"
+    assert infobox.aliases == ["L.L.", "Lelouch Lamperouge"]
+    assert infobox.isbn == "9577086705"
+    assert infobox.release_date == "1998-09-25"
+    assert infobox.get("missing") is None
+
+
+def test_parse_infobox_degenerate():
+    assert parse_infobox("").fields == {}
+    assert parse_infobox("{{Infobox Crt\n|别名={\n}\n}}").aliases == []
+    assert parse_infobox("{{Infobox Crt\n|别名= X\n}}").aliases == ["X"]
+
+
+def test_models_parse_lazily(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+    subject = next(loader.subjects())
+
+    assert "parsed_infobox" not in subject.__dict__
+    assert subject.parsed_infobox.isbn == "9789577086709"
+    assert subject.parsed_infobox is subject.parsed_infobox
+    assert "parsed_infobox" not in subject.model_dump()
+
+    character = next(loader.characters())
+    assert "Lelouch Lamperouge" in character.parsed_infobox.aliases
+    person = next(loader.persons())
+    assert person.parsed_infobox.release_date == "1980年1月21日"
@@ -1,43 +1,20 @@
 #!/usr/bin/env python3
 """
-Test script for the ArchiveLoader class.
+Tests for the WikiArchiveLoader class.
 
-This script tests the ArchiveLoader with the test_archive.zip file.
+These tests run the loader against an archive zipped from the fixtures in __test_data.
 """
 
-import logging
-import os
-import sys
-from pathlib import Path
+import pytest
+from pydantic import ValidationError
 
-from bgm_mond.loader.wiki_archive_loader import ArchiveLoader
+from bgm_archive.loader.model import Episode, SubjectRelation
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
 
 
-def setup_logging():
-    """Set up logging configuration."""
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[logging.StreamHandler(sys.stdout)],
-    )
-
+def test_loader(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
 
-def main():
-    """Main function."""
-    setup_logging()
-    logger = logging.getLogger(__name__)
-    
-    # Get the path to the test archive
-    current_dir = Path(__file__).parent
-    test_archive_path = current_dir / "__test_data" / "test_archive.zip"
-    
-    if not test_archive_path.exists():
-        logger.error(f"Test archive not found at {test_archive_path}")
-        return
-    
-    logger.info(f"Loading data from {test_archive_path}")
-    loader = ArchiveLoader(str(test_archive_path))
-    
     # Test loading each type of data
     test_methods = [
         ("subjects", loader.subjects),
@@ -48,3 +25,113 @@ def main():
         ("subject_persons", loader.subject_persons),
         ("subject_characters", loader.subject_characters),
         ("person_characters", loader.person_characters),
+    ]
+    counts = {name: sum(1 for _ in method()) for name, method in test_methods}
+
+    assert counts == {
+        "subjects": 20,
+        "persons": 20,
+        "characters": 20,
+        "episodes": 20,
+        # one fixture line carries relation_type=4018, which RelationType does not know
+        "subject_relations": 19,
+        "subject_persons": 20,
+        "subject_characters": 20,
+        "person_characters": 20,
+    }
+
+    errors = loader.get_validation_errors()
+    assert list(errors) == [SubjectRelation]
+    assert len(errors[SubjectRelation]) == 1
+
+
+def test_loader_stop_on_error(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+
+    with pytest.raises(ValidationError):
+        list(loader.subject_relations())
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, 1000])
+def test_iter_batches_matches_per_line(wiki_archive_path, batch_size):
+    for model_class in WikiArchiveLoader.FILE_MODEL_MAP.values():
+        per_line_loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+        batch_loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+        filename = batch_loader._filename_for(model_class)
+
+        expected = list(per_line_loader._load_entries(filename, model_class))
+        batches = list(batch_loader.iter_batches(model_class, batch_size))
+
+        assert all(0 < len(batch) <= batch_size for batch in batches)
+        assert [entry for batch in batches for entry in batch] == expected
+        assert {
+            k: [e.errors() for e in v] for k, v in batch_loader.get_validation_errors().items()
+        } == {
+            k: [e.errors() for e in v]
+            for k, v in per_line_loader.get_validation_errors().items()
+        }
+
+
+def test_iter_batches_stop_on_error(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+
+    with pytest.raises(ValidationError):
+        list(loader.iter_batches(SubjectRelation, 5))
+
+
+def test_member_api(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+
+    assert sorted(loader.members()) == sorted(WikiArchiveLoader.FILE_MODEL_MAP)
+    assert list(loader.iter_member("episode.jsonlines")) == list(loader.episodes())
+    relations = loader.iter_member("subject-relations.jsonlines", where={"subject_id": 4})
+    assert [r.related_subject_id for r in relations] == [9944, 9950]
+    with pytest.raises(ValueError):
+        next(loader.iter_member("unknown.jsonlines"))
+
+    # callers parsing raw lines report their errors like the iterators do
+    lines = list(loader.iter_raw_lines("subject-relations.jsonlines"))
+    assert len(lines) == 20 and lines[0][0] == 0
+    for line_number, line in lines:
+        try:
+            SubjectRelation.model_validate_json(line)
+        except ValidationError as e:
+            loader.record_error(SubjectRelation, e, line_number)
+    assert loader.get_error_sink().total() == 1
+    assert loader.stats()["subject-relations.jsonlines"].errors == 1
+
+    strict = WikiArchiveLoader(str(wiki_archive_path))
+    error = next(iter(loader.get_validation_errors().values()))[0]
+    with pytest.raises(ValidationError):
+        strict.record_error(SubjectRelation, error)
+
+
+def test_stats(wiki_archive_path):
+    observed = []
+    loader = WikiArchiveLoader(
+        str(wiki_archive_path), stop_on_error=False, timings=True, observer=observed.append
+    )
+
+    list(loader.subject_relations())
+    list(loader.iter_batches(Episode, batch_size=7))
+
+    stats = loader.stats()
+    relations = stats["subject-relations.jsonlines"]
+    assert (relations.passes, relations.lines, relations.valid, relations.errors) == (1, 20, 19, 1)
+    assert relations.decompressed_bytes > relations.compressed_bytes > 0
+    assert relations.validate_seconds > 0 and relations.read_seconds > 0
+    assert stats["episode.jsonlines"].valid == 20
+    assert [s.member for s in observed] == ["subject-relations.jsonlines", "episode.jsonlines"]
+
+
+def test_stats_observer_on_early_close(wiki_archive_path):
+    observed = []
+    loader = WikiArchiveLoader(str(wiki_archive_path), observer=observed.append)
+
+    subjects = loader.subjects()
+    next(subjects)
+    subjects.close()
+
+    assert len(observed) == 1
+    assert observed[0].lines == 1
+    assert observed[0].read_seconds == 0.0  # timings are off by default
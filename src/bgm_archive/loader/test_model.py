@@ -0,0 +1,43 @@
+import pytest
+from pydantic import ValidationError
+
+from bgm_archive.loader.model import (
+    POSITIONS,
+    STAFF_POSITIONS,
+    SubjectPerson,
+    SubjectPersonType,
+    SubjectType,
+    resolve_position,
+)
+
+
+def test_positions_cover_every_staff_enum():
+    assert len(POSITIONS) == sum(len(enum) for enum in STAFF_POSITIONS.values())
+    for category, enum in STAFF_POSITIONS.items():
+        for role in enum:
+            assert POSITIONS[role.value].category is category
+            assert POSITIONS[role.value].role is role
+
+
+def test_resolve_position():
+    position = resolve_position(2001)
+    assert position.category is SubjectType.BOOK
+    assert position.role is SubjectPersonType.BookStaff.AUTHOR
+    assert resolve_position(74, SubjectType.ANIME).role is SubjectPersonType.AnimeStuff.CHIEF_DIRECTOR
+
+    with pytest.raises(ValueError, match="of GAME subjects"):
+        resolve_position(74, SubjectType.GAME)
+    with pytest.raises(ValueError):
+        resolve_position(12)
+
+
+def test_subject_person_position():
+    person = SubjectPerson(person_id=1, subject_id=2, position=4016)
+    assert person.position == 4016
+    assert type(person.position) is int
+    assert person.staff_position().role is SubjectPersonType.RealStaff.ACTOR
+
+    with pytest.raises(ValidationError) as e:
+        SubjectPerson(person_id=1, subject_id=2, position=12)
+    # one error for the field, not one per staff enum
+    assert [(error["type"], error["loc"]) for error in e.value.errors()] == [("enum", ("position",))]
@@ -0,0 +1,68 @@
+import os
+import shutil
+
+import pytest
+
+from bgm_archive.loader.offset_index import extract_id
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def test_get_by_id_matches_scan(wiki_archive_path, tmp_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path), index_dir=str(tmp_path / "index"))
+
+    for scan, get in [
+        (loader.subjects, loader.get_subject),
+        (loader.persons, loader.get_person),
+        (loader.characters, loader.get_character),
+        (loader.episodes, loader.get_episode),
+    ]:
+        entries = list(scan())
+        for entry in reversed(entries):
+            assert get(entry.id) == entry
+        assert get(max(entry.id for entry in entries) + 1) is None
+        assert get(-1) is None
+
+    assert sorted(os.listdir(tmp_path / "index")) == sorted(
+        ["manifest.json"]
+        + [
+            name
+            for member in [
+                "subject.jsonlines",
+                "person.jsonlines",
+                "character.jsonlines",
+                "episode.jsonlines",
+            ]
+            for name in (member, f"{member}.idx.npy")
+        ]
+    )
+
+
+def test_index_rebuilt_when_archive_changes(wiki_archive_path, tmp_path):
+    archive = tmp_path / "archive.zip"
+    shutil.copy(wiki_archive_path, archive)
+    index_dir = str(tmp_path / "index")
+
+    assert WikiArchiveLoader(str(archive), index_dir=index_dir).get_subject(1).id == 1
+    data_path = tmp_path / "index" / "subject.jsonlines"
+    built_at = os.stat(data_path).st_mtime_ns
+
+    # a fresh index is reused
+    assert WikiArchiveLoader(str(archive), index_dir=index_dir).get_subject(1).id == 1
+    assert os.stat(data_path).st_mtime_ns == built_at
+
+    stat = os.stat(archive)
+    os.utime(archive, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert WikiArchiveLoader(str(archive), index_dir=index_dir).get_subject(1).id == 1
+    assert os.stat(data_path).st_mtime_ns != built_at
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        (b'{"id":12,"name":"x"}', 12),
+        (b'{"name":"\\"id\\":3","id": 7}', 7),
+        (b'{"subject_id":5,"id":9}', 9),
+    ],
+)
+def test_extract_id(line, expected):
+    assert extract_id(line) == expected
@@ -0,0 +1,105 @@
+import pytest
+
+from bgm_archive.loader.model import Episode, Subject, SubjectRelation, SubjectType
+from bgm_archive.loader.predicates import LineFilter
+from bgm_archive.loader.raw_loader import RawWikiArchiveLoader
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def test_prefilter_rules_out_raw_lines():
+    line_filter = LineFilter(Subject, {"type": SubjectType.ANIME, "nsfw": False})
+
+    assert line_filter.fields == ("type", "nsfw")
+    assert line_filter.prefilter(b'{"id":1,"type":2,"nsfw":false}')
+    assert line_filter.prefilter(b'{"id":1, "type" : 2, "nsfw": false}')
+    assert not line_filter.prefilter(b'{"id":1,"type":1,"nsfw":false}')
+    assert not line_filter.prefilter(b'{"id":1,"type":2,"nsfw":true}')
+    # unsure: missing keys, values that do not validate, escaped keys inside strings
+    assert line_filter.prefilter(b'{"id":1,"nsfw":false}')
+    assert line_filter.prefilter(b'{"id":1,"type":"x","nsfw":false}')
+    assert not line_filter.prefilter(b'{"summary":"\\"type\\":2","type":1,"nsfw":false}')
+
+    ids = LineFilter(Episode, {"subject_id": [8, 12]})
+    assert ids.prefilter(b'{"id":1,"subject_id":12}')
+    assert not ids.prefilter(b'{"id":12,"subject_id":1}')
+
+
+def test_line_filter_rejects_bad_conditions():
+    with pytest.raises(ValueError, match="no fields"):
+        LineFilter(Subject, {"kind": 2})
+    with pytest.raises(ValueError, match="Invalid value"):
+        LineFilter(Subject, {"type": 5})
+    with pytest.raises(ValueError):
+        LineFilter(Subject, {})
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "slots"])
+def test_filtered_entries_match_filtered_full_pass(wiki_archive_path, engine):
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, engine=engine)
+    subjects = list(loader.subjects())
+    subject_ids = {subject.id for subject in subjects[::3]}
+
+    anime = list(loader.subjects(where={"type": 2, "nsfw": False}))
+    assert anime == [s for s in subjects if s.type == SubjectType.ANIME and not s.nsfw]
+
+    episodes = list(loader.episodes())
+    wanted = {episode.subject_id for episode in episodes[:5]}
+    filtered = list(loader.episodes(where={"subject_id": wanted}))
+    assert filtered == [e for e in episodes if e.subject_id in wanted]
+
+    stats = loader.stats()["episode.jsonlines"]
+    assert stats.filtered == len(episodes) - len(filtered)
+    assert stats.prefiltered == stats.filtered
+
+    projected = list(loader.subjects(fields=["name"], where={"id": subject_ids}))
+    assert [(s.id, s.name) for s in projected] == [
+        (s.id, s.name) for s in subjects if s.id in subject_ids
+    ]
+
+    batches = list(loader.iter_batches(Episode, batch_size=4, where={"subject_id": wanted}))
+    assert [entry for batch in batches for entry in batch] == filtered
+
+
+def test_prefiltered_lines_are_not_validated(wiki_archive_path):
+    # the fixture's invalid relation is {"subject_id":6,"relation_type":4018,...}
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+    relations = list(loader.subject_relations(where={"subject_id": 1}))
+    assert [relation.subject_id for relation in relations] == [1]
+    assert loader.stats()["subject-relations.jsonlines"].errors == 0
+    assert not loader.get_validation_errors().get(SubjectRelation)
+
+    # a filtered value that does not validate is kept, so the error is still reported
+    relations = list(loader.subject_relations(where={"relation_type": 1}))
+    assert relations and all(relation.relation_type == 1 for relation in relations)
+    assert loader.stats()["subject-relations.jsonlines"].errors == 1
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "slots"])
+def test_filters_apply_to_cached_passes(wiki_archive_path, tmp_path, engine):
+    cache_dir = str(tmp_path / "cache")
+
+    def load(**kwargs):
+        loader = WikiArchiveLoader(
+            str(wiki_archive_path), stop_on_error=False, engine=engine, record_cache_dir=cache_dir
+        )
+        return list(loader.subject_relations(**kwargs)), loader.stats()[
+            "subject-relations.jsonlines"
+        ]
+
+    uncached, stats = load(where={"relation_type": [1, 4002]})
+    assert stats.cached_passes == 0
+    assert not list((tmp_path / "cache").glob("*/*.json"))
+
+    load()
+    cached, stats = load(where={"relation_type": [1, 4002]})
+    assert stats.cached_passes == 1
+    assert cached == uncached
+    assert (stats.filtered, stats.errors) == (20 - len(cached) - 1, 1)
+
+
+def test_raw_loader_filters_raw_records(wiki_archive_path):
+    loader = RawWikiArchiveLoader(str(wiki_archive_path), record_type="tuple")
+    wanted = {1, 8}
+    relations = list(loader.subject_relations(where={"subject_id": wanted}))
+    assert relations == [r for r in loader.subject_relations() if r.subject_id in wanted]
+    assert loader.stats()["subject-relations.jsonlines"].prefiltered == 20 - len(relations)
@@ -0,0 +1,88 @@
+import pytest
+from pydantic import ValidationError
+
+from bgm_archive.loader.model import Episode, Subject, SubjectRelation
+from bgm_archive.loader.projection import partial_model, source_model
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def test_partial_model_keeps_requested_fields():
+    SubjectFields = partial_model(Subject, ["type", "id", "name"])
+
+    assert list(SubjectFields.model_fields) == ["id", "type", "name"]
+    assert partial_model(Subject, ("name", "id", "type")) is SubjectFields
+    assert partial_model(Subject, list(Subject.model_fields)) is Subject
+    assert source_model(SubjectFields) is Subject
+    assert source_model(Subject) is Subject
+    assert SubjectFields.model_fields["type"].annotation == Subject.model_fields["type"].annotation
+
+
+def test_partial_model_rejects_unknown_fields():
+    with pytest.raises(ValueError, match="no fields"):
+        partial_model(Subject, ["id", "title"])
+    with pytest.raises(ValueError):
+        partial_model(Subject, [])
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "slots"])
+def test_projected_entries_match_full_models(wiki_archive_path, engine):
+    loader = WikiArchiveLoader(str(wiki_archive_path), engine=engine)
+    fields = ["id", "subject_id", "sort"]
+
+    projected = list(loader.episodes(fields=fields))
+    full = list(loader.episodes())
+
+    assert len(projected) == len(full) == 20
+    for entry, model in zip(projected, full):
+        assert [getattr(entry, n) for n in fields] == [getattr(model, n) for n in fields]
+        assert not hasattr(entry, "airdate")
+
+    batches = list(loader.iter_batches(Episode, batch_size=8, fields=fields))
+    assert [entry for batch in batches for entry in batch] == projected
+
+
+def test_projection_skips_errors_of_unrequested_fields(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path))
+    # the fixture's invalid relation only has a bad relation_type
+    assert len(list(loader.subject_relations(fields=["subject_id", "related_subject_id"]))) == 20
+
+    loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+    assert len(list(loader.subject_relations(fields=["subject_id", "relation_type"]))) == 19
+    assert loader.stats()["subject-relations.jsonlines"].errors == 1
+    assert len(loader.get_validation_errors()[SubjectRelation]) == 1
+
+    with pytest.raises(ValidationError):
+        list(WikiArchiveLoader(str(wiki_archive_path)).subject_relations(fields=["relation_type"]))
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "slots"])
+def test_projection_reads_full_cache_entries(wiki_archive_path, tmp_path, engine):
+    cache_dir = str(tmp_path / "cache")
+    fields = ["subject_id", "related_subject_id"]
+
+    def load(**kwargs):
+        loader = WikiArchiveLoader(
+            str(wiki_archive_path), stop_on_error=False, engine=engine, record_cache_dir=cache_dir
+        )
+        entries = list(loader.subject_relations(**kwargs))
+        return entries, loader.stats()["subject-relations.jsonlines"]
+
+    # projected passes do not write entries
+    uncached, stats = load(fields=fields)
+    assert stats.cached_passes == 0
+    assert not list((tmp_path / "cache").glob("*/*.json"))
+
+    load()
+    cached, stats = load(fields=fields)
+    assert stats.cached_passes == 1
+    assert (stats.lines, stats.valid, stats.errors) == (20, 20, 0)
+    assert [[getattr(e, name) for name in fields] for e in cached] == [
+        [getattr(e, name) for name in fields] for e in uncached
+    ]
+
+    # nested fields are rebuilt from the cached dumps too
+    loader = WikiArchiveLoader(str(wiki_archive_path), record_cache_dir=cache_dir)
+    full = list(loader.subjects())
+    tags = list(loader.subjects(fields=["id", "tags"]))
+    assert loader.stats()["subject.jsonlines"].cached_passes == 1
+    assert [entry.tags for entry in tags] == [entry.tags for entry in full]
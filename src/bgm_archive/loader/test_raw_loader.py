@@ -0,0 +1,83 @@
+import pytest
+from pydantic import ValidationError
+
+from bgm_archive.loader.errors import ErrorSink
+from bgm_archive.loader.model import Episode, Subject, SubjectRelation
+from bgm_archive.loader.raw_loader import RawWikiArchiveLoader, record_tuple
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+def test_raw_dicts_match_validated_models(wiki_archive_path):
+    validated = list(WikiArchiveLoader(str(wiki_archive_path)).subjects())
+    raw = list(RawWikiArchiveLoader(str(wiki_archive_path)).subjects())
+
+    assert len(raw) == len(validated) == 20
+    for record, subject in zip(raw, validated):
+        assert isinstance(record, dict)
+        assert Subject.model_validate(record) == subject
+
+
+def test_raw_tuples_use_model_field_names(wiki_archive_path):
+    loader = RawWikiArchiveLoader(str(wiki_archive_path), record_type="tuple")
+    episodes = list(loader.episodes())
+    subjects = list(loader.subjects())
+
+    assert len(episodes) == 20
+    assert type(episodes[0]) is record_tuple(Episode)
+    assert episodes[0]._fields == tuple(Episode.model_fields)
+    assert subjects[0]._fields == tuple(Subject.model_fields)
+    assert (subjects[0].id, subjects[0].type, subjects[0].nsfw) == (1, 1, False)
+
+
+def test_raw_without_sampling_yields_invalid_records(wiki_archive_path):
+    loader = RawWikiArchiveLoader(str(wiki_archive_path))
+
+    relations = list(loader.subject_relations())
+
+    assert len(relations) == 20
+    assert loader.get_validation_errors() == {}
+
+
+def test_raw_validate_sample_rate(wiki_archive_path):
+    # the invalid relation is the fourth record of the member; rate 1 validates every record
+    loader = RawWikiArchiveLoader(
+        str(wiki_archive_path), stop_on_error=False, validate_sample_rate=1
+    )
+    assert len(list(loader.subject_relations())) == 19
+    assert len(loader.get_validation_errors()[SubjectRelation]) == 1
+
+    with pytest.raises(ValidationError):
+        loader = RawWikiArchiveLoader(str(wiki_archive_path), validate_sample_rate=1)
+        list(loader.subject_relations())
+
+    # rate 2 samples records 0, 2, 4, ... and misses the invalid one at index 3
+    loader = RawWikiArchiveLoader(str(wiki_archive_path), validate_sample_rate=2)
+    assert len(list(loader.subject_relations())) == 20
+
+
+def test_raw_iter_batches(wiki_archive_path):
+    loader = RawWikiArchiveLoader(str(wiki_archive_path))
+
+    batches = list(loader.iter_batches(Subject, batch_size=7))
+
+    assert [len(batch) for batch in batches] == [7, 7, 6]
+    assert [record for batch in batches for record in batch] == list(loader.subjects())
+    assert isinstance(batches[0][0], dict)
+    with pytest.raises(ValueError):
+        next(loader.iter_batches(Subject, batch_size=0))
+
+
+def test_raw_forwards_loader_options(wiki_archive_path):
+    observed = []
+    sink = ErrorSink()
+    loader = RawWikiArchiveLoader(
+        str(wiki_archive_path),
+        stop_on_error=False,
+        validate_sample_rate=1,
+        observer=observed.append,
+        error_sink=sink,
+    )
+
+    assert len(list(loader.subject_relations())) == 19
+    assert sink.total() == 1
+    assert [stats.valid for stats in observed] == [19]
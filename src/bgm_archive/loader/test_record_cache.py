@@ -0,0 +1,89 @@
+import shutil
+import zipfile
+
+import pytest
+from pydantic import ValidationError
+
+from bgm_archive.loader import record_cache
+from bgm_archive.loader.model import Subject, SubjectRelation
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@pytest.mark.parametrize("engine", ["pydantic", "slots"])
+def test_cached_passes_match_archive(wiki_archive_path, tmp_path, engine):
+    cache_dir = str(tmp_path / "cache")
+    expected = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, engine=engine)
+
+    for run in range(2):
+        loader = WikiArchiveLoader(
+            str(wiki_archive_path), stop_on_error=False, engine=engine, record_cache_dir=cache_dir
+        )
+        for filename, model_class in WikiArchiveLoader.FILE_MODEL_MAP.items():
+            entries = list(loader._load_entries(filename, model_class))
+            assert entries == list(expected._load_entries(filename, model_class))
+            assert loader.stats()[filename].cached_passes == run
+
+    subject = next(loader.subjects())
+    assert subject.score_details == next(expected.subjects()).score_details
+    if engine == "pydantic":
+        assert subject.model_dump() == next(expected.subjects()).model_dump()
+        assert subject.tags[0].count > 0
+
+
+def test_cached_invalid_lines_are_reported_again(wiki_archive_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, record_cache_dir=cache_dir)
+    assert len(list(first.subject_relations())) == 19
+
+    replay = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, record_cache_dir=cache_dir)
+    assert len(list(replay.subject_relations())) == 19
+    assert replay.stats()["subject-relations.jsonlines"].cached_passes == 1
+    assert replay.stats()["subject-relations.jsonlines"].errors == 1
+    assert replay.stats()["subject-relations.jsonlines"].lines == 20
+    errors = replay.get_validation_errors()
+    assert [str(e) for e in errors[SubjectRelation]] == [
+        str(e) for e in first.get_validation_errors()[SubjectRelation]
+    ]
+
+    with pytest.raises(ValidationError):
+        list(WikiArchiveLoader(str(wiki_archive_path), record_cache_dir=cache_dir).subject_relations())
+
+
+def test_partial_pass_is_not_cached(wiki_archive_path, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    loader = WikiArchiveLoader(str(wiki_archive_path), record_cache_dir=cache_dir)
+    subjects = loader.subjects()
+    next(subjects)
+    subjects.close()
+
+    cache = record_cache.RecordCache(cache_dir)
+    assert cache.get(str(wiki_archive_path), "subject.jsonlines", Subject) is None
+    assert not list((tmp_path / "cache").glob("*/*.tmp"))
+
+
+def test_cache_invalidated_by_archive_and_schema(wiki_archive_path, tmp_path, monkeypatch):
+    archive = tmp_path / "archive.zip"
+    shutil.copy(wiki_archive_path, archive)
+    cache_dir = str(tmp_path / "cache")
+
+    def cached_passes():
+        loader = WikiArchiveLoader(str(archive), record_cache_dir=cache_dir)
+        subjects = list(loader.subjects())
+        return len(subjects), loader.stats()["subject.jsonlines"].cached_passes
+
+    assert cached_passes() == (20, 0)
+    assert cached_passes() == (20, 1)
+
+    # a new dump is hashed again and gets its own entries
+    with zipfile.ZipFile(wiki_archive_path) as source, zipfile.ZipFile(archive, "w") as target:
+        for name in source.namelist():
+            lines = source.read(name).splitlines(keepends=True)
+            target.writestr(name, b"".join(lines[:10] if name == "subject.jsonlines" else lines))
+    assert cached_passes() == (10, 0)
+    assert cached_passes() == (10, 1)
+
+    monkeypatch.setattr(record_cache, "schema_version", lambda model_class: "changed")
+    assert cached_passes() == (10, 0)
+    assert cached_passes() == (10, 1)
+    # one entry per archive: the new schema replaced the old one of the second archive
+    assert len(list((tmp_path / "cache").glob("*/subject.jsonlines.*.json"))) == 2
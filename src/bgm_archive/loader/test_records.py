@@ -0,0 +1,102 @@
+import pickle
+
+import pytest
+from pydantic import ValidationError
+
+from bgm_archive.loader.model import Subject, SubjectPerson, SubjectRelation, Tag
+from bgm_archive.loader.records import Record, record_type, record_validator
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@pytest.mark.parametrize("filename", list(WikiArchiveLoader.FILE_MODEL_MAP))
+def test_slots_records_match_pydantic_models(wiki_archive_path, filename):
+    model_class = WikiArchiveLoader.FILE_MODEL_MAP[filename]
+    models = list(
+        WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)._load_entries(
+            filename, model_class
+        )
+    )
+    slots_loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, engine="slots")
+    records = list(slots_loader._load_entries(filename, model_class))
+
+    assert len(records) == len(models)
+    for record, model in zip(records, models):
+        assert type(record) is record_type(model_class)
+        assert record.to_dict() == model.model_dump()
+        assert record.to_model() == model
+
+
+def test_slots_records_have_no_instance_dict(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path), engine="slots")
+    subject = next(loader.subjects())
+
+    assert isinstance(subject, Record)
+    assert not hasattr(subject, "__dict__")
+    assert type(subject).__name__ == "SubjectRecord"
+    assert isinstance(subject.tags[0], record_type(Tag))
+    assert subject.score_details.to_dict() == subject.to_model().score_details.model_dump()
+
+
+def test_slots_errors_match_pydantic(wiki_archive_path):
+    pydantic_loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False)
+    slots_loader = WikiArchiveLoader(str(wiki_archive_path), stop_on_error=False, engine="slots")
+    list(pydantic_loader.subject_relations())
+    list(slots_loader.subject_relations())
+
+    expected = pydantic_loader.get_validation_errors()[SubjectRelation][0].errors()
+    actual = slots_loader.get_validation_errors()[SubjectRelation][0].errors()
+    assert actual == expected
+    assert actual[0]["input"] == 4018
+
+
+def test_slots_iter_batches_stop_on_error(wiki_archive_path):
+    loader = WikiArchiveLoader(str(wiki_archive_path), engine="slots")
+
+    with pytest.raises(ValidationError):
+        for _ in loader.iter_batches(SubjectRelation, batch_size=7):
+            pass
+
+
+@pytest.mark.parametrize(
+    "line, error_type, loc",
+    [
+        (b'{"id": 1, "type": 1, "name": "x"}', "missing", ("name_cn",)),
+        (b'{"id": "1"}', "int_type", ("id",)),
+        (b"[1, 2]", "model_type", ()),
+        (b'{"id": 1', "json_invalid", ()),
+    ],
+)
+def test_slots_validator_errors(line, error_type, loc):
+    with pytest.raises(ValidationError) as e:
+        record_validator(Subject)(line)
+
+    error = e.value.errors()[0]
+    assert error["type"] == error_type
+    assert error["loc"] == loc
+    assert pickle.loads(pickle.dumps(e.value)).errors()[0]["type"] == error_type
+
+
+def test_slots_validator_rejects_extra_fields():
+    line = b'{"subject_id": 1, "relation_type": 1, "related_subject_id": 2, "order": 0, "x": 1}'
+    with pytest.raises(ValidationError) as e:
+        record_validator(SubjectRelation)(line)
+
+    assert e.value.errors()[0]["type"] == "extra_forbidden"
+    assert e.value.errors()[0]["loc"] == ("x",)
+
+
+def test_unknown_engine(wiki_archive_path):
+    with pytest.raises(ValueError):
+        WikiArchiveLoader(str(wiki_archive_path), engine="msgspec")
+
+
+def test_slots_validator_checks_positions():
+    validate = record_validator(SubjectPerson)
+    assert validate(b'{"person_id": 1, "subject_id": 2, "position": 3005}').position == 3005
+
+    line = b'{"person_id": 1, "subject_id": 2, "position": 12}'
+    with pytest.raises(ValidationError) as e:
+        validate(line)
+    with pytest.raises(ValidationError) as expected:
+        SubjectPerson.model_validate_json(line)
+    assert e.value.errors(include_url=False) == expected.value.errors(include_url=False)
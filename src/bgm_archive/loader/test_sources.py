@@ -0,0 +1,134 @@
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from bgm_archive.loader.model import Episode
+from bgm_archive.loader.sources import (
+    ArchiveSource,
+    DirectorySource,
+    StreamSource,
+    ZipSource,
+    open_source,
+)
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+
+@pytest.fixture(scope="module")
+def extracted_dir(wiki_archive_path, tmp_path_factory):
+    """
+    The fixture archive extracted to a directory, with some members gzip-compressed.
+    """
+    directory = tmp_path_factory.mktemp("extracted")
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        for filename in archive.namelist():
+            data = archive.read(filename)
+            if filename.startswith("subject"):
+                (directory / f"{filename}.gz").write_bytes(gzip.compress(data))
+            else:
+                (directory / filename).write_bytes(data)
+    return directory
+
+
+def _load(archive, filename="episode.jsonlines"):
+    with WikiArchiveLoader(archive, stop_on_error=False) as loader:
+        model_class = WikiArchiveLoader.FILE_MODEL_MAP[filename]
+        return list(loader._load_entries(filename, model_class)), loader.stats()
+
+
+@pytest.mark.parametrize("filename", list(WikiArchiveLoader.FILE_MODEL_MAP))
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_directory_matches_zip(wiki_archive_path, extracted_dir, filename, use_mmap):
+    expected, zip_stats = _load(str(wiki_archive_path), filename)
+    actual, stats = _load(DirectorySource(extracted_dir, use_mmap=use_mmap), filename)
+
+    assert actual == expected
+    assert stats[filename].compressed_bytes > 0
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        assert zip_stats[filename].compressed_bytes == archive.getinfo(filename).compress_size
+
+
+def test_open_source(wiki_archive_path, extracted_dir):
+    assert isinstance(open_source(str(wiki_archive_path)), ZipSource)
+    assert isinstance(open_source(extracted_dir), DirectorySource)
+    with pytest.raises(ValueError):
+        open_source("-")
+    assert DirectorySource(extracted_dir).members() == sorted(WikiArchiveLoader.FILE_MODEL_MAP)
+
+
+def test_missing_member(extracted_dir):
+    source = DirectorySource(extracted_dir)
+    with pytest.raises(KeyError):
+        source.open("missing.jsonlines")
+
+    # the loader treats a missing member as empty
+    loader = WikiArchiveLoader(StreamSource(io.BytesIO(b""), "episode.jsonlines"))
+    assert list(loader.subjects()) == []
+
+
+def test_stream_source(wiki_archive_path, tmp_path):
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        data = archive.read("episode.jsonlines")
+    stream = io.BytesIO(data)
+    index_dir = tmp_path / "index"
+    loader = WikiArchiveLoader(StreamSource(stream, "episode.jsonlines"), index_dir=str(index_dir))
+
+    episodes = list(loader.episodes())
+    assert len(episodes) == 20 and isinstance(episodes[0], Episode)
+    with pytest.raises(RuntimeError):
+        list(loader.episodes())
+    with pytest.raises(ValueError):
+        loader.get_episode(episodes[0].id)
+    assert not index_dir.exists()
+
+    loader.close()
+    assert not stream.closed
+
+    # without an index_dir, no default is derived from the "-" path
+    loader = WikiArchiveLoader(StreamSource(io.BytesIO(b""), "episode.jsonlines"))
+    with pytest.raises(ValueError, match="no offset index"):
+        loader.get_episode(1)
+    loader.close()
+
+
+def test_zip_source_is_shared_and_closed(wiki_archive_path):
+    source = ZipSource(wiki_archive_path)
+    loader = WikiArchiveLoader(source)
+
+    iterators = loader.load_all()
+    first = {filename: next(entries) for filename, entries in iterators.items()}
+    assert len(first) == len(WikiArchiveLoader.FILE_MODEL_MAP)
+    shared = source._zip()
+    for entries in iterators.values():
+        entries.close()
+
+    loader.close()
+    assert shared.fp is None
+
+
+def test_directory_offset_index(extracted_dir, tmp_path):
+    loader = WikiArchiveLoader(str(extracted_dir), index_dir=str(tmp_path / "index"))
+
+    subject = loader.get_subject(8)
+    assert subject is not None and subject.id == 8
+    loader.close()
+
+
+def test_zstd_member(wiki_archive_path, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+    with zipfile.ZipFile(wiki_archive_path) as archive:
+        data = archive.read("episode.jsonlines")
+    (tmp_path / "episode.jsonlines.zst").write_bytes(zstandard.ZstdCompressor().compress(data))
+
+    episodes, _ = _load(str(tmp_path))
+    assert len(episodes) == 20
+
+
+def test_incomplete_source_fails_on_creation():
+    class MembersOnly(ArchiveSource):
+        def members(self):
+            return []
+
+    with pytest.raises(TypeError):
+        MembersOnly()
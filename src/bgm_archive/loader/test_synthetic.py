@@ -0,0 +1,67 @@
+import zipfile
+
+import pytest
+
+from bgm_archive.loader.synthetic import DEFAULT_ROWS, generate_archive, resolve_rows
+from bgm_archive.loader.wiki_archive_loader import WikiArchiveLoader
+
+ROWS = {
+    "subject.jsonlines": 50,
+    "person.jsonlines": 10,
+    "character.jsonlines": 20,
+    "episode.jsonlines": 100,
+    "subject-relations.jsonlines": 80,
+    "subject-persons.jsonlines": 60,
+    "subject-characters.jsonlines": 40,
+    "person-characters.jsonlines": 30,
+}
+
+
+def test_generated_archive_is_valid(tmp_path):
+    path = tmp_path / "synthetic.zip"
+    counts = generate_archive(str(path), rows=ROWS)
+
+    assert counts == ROWS
+    loader = WikiArchiveLoader(str(path))
+    subjects = list(loader.subjects())
+    assert [s.id for s in subjects] == list(range(1, 51))
+    assert all(1 <= e.subject_id <= 50 for e in loader.episodes())
+    relations = list(loader.subject_persons())
+    assert len(relations) == 60
+    assert all(1 <= r.person_id <= 10 for r in relations)
+    assert loader.get_subject(7).id == 7
+
+
+def test_generation_is_deterministic(tmp_path):
+    first, second = tmp_path / "a.zip", tmp_path / "b.zip"
+    generate_archive(str(first), rows=ROWS, seed=3)
+    generate_archive(str(second), rows=ROWS, seed=3)
+
+    with zipfile.ZipFile(first) as a, zipfile.ZipFile(second) as b:
+        for filename in ROWS:
+            assert a.read(filename) == b.read(filename)
+
+
+def test_invalid_rate(tmp_path):
+    path = tmp_path / "invalid.zip"
+    generate_archive(str(path), rows={**ROWS, "subject-relations.jsonlines": 500}, invalid_rate=0.1)
+
+    loader = WikiArchiveLoader(str(path), stop_on_error=False)
+    valid = sum(1 for _ in loader.subject_relations())
+    errors = loader.get_validation_errors()
+    assert 0 < len(next(iter(errors.values()))) == 500 - valid
+
+
+def test_resolve_rows():
+    rows = resolve_rows({"episode.jsonlines": 7}, scale=0.001)
+
+    assert rows["episode.jsonlines"] == 7
+    assert rows["subject.jsonlines"] == DEFAULT_ROWS["subject.jsonlines"] // 1000
+    with pytest.raises(ValueError):
+        resolve_rows({"unknown.jsonlines": 1})
+    with pytest.raises(ValueError, match="character.jsonlines"):
+        resolve_rows({"character.jsonlines": 0}, scale=0.001)
+    # an empty entity member is fine when nothing refers to it
+    empty = {"character.jsonlines": 0, "subject-characters.jsonlines": 0}
+    rows = resolve_rows({**empty, "person-characters.jsonlines": 0}, scale=0.001)
+    assert rows["character.jsonlines"] == 0
@@ -1,11 +1,33 @@
-from collections import defaultdict
+import functools
 import json
 import logging
+import operator
+import os
+import time
 from contextlib import contextmanager
-from typing import Dict, Iterator, Type, TypeVar
-import zipfile
-from pydantic import BaseModel, ValidationError
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Literal,
+    Mapping,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
+from .errors import ErrorSink
+from .sources import ArchiveSource, StreamSource, open_source
+from .predicates import LineFilter, filter_fields
+from .projection import partial_model, source_model
+from .stats import MemberStats
 from .model import (
     Subject,
     Person,
@@ -17,6 +39,9 @@ from .model import (
     PersonCharacter,
 )
 
+if TYPE_CHECKING:
+    from .record_cache import CachedMember, MemberWriter
+
 # Type variable for generic model handling
 T = TypeVar("T", bound=BaseModel)
 
@@ -24,12 +49,21 @@ T = TypeVar("T", bound=BaseModel)
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _list_adapter(model_class: Type[T]) -> TypeAdapter[List[T]]:
+    """
+    TypeAdapter validating a JSON array of model_class in a single call.
+    """
+    return TypeAdapter(List[model_class])
+
+
 class WikiArchiveLoader:
     """
     A loader to consume zipped jsonlines files, released at https://github.com/bangumi/Archive.
 
     This loader reads JSONL files from a zip archive, validates each entry with
-    the appropriate Pydantic model, and yields the validated entries.
+    the appropriate Pydantic model, and yields the validated entries. Other layouts
+    (extracted or re-compressed members, stdin) are read through an ArchiveSource.
 
     The zip file is expected to have the following structure:
     - subject.jsonlines
@@ -54,31 +88,93 @@ class WikiArchiveLoader:
         "person-characters.jsonlines": PersonCharacter,
     }
 
-    def __init__(self, archive_path: str, stop_on_error=True):
+    def __init__(
+        self,
+        archive_path: Union[str, ArchiveSource],
+        stop_on_error=True,
+        index_dir: Optional[str] = None,
+        engine: Literal["pydantic", "slots"] = "pydantic",
+        observer: Optional[Callable[[MemberStats], None]] = None,
+        timings: bool = False,
+        error_sink: Optional[ErrorSink] = None,
+        record_cache_dir: Optional[str] = None,
+    ):
         """
         Initialize the loader with the path to the zip archive.
 
+        The archive is opened on first use and stays open until close(); use the loader
+        as a context manager to close it deterministically.
+
         Args:
-            archive_path: Path to the zip archive containing JSONL files
+            archive_path: Path to the zip archive containing JSONL files, a directory of
+                (optionally .gz/.zst compressed) members, or an ArchiveSource
+            index_dir: Directory for the offset index used by get_subject() and friends,
+                defaults to "<archive_path>.index"; stream sources have none
+            engine: "pydantic" yields model instances, "slots" yields the compact
+                __slots__ records of records.py, validated against the same rules
+            observer: Called with the member's MemberStats whenever a pass over a member
+                ends, whether exhausted or closed early
+            timings: Also measure time per stage (read, decode, validate) in stats()
+            error_sink: Where validation errors go with stop_on_error=False, defaults to
+                an ErrorSink keeping histograms and a sample of 100 errors per model
+            record_cache_dir: Directory of a RecordCache: the first full pass over a member
+                stores its validated records there, later passes (of any loader using the
+                directory) read them back instead of parsing the archive. Entries are keyed
+                by the archive's sha256 and the model schema. Requires numpy.
         """
-        self.__archive_path = archive_path
+        if engine not in ("pydantic", "slots"):
+            raise ValueError(f"Unknown engine: {engine!r}")
+        self.__source = open_source(archive_path)
+        self.__archive_path = self.__source.path
+        self.__engine = engine
         self.__stop_on_error = stop_on_error
-        self.__validation_errors: dict[type, list[ValidationError]] = defaultdict(list)
+        self.__error_sink = error_sink if error_sink is not None else ErrorSink()
+        if index_dir is None and not isinstance(self.__source, StreamSource):
+            index_dir = f"{self.__archive_path}.index"
+        self.__index_dir = index_dir
+        self.__offset_index = None
+        self.__observer = observer
+        self.__timings = timings
+        self.__stats: Dict[str, MemberStats] = {}
+        self.__record_cache = None
+        if record_cache_dir is not None:
+            from .record_cache import RecordCache
+
+            self.__record_cache = RecordCache(record_cache_dir)
 
     @contextmanager
     def _open_archive(self):
         """
-        Context manager for opening and closing the zip archive.
+        Context manager giving access to the archive's members.
+
+        The source is shared by every reader of this loader and closed by close(), not
+        when the context exits.
 
         Yields:
-            The opened ZipFile object
+            The ArchiveSource, whose open(member) raises KeyError for missing members
         """
-        yield zipfile.ZipFile(self.__archive_path, "r")
+        yield self.__source
+
+    def close(self):
+        """
+        Close the archive source and the offset index, if one was opened.
+        """
+        if self.__offset_index is not None:
+            self.__offset_index.close()
+            self.__offset_index = None
+        self.__source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     def _load_entries(
         self,
         filename: str,
         model_class: Type[T],
+        line_filter: Optional[LineFilter] = None,
     ) -> Iterator[T]:
         """
         Generic method to load and validate entries from a JSONL file in the zip archive.
@@ -86,113 +182,614 @@ class WikiArchiveLoader:
         Args:
             filename: Name of the JSONL file in the zip archive
             model_class: Pydantic model class to validate entries against
+            line_filter: Only yield entries matching this filter, skipping the lines it
+                rules out before validation
 
         Yields:
             Validated model instances
         """
+        writer = None
+        if self.__record_cache is not None:
+            try:
+                source_path = self.__source.member_path(filename)
+            except (KeyError, ValueError):
+                # missing members are not cached, streams have no file to key the cache by
+                source_path = None
+            if source_path is not None and os.path.exists(source_path):
+                # partial models read the entries of their full model, but never write one
+                full_model = source_model(model_class)
+                cached = self.__record_cache.get(source_path, filename, full_model)
+                if cached is not None:
+                    yield from self._replay_cached(filename, model_class, cached, line_filter)
+                    return
+                # filtered passes skip lines, so only full passes can fill the cache
+                if full_model is model_class and line_filter is None:
+                    writer = self.__record_cache.writer(source_path, filename, model_class)
+        try:
+            yield from self._validate_entries(filename, model_class, writer, line_filter)
+        finally:
+            if writer is not None:
+                writer.abort()
+
+    def _validate_entries(
+        self,
+        filename: str,
+        model_class: Type[T],
+        writer: Optional["MemberWriter"] = None,
+        line_filter: Optional[LineFilter] = None,
+    ) -> Iterator[T]:
+        """
+        The validating pass of _load_entries, feeding writer when the member is to be cached.
+        """
+        validate_json = self._validator(model_class)
+        stats = self._member_stats(filename)
+        timings = self.__timings
+        clock = time.perf_counter
+        dump = None
+        if writer is not None:
+            dump = operator.methodcaller("to_dict" if self.__engine == "slots" else "model_dump")
+
+        prefilter = line_filter.prefilter if line_filter is not None else None
+
+        for line_number, line in self._iter_lines(filename):
+            if prefilter is not None and not prefilter(line):
+                stats.filtered += 1
+                stats.prefiltered += 1
+                continue
+            try:
+                if timings:
+                    started = clock()
+                # Decode bytes to string and parse JSON
+                line_str = line.decode("utf-8").strip()
+                if not line_str:  # Skip empty lines
+                    continue
+
+                if timings:
+                    decoded = clock()
+                    stats.decode_seconds += decoded - started
+                    try:
+                        validated_entry = validate_json(line_str)
+                    finally:
+                        stats.validate_seconds += clock() - decoded
+                else:
+                    validated_entry = validate_json(line_str)
+                stats.valid += 1
+                if writer is not None:
+                    writer.add(dump(validated_entry))
+                if line_filter is not None and not line_filter.matches(validated_entry):
+                    stats.filtered += 1
+                    continue
+                yield validated_entry
+
+            except ValidationError as e:
+                if writer is not None:
+                    writer.add_invalid(line_number, line)
+                self._handle_validation_error(model_class, e, line_number)
+            except Exception as e:
+                logger.error(f"Unexpected error processing {filename}:{line_number}: {e}")
+                raise
+
+        if writer is not None and filename in self.__source.members():
+            writer.commit()
+            logger.info(f"Cached {writer.rows} validated entries of {filename}")
+
+    def _replay_cached(
+        self,
+        filename: str,
+        model_class: Type[T],
+        cached: "CachedMember",
+        line_filter: Optional[LineFilter] = None,
+    ) -> Iterator[T]:
+        """
+        The records of a cached member, with its invalid lines validated again in place.
+        Partial models are built from the requested fields of the cached records, and a
+        filter is checked on the cached values before building anything.
+        """
+        from .record_cache import model_builder, record_builder
+
+        build = (record_builder if self.__engine == "slots" else model_builder)(model_class)
+        if model_class is not source_model(model_class):
+            build_partial, fields = build, list(model_class.model_fields)
+
+            def build(values):
+                return build_partial({name: values[name] for name in fields})
+
+        validate_json = self._validator(model_class)
+        stats = self._member_stats(filename)
+        stats.passes += 1
+        stats.cached_passes += 1
+        invalid = iter(cached.invalid)
+        pending = next(invalid, None)
+        started = time.perf_counter()
+        try:
+            for position, values in enumerate(cached.dumps()):
+                while pending is not None and pending[0] == position:
+                    entry = self._replay_invalid(
+                        stats, model_class, validate_json, pending, line_filter
+                    )
+                    if entry is not None:
+                        yield entry
+                    pending = next(invalid, None)
+                stats.lines += 1
+                stats.valid += 1
+                if line_filter is not None and not line_filter.matches_values(values):
+                    stats.filtered += 1
+                    continue
+                yield build(values)
+            while pending is not None:
+                entry = self._replay_invalid(
+                    stats, model_class, validate_json, pending, line_filter
+                )
+                if entry is not None:
+                    yield entry
+                pending = next(invalid, None)
+        finally:
+            stats.wall_seconds += time.perf_counter() - started
+            if self.__observer is not None:
+                self.__observer(stats)
+
+    def _replay_invalid(
+        self,
+        stats: MemberStats,
+        model_class: Type[T],
+        validate_json,
+        invalid: tuple,
+        line_filter: Optional[LineFilter],
+    ):
+        _, line_number, line = invalid
+        stats.lines += 1
+        if line_filter is not None and not line_filter.prefilter(line):
+            stats.filtered += 1
+            stats.prefiltered += 1
+            return None
+        try:
+            entry = validate_json(line)
+        except ValidationError as e:
+            self._handle_validation_error(model_class, e, line_number)
+            return None
+        # only a partial model can accept a line its full model rejected
+        stats.valid += 1
+        if line_filter is not None and not line_filter.matches(entry):
+            stats.filtered += 1
+            return None
+        return entry
+
+    def _validator(self, model_class: Type[T]) -> Callable[[bytes], T]:
+        """
+        The per-line validation function of the selected engine.
+        """
+        if self.__engine == "slots":
+            from .records import record_validator
+
+            return record_validator(model_class)
+        return model_class.model_validate_json
+
+    def _iter_lines(self, filename: str) -> Iterator[tuple[int, bytes]]:
+        """
+        Read the raw, non-blank lines of a JSONL file in the zip archive.
+
+        Args:
+            filename: Name of the JSONL file in the zip archive
 
+        Yields:
+            Tuples of (line number, raw line bytes)
+        """
         with self._open_archive() as archive:
             try:
-                with archive.open(filename) as file:
-                    for line_number, line in enumerate(file):
-                        try:
-                            # Decode bytes to string and parse JSON
-                            line_str = line.decode("utf-8").strip()
-                            if not line_str:  # Skip empty lines
-                                continue
-
-                            validated_entry = model_class.model_validate_json(line_str)
-                            yield validated_entry
-
-                        except ValidationError as e:
-                            if self.__stop_on_error:
-                                raise
-                            else:
-                                self.__validation_errors[model_class].append(e)
-                        except Exception as e:
-                            logger.error(
-                                f"Unexpected error processing {filename}:{line_number}: {e}"
-                            )
-                            raise
+                file = archive.open(filename)
             except KeyError:
                 logger.warning(f"File {filename} not found in archive")
+                return
+
+            stats = self._member_stats(filename)
+            stats.passes += 1
+            timings = self.__timings
+            clock = time.perf_counter
+            started = read_started = clock()
+            try:
+                with file:
+                    try:
+                        for line_number, line in enumerate(file):
+                            stats.decompressed_bytes += len(line)
+                            if not line.strip():  # Skip empty lines
+                                stats.blank_lines += 1
+                                continue
+                            stats.lines += 1
+                            if timings:
+                                stats.read_seconds += clock() - read_started
+                            yield line_number, line
+                            if timings:
+                                read_started = clock()
+                    finally:
+                        stats.compressed_bytes += file.compressed_bytes_read()
+            finally:
+                stats.wall_seconds += clock() - started
+                if self.__observer is not None:
+                    self.__observer(stats)
+
+    def _member_stats(self, filename: str) -> MemberStats:
+        if filename not in self.__stats:
+            self.__stats[filename] = MemberStats(filename)
+        return self.__stats[filename]
+
+    def stats(self) -> Dict[str, MemberStats]:
+        """
+        Metrics collected so far, per archive member.
+
+        Returns:
+            Dictionary mapping member names to their MemberStats
+        """
+        return dict(self.__stats)
+
+    def _handle_validation_error(
+        self, model_class: type, error: ValidationError, line_number: Optional[int] = None
+    ):
+        """
+        Raise the error when stop_on_error is set, otherwise record it in the error sink.
+        """
+        filename = None
+        if source_model(model_class) in self.FILE_MODEL_MAP.values():
+            filename = self._filename_for(model_class)
+            self._member_stats(filename).errors += 1
+        if self.__stop_on_error:
+            raise error
+        self.__error_sink.add(source_model(model_class), error, filename, line_number)
+
+    def iter_batches(
+        self,
+        model_class: Type[T],
+        batch_size: int = 1000,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[List[T]]:
+        """
+        Load and validate entries of model_class in batches.
+
+        Up to batch_size raw lines are joined into one JSON array and validated with a
+        single call, which amortizes per-call overhead for small models like the relation
+        types. When a batch fails, its lines are re-validated one by one, so invalid lines
+        are recorded (or raised) exactly like in _load_entries. The slots engine has no
+        array validator and validates the lines of a batch one by one.
 
-    def subjects(self) -> Iterator[Subject]:
+        Args:
+            model_class: Pydantic model class, one of the values in FILE_MODEL_MAP
+            batch_size: Maximum number of lines validated per call
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
+        Yields:
+            Non-empty lists of validated model instances, in file order
+        """
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive, got {batch_size}")
+        model_class, line_filter = self._query(model_class, fields, where)
+        filename = self._filename_for(model_class)
+        adapter = _list_adapter(model_class)
+        stats = self._member_stats(filename)
+
+        batch: list[bytes] = []
+        line_numbers: list[int] = []
+        for line_number, line in self._iter_lines(filename):
+            if line_filter is not None and not line_filter.prefilter(line):
+                stats.filtered += 1
+                stats.prefiltered += 1
+                continue
+            batch.append(line)
+            line_numbers.append(line_number)
+            if len(batch) >= batch_size:
+                validated = self._validate_batch(
+                    filename, model_class, adapter, batch, line_numbers, line_filter
+                )
+                if validated:
+                    yield validated
+                batch, line_numbers = [], []
+        if batch:
+            validated = self._validate_batch(
+                filename, model_class, adapter, batch, line_numbers, line_filter
+            )
+            if validated:
+                yield validated
+
+    def _validate_batch(
+        self,
+        filename: str,
+        model_class: Type[T],
+        adapter: TypeAdapter[List[T]],
+        lines: List[bytes],
+        line_numbers: List[int],
+        line_filter: Optional[LineFilter] = None,
+    ) -> List[T]:
+        """
+        Validate raw lines with one adapter call, falling back to per-line validation, and
+        drop the entries line_filter does not match.
+        """
+        stats = self._member_stats(filename)
+        started = time.perf_counter() if self.__timings else None
+        try:
+            validated = self._validate_lines(filename, model_class, adapter, lines, line_numbers)
+        finally:
+            if started is not None:
+                stats.validate_seconds += time.perf_counter() - started
+        stats.valid += len(validated)
+        if line_filter is not None:
+            matching = [entry for entry in validated if line_filter.matches(entry)]
+            stats.filtered += len(validated) - len(matching)
+            return matching
+        return validated
+
+    def _validate_lines(
+        self,
+        filename: str,
+        model_class: Type[T],
+        adapter: TypeAdapter[List[T]],
+        lines: List[bytes],
+        line_numbers: List[int],
+    ) -> List[T]:
+        if self.__engine == "pydantic":
+            try:
+                validated = adapter.validate_json(b"[" + b",".join(lines) + b"]")
+                # a malformed line may still form a valid array, e.g. '{..},{..}'
+                if len(validated) == len(lines):
+                    return validated
+            except ValidationError:
+                pass
+
+        validate_json = self._validator(model_class)
+        validated = []
+        for line_number, line in zip(line_numbers, lines):
+            try:
+                validated.append(validate_json(line))
+            except ValidationError as e:
+                self._handle_validation_error(model_class, e, line_number)
+            except Exception as e:
+                logger.error(f"Unexpected error processing {filename}:{line_number}: {e}")
+                raise
+        return validated
+
+    def _filename_for(self, model_class: Type[BaseModel]) -> str:
+        """
+        Find the archive member holding entries of model_class, or of the model a partial
+        model was generated from.
+        """
+        model_class = source_model(model_class)
+        for filename, mapped_class in self.FILE_MODEL_MAP.items():
+            if mapped_class is model_class:
+                return filename
+        raise ValueError(f"No archive member for model {model_class.__name__}")
+
+    @staticmethod
+    def _query(
+        model_class: Type[T],
+        fields: Optional[Iterable[str]],
+        where: Optional[Mapping[str, Any]],
+    ) -> Tuple[Type[T], Optional[LineFilter]]:
+        """
+        The model to validate with and the filter of an iterator's fields and where
+        arguments. Projections keep the filtered fields, which the filter checks.
+        """
+        line_filter = None if where is None else LineFilter(model_class, where)
+        if fields is None:
+            return model_class, line_filter
+        if line_filter is not None:
+            fields = filter_fields(fields, line_filter)
+        return partial_model(model_class, fields), line_filter
+
+    def subjects(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Subject]:
         """
         Load and validate Subject entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated Subject instances
+            Validated Subject instances, or partial models holding only fields
         """
-        yield from self._load_entries("subject.jsonlines", Subject)
+        yield from self._load_entries("subject.jsonlines", *self._query(Subject, fields, where))
 
-    def persons(self) -> Iterator[Person]:
+    def persons(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Person]:
         """
         Load and validate Person entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated Person instances
+            Validated Person instances, or partial models holding only fields
         """
-        yield from self._load_entries("person.jsonlines", Person)
+        yield from self._load_entries("person.jsonlines", *self._query(Person, fields, where))
 
-    def characters(self) -> Iterator[Character]:
+    def characters(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Character]:
         """
         Load and validate Character entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated Character instances
+            Validated Character instances, or partial models holding only fields
         """
-        yield from self._load_entries("character.jsonlines", Character)
+        yield from self._load_entries("character.jsonlines", *self._query(Character, fields, where))
 
-    def episodes(self) -> Iterator[Episode]:
+    def episodes(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Episode]:
         """
         Load and validate Episode entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated Episode instances
+            Validated Episode instances, or partial models holding only fields
         """
-        yield from self._load_entries("episode.jsonlines", Episode)
+        yield from self._load_entries("episode.jsonlines", *self._query(Episode, fields, where))
 
-    def subject_relations(self) -> Iterator[SubjectRelation]:
+    def subject_relations(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[SubjectRelation]:
         """
         Load and validate SubjectRelation entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated SubjectRelation instances
+            Validated SubjectRelation instances, or partial models holding only fields
         """
-        yield from self._load_entries("subject-relations.jsonlines", SubjectRelation)
+        yield from self._load_entries(
+            "subject-relations.jsonlines", *self._query(SubjectRelation, fields, where)
+        )
 
-    def subject_persons(self) -> Iterator[SubjectPerson]:
+    def subject_persons(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[SubjectPerson]:
         """
         Load and validate SubjectPerson entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated SubjectPerson instances
+            Validated SubjectPerson instances, or partial models holding only fields
         """
-        yield from self._load_entries("subject-persons.jsonlines", SubjectPerson)
+        yield from self._load_entries(
+            "subject-persons.jsonlines", *self._query(SubjectPerson, fields, where)
+        )
 
-    def subject_characters(self) -> Iterator[SubjectCharacter]:
+    def subject_characters(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[SubjectCharacter]:
         """
         Load and validate SubjectCharacter entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated SubjectCharacter instances
+            Validated SubjectCharacter instances, or partial models holding only fields
         """
-        yield from self._load_entries("subject-characters.jsonlines", SubjectCharacter)
+        yield from self._load_entries(
+            "subject-characters.jsonlines", *self._query(SubjectCharacter, fields, where)
+        )
 
-    def person_characters(self) -> Iterator[PersonCharacter]:
+    def person_characters(
+        self,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[PersonCharacter]:
         """
         Load and validate PersonCharacter entries from the archive.
 
+        Args:
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
         Yields:
-            Validated PersonCharacter instances
+            Validated PersonCharacter instances, or partial models holding only fields
+        """
+        yield from self._load_entries(
+            "person-characters.jsonlines", *self._query(PersonCharacter, fields, where)
+        )
+
+    def get_subject(self, subject_id: int) -> Optional[Subject]:
+        """
+        Look up one Subject by id through the offset index.
+
+        Returns:
+            The validated Subject, or None if there is no subject with this id
+        """
+        return self._get_entry("subject.jsonlines", Subject, subject_id)
+
+    def get_person(self, person_id: int) -> Optional[Person]:
+        """
+        Look up one Person by id through the offset index.
+
+        Returns:
+            The validated Person, or None if there is no person with this id
+        """
+        return self._get_entry("person.jsonlines", Person, person_id)
+
+    def get_character(self, character_id: int) -> Optional[Character]:
+        """
+        Look up one Character by id through the offset index.
+
+        Returns:
+            The validated Character, or None if there is no character with this id
+        """
+        return self._get_entry("character.jsonlines", Character, character_id)
+
+    def get_episode(self, episode_id: int) -> Optional[Episode]:
+        """
+        Look up one Episode by id through the offset index.
+
+        Returns:
+            The validated Episode, or None if there is no episode with this id
+        """
+        return self._get_entry("episode.jsonlines", Episode, episode_id)
+
+    def _get_entry(self, filename: str, model_class: Type[T], entry_id: int) -> Optional[T]:
         """
-        yield from self._load_entries("person-characters.jsonlines", PersonCharacter)
+        Seek to the line of entry_id in a member and validate only that line.
+
+        The member's offset index and decompressed copy are built on first use, and
+        rebuilt when the archive changes. Requires numpy.
+
+        Raises:
+            ValueError: if the source has no file to index, as for stream sources
+        """
+        if self.__index_dir is None:
+            raise ValueError("Stream sources have no offset index")
+        if self.__offset_index is None:
+            from .offset_index import OffsetIndex
+
+            self.__offset_index = OffsetIndex(
+                self.__archive_path,
+                self.__index_dir,
+                self._open_archive,
+                fingerprint_path=self.__source.member_path,
+            )
+        line = self.__offset_index.get_line(filename, entry_id)
+        if line is None:
+            return None
+        try:
+            return self._validator(model_class)(line)
+        except ValidationError as e:
+            self._handle_validation_error(model_class, e)
+            return None
 
     def load_all(self) -> Dict[str, Iterator[BaseModel]]:
         """
         Load all types of entries from the archive.
 
+        The iterators read through the loader's single archive handle.
+
         Returns:
             Dictionary mapping file names to iterators of validated entries
         """
@@ -201,11 +798,94 @@ class WikiArchiveLoader:
             for file_name, model_class in self.FILE_MODEL_MAP.items()
         }
 
+    def members(self) -> List[str]:
+        """
+        Names of the members in the archive.
+        """
+        with self._open_archive() as archive:
+            return archive.members()
+
+    def iter_member(
+        self,
+        filename: str,
+        fields: Optional[Iterable[str]] = None,
+        where: Optional[Mapping[str, Any]] = None,
+    ) -> Iterator[Any]:
+        """
+        Load and validate the entries of a member given by name, like subjects() and the
+        other iterators do for theirs.
+
+        Args:
+            filename: Name of the member, one of the keys of FILE_MODEL_MAP
+            fields: Only decode and validate these fields, see projection.partial_model()
+            where: Only yield entries matching this filter, see predicates.LineFilter
+
+        Yields:
+            Entries as the other iterators yield them, e.g. validated model instances
+
+        Raises:
+            ValueError: if filename is not in FILE_MODEL_MAP
+        """
+        if filename not in self.FILE_MODEL_MAP:
+            raise ValueError(f"Unknown archive member: {filename}")
+        model_class = self.FILE_MODEL_MAP[filename]
+        yield from self._load_entries(filename, *self._query(model_class, fields, where))
+
+    def iter_raw_lines(self, filename: str) -> Iterator[Tuple[int, bytes]]:
+        """
+        Read the raw, non-blank lines of a member, for callers doing their own parsing.
+
+        Lines are counted in stats() like those of the validating iterators; a missing
+        member yields nothing. Lines that fail the caller's validation go to record_error().
+
+        Yields:
+            Tuples of (0-based line number, raw line bytes)
+        """
+        return self._iter_lines(filename)
+
+    def record_error(
+        self, model_class: type, error: ValidationError, line_number: Optional[int] = None
+    ):
+        """
+        Handle a validation error found in a line of iter_raw_lines(): raise it with
+        stop_on_error, otherwise count it in stats() and record it in the error sink.
+        """
+        self._handle_validation_error(model_class, error, line_number)
+
+    def columnar_cache(self, cache_dir: str, rebuild: bool = False, **build_kwargs):
+        """
+        Open the columnar cache of numeric subject/person/character fields for this archive.
+
+        The cache is rebuilt from the archive when it is stale (see ColumnarCache.is_stale)
+        or when rebuild is set. Requires numpy.
+
+        Args:
+            cache_dir: Directory holding the cache
+            rebuild: Rebuild even if the cache looks fresh
+            **build_kwargs: Passed to ColumnarCache.build
+
+        Returns:
+            A ColumnarCache with memory-mapped columns
+        """
+        from .columnar import ColumnarCache
+
+        if rebuild:
+            return ColumnarCache.build(self.__archive_path, cache_dir, **build_kwargs)
+        return ColumnarCache.open_or_build(self.__archive_path, cache_dir, **build_kwargs)
+
     def get_validation_errors(self) -> dict[type, list[ValidationError]]:
         """
         Get validation errors encountered during loading.
 
+        Only a sample is kept per model (see ErrorSink); get_error_sink() has the counts.
+
         Returns:
             Dictionary mapping model classes to lists of ValidationError instances
         """
-        return dict(self.__validation_errors)
+        return self.__error_sink.samples()
+
+    def get_error_sink(self) -> ErrorSink:
+        """
+        The sink holding error histograms and samples of this loader.
+        """
+        return self.__error_sink
@@ -0,0 +1,282 @@
+"""
+Read-only HTTP lookup service over a database built by build_index() and, optionally, a
+NameIndex.
+
+    GET /subjects/<id>                       subject with tags
+    GET /subjects/<id>/relations             related subjects
+    GET /subjects/<id>/staff                 persons credited on the subject
+    GET /subjects/<id>/cast                  characters, with their voice actors
+    GET /subjects/<id>/episodes              episodes by type and sort
+    GET /persons/<id>, /characters/<id>, /episodes/<id>
+    GET /persons/<id>/subjects, /characters/<id>/subjects
+    GET /search?q=<text>[&kind=subject][&limit=20]
+    GET /stats                               row counts and cache counters
+
+Responses are JSON. Request threads check read-only SQLite connections out of a pool, so
+lookups run in parallel while SQLite releases the GIL. Serialized
+responses, including 404s for missing ids, are kept in an LRU cache bounded by entries
+and bytes, so hot entities are answered without touching the database.
+"""
+
+import contextlib
+import json
+import logging
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from ..index.name_index import KINDS, NameIndex
+from ..index.sqlite_index import ArchiveIndex
+
+logger = logging.getLogger(__name__)
+
+# (status, JSON body)
+Response = Tuple[int, bytes]
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache of serialized responses, bounded by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries: int = 100_000, max_bytes: int = 256 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+        self.__entries: "OrderedDict[str, Response]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def get(self, key: str) -> Optional[Response]:
+        with self.__lock:
+            response = self.__entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: str, response: Response):
+        size = len(key) + len(response[1])
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self.__lock:
+            previous = self.__entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= len(key) + len(previous[1])
+            self.__entries[key] = response
+            self.bytes += size
+            while len(self.__entries) > self.max_entries or self.bytes > self.max_bytes:
+                old_key, (_, old_body) = self.__entries.popitem(last=False)
+                self.bytes -= len(old_key) + len(old_body)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self.__entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def _json(status: int, payload: Any) -> Response:
+    return status, json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _not_found(message: str) -> Response:
+    return _json(404, {"error": message})
+
+
+class ArchiveService:
+    """
+    Routes request targets to ArchiveIndex / NameIndex lookups, independent of the HTTP
+    server, with the response cache in front.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        name_index_dir: Optional[str] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        """
+        Args:
+            db_path: Database built by build_index()
+            name_index_dir: Directory of a NameIndex, enables /search
+            cache: Response cache, a default-sized one when omitted
+        """
+        # fail at startup rather than on the first request
+        ArchiveIndex(db_path).close()
+        self.db_path = db_path
+        self.names = NameIndex(name_index_dir) if name_index_dir else None
+        self.cache = cache if cache is not None else ResponseCache()
+        # idle connections; each request thread checks one out
+        self.__idle: List[ArchiveIndex] = []
+        self.__lock = threading.Lock()
+        self.__counts: Optional[Dict[str, int]] = None
+
+        # (pattern, handler called with the matched id); more specific routes first
+        self.__routes: List[Tuple[re.Pattern, Callable[[ArchiveIndex, int], Any], str]] = [
+            (re.compile(r"/subjects/(\d+)/relations"), ArchiveIndex.relations_of, "subject"),
+            (re.compile(r"/subjects/(\d+)/staff"), ArchiveIndex.staff_of, "subject"),
+            (re.compile(r"/subjects/(\d+)/cast"), ArchiveIndex.cast_of, "subject"),
+            (re.compile(r"/subjects/(\d+)/episodes"), ArchiveIndex.episodes_of, "subject"),
+            (re.compile(r"/persons/(\d+)/subjects"), ArchiveIndex.subjects_of_person, "person"),
+            (
+                re.compile(r"/characters/(\d+)/subjects"),
+                ArchiveIndex.subjects_of_character,
+                "character",
+            ),
+            (re.compile(r"/subjects/(\d+)"), ArchiveIndex.subject, "subject"),
+            (re.compile(r"/persons/(\d+)"), ArchiveIndex.person, "person"),
+            (re.compile(r"/characters/(\d+)"), ArchiveIndex.character, "character"),
+            (re.compile(r"/episodes/(\d+)"), ArchiveIndex.episode, "episode"),
+        ]
+
+    @contextlib.contextmanager
+    def _index(self) -> Iterator[ArchiveIndex]:
+        """
+        A connection of the pool, opening one when all are in use.
+        """
+        with self.__lock:
+            index = self.__idle.pop() if self.__idle else None
+        if index is None:
+            index = ArchiveIndex(self.db_path)
+        try:
+            yield index
+        finally:
+            with self.__lock:
+                self.__idle.append(index)
+
+    def handle(self, target: str) -> Response:
+        """
+        Response to a GET of target (path and query string), from the cache when possible.
+        """
+        if target == "/stats":
+            return self._stats()
+        response = self.cache.get(target)
+        if response is None:
+            response = self._dispatch(target)
+            if response is None:
+                # not cached: arbitrary paths must not evict entities
+                return _not_found(f"No route for {urlsplit(target).path}")
+            if response[0] in (200, 404):
+                self.cache.put(target, response)
+        return response
+
+    def _dispatch(self, target: str) -> Optional[Response]:
+        url = urlsplit(target)
+        path = url.path.rstrip("/")
+        if path == "/search":
+            return self._search(parse_qs(url.query))
+
+        for pattern, lookup, kind in self.__routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            entity_id = int(match.group(1))
+            with self._index() as index:
+                result = lookup(index, entity_id)
+                # an empty list is only a 404 when the entity itself is missing
+                if result == [] and getattr(index, kind)(entity_id) is None:
+                    result = None
+            if result is None:
+                return _not_found(f"No {kind} {entity_id}")
+            return _json(200, result)
+        return None
+
+    def _search(self, params: Dict[str, List[str]]) -> Response:
+        if self.names is None:
+            return _json(501, {"error": "The service was started without a name index"})
+        query = params.get("q", [""])[0]
+        kinds = params.get("kind")
+        if not query:
+            return _json(400, {"error": "Missing q parameter"})
+        if kinds and not set(kinds) <= {kind for kind, _ in KINDS}:
+            return _json(400, {"error": f"Unknown kind in {kinds}"})
+        try:
+            limit = min(int(params.get("limit", ["20"])[0]), 100)
+        except ValueError:
+            return _json(400, {"error": "limit must be an integer"})
+        hits = self.names.search(query, kinds=kinds, limit=limit)
+        return _json(
+            200,
+            [
+                {
+                    "kind": hit.kind,
+                    "id": hit.id,
+                    "score": round(hit.score, 4),
+                    "name": hit.name,
+                    "name_cn": hit.name_cn,
+                }
+                for hit in hits
+            ],
+        )
+
+    def _stats(self) -> Response:
+        if self.__counts is None:
+            with self._index() as index:
+                self.__counts = index.counts()
+        return _json(200, {"rows": self.__counts, "cache": self.cache.stats()})
+
+    def close(self):
+        with self.__lock:
+            for index in self.__idle:
+                index.close()
+            self.__idle.clear()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive, so scrapers and the load test reuse connections
+    protocol_version = "HTTP/1.1"
+    # headers and body are separate writes; with Nagle on, the body waits for the
+    # client's delayed ACK (~40ms) on every keep-alive response
+    disable_nagle_algorithm = True
+    server: "ArchiveHTTPServer"
+
+    def do_GET(self):
+        try:
+            status, body = self.server.service.handle(self.path)
+        except Exception:
+            logger.exception(f"Failed to handle {self.path}")
+            status, body = _json(500, {"error": "Internal error"})
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code="-", size="-"):
+        if self.server.access_log:
+            super().log_request(code, size)
+
+
+class ArchiveHTTPServer(ThreadingHTTPServer):
+    """
+    ThreadingHTTPServer (one thread per connection) serving an ArchiveService.
+    """
+
+    daemon_threads = True
+    # the default of 5 drops connections when a load test opens many at once
+    request_queue_size = 1024
+
+    def __init__(
+        self, address: Tuple[str, int], service: ArchiveService, access_log: bool = False
+    ):
+        super().__init__(address, _Handler)
+        self.service = service
+        self.access_log = access_log
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
@@ -0,0 +1,132 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+from bgm_archive.index.name_index import NameIndex
+from bgm_archive.index.sqlite_index import build_index
+from bgm_archive.service.server import ArchiveHTTPServer, ArchiveService, ResponseCache
+
+
+@pytest.fixture(scope="module")
+def service(wiki_archive_path, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("service")
+    build_index(str(wiki_archive_path), str(directory / "archive.db"))
+    NameIndex.build(str(wiki_archive_path), str(directory / "names"))
+    service = ArchiveService(str(directory / "archive.db"), str(directory / "names"))
+    yield service
+    service.close()
+
+
+@pytest.fixture(scope="module")
+def server(service):
+    server = ArchiveHTTPServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _get(service: ArchiveService, target: str):
+    status, body = service.handle(target)
+    return status, json.loads(body)
+
+
+def test_lookups(service):
+    status, subject = _get(service, "/subjects/8")
+    assert status == 200
+    assert subject["name_cn"] == "Code Geass 反叛的鲁路修R2"
+    assert subject["tags"]
+
+    assert [r["related_subject_id"] for r in _get(service, "/subjects/4/relations")[1]] == [9944, 9950]
+    assert {s["person_id"] for s in _get(service, "/subjects/8/staff")[1]} >= {39, 56, 162, 185}
+    assert [c["character_id"] for c in _get(service, "/subjects/6/cast")[1]][:2] == [10, 11]
+    assert _get(service, "/persons/1")[1]["name"] == "水樹奈々"
+    assert _get(service, "/characters/3/")[1]["name"] == "C.C."
+    assert _get(service, "/stats")[1]["rows"]["subject"] == 20
+
+    # existing entity without relations vs. missing entity
+    assert _get(service, "/persons/1/subjects") == (200, [])
+    assert _get(service, "/persons/999999/subjects")[0] == 404
+    assert _get(service, "/subjects/999999") == (404, {"error": "No subject 999999"})
+    assert _get(service, "/nothing/here")[0] == 404
+
+
+def test_search(service):
+    status, hits = _get(service, "/search?q=%E9%B2%81%E8%B7%AF%E4%BF%AE&kind=character")
+    assert status == 200
+    assert [(hit["kind"], hit["id"]) for hit in hits] == [("character", 1)]
+
+    assert _get(service, "/search?q=code+geass&limit=1")[1][0]["id"] == 8
+    assert _get(service, "/search")[0] == 400
+    assert _get(service, "/search?q=a&kind=episode")[0] == 400
+    assert _get(service, "/search?q=a&limit=x")[0] == 400
+
+
+def test_response_cache():
+    cache = ResponseCache(max_entries=2, max_bytes=100)
+    cache.put("/a", (200, b"a" * 10))
+    cache.put("/b", (200, b"b" * 10))
+    assert cache.get("/a") == (200, b"a" * 10)
+
+    # /b is the least recently used
+    cache.put("/c", (200, b"c" * 10))
+    assert cache.get("/b") is None
+    assert cache.get("/a") is not None
+
+    # evicting by bytes; responses larger than the cache are not stored
+    cache.put("/d", (200, b"d" * 80))
+    assert cache.get("/c") is None
+    assert len(cache) == 2 and cache.bytes == 94
+    cache.put("/e", (200, b"e" * 200))
+    assert cache.get("/e") is None
+    assert cache.stats()["hits"] == 2
+
+
+def test_cached_responses(service):
+    service.handle("/subjects/1")
+    hits = service.cache.hits
+    service.handle("/subjects/1")
+    service.handle("/subjects/999998")
+    service.handle("/subjects/999998")
+    assert service.cache.hits == hits + 2
+
+    # unrouted paths do not take cache entries
+    entries = len(service.cache)
+    service.handle("/random/path")
+    assert len(service.cache) == entries
+
+
+def test_http_keep_alive(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    for target in ("/subjects/1", "/subjects/999999", "/search?q=clannad"):
+        conn.request("GET", target)
+        response = conn.getresponse()
+        body = json.loads(response.read())
+        assert response.getheader("Content-Type") == "application/json; charset=utf-8"
+        assert response.status == (404 if "999999" in target else 200)
+    assert body[0]["name"] == "CLANNAD"
+    conn.close()
+
+
+def test_concurrent_requests(server):
+    errors = []
+
+    def worker(subject_id: int):
+        conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+        for _ in range(20):
+            conn.request("GET", f"/subjects/{subject_id}/cast")
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+        conn.close()
+
+    threads = [threading.Thread(target=worker, args=(subject_id,)) for subject_id in (6, 8, 12, 13)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []